@@ -3,13 +3,37 @@ import numpy as np
 import time
 import math
 import mediapipe as mp
-from cvzone.HandTrackingModule import HandDetector
+from HandGestureDetector import HandDetector, detectionImage
+from frame_preprocess import DetectionFrame, FramePreprocessor
+from render_space import RenderSpace
+from gesture_engine import Gesture, GestureEngine
+from graph_pool import graph_pool
+from async_detection import AsyncDetector
+
+# Resolution MediaPipe runs at, landmarks are mapped back to frame pixels
+DETECTION_SIZE = (640, 360)
+
+# Hand detections per second for the on-screen buttons
+HAND_DETECTION_RATE = 10
+
+# Pose landmarks of the left and right side swap when the image is mirrored
+MIRRORED_POSE = np.array([0, 4, 5, 6, 1, 2, 3, 8, 7, 10, 9] +
+                         [i + 1 if i % 2 else i - 1 for i in range(11, 33)])
+
+# Pose detection result before the first detection finished
+NO_POSE = np.zeros((0, 2), np.int32)
+
+GESTURES = GestureEngine({
+    'press': Gesture(fingers=(None, 1, None, None, None)),    # Index finger up, pressing a button
+    'switch_arm': Gesture(fingers=(None, 0, 0, 0, 1)),        # Pinky up, with or without the thumb
+})
 
 
 class PoseDetector:
     def __init__(self, mode=False, upBody=False, smooth=True,
-                 detectionCon=0.5, trackCon=0.5):
+                 detectionCon=0.5, trackCon=0.5, detectionSize=None):
         self.mode = mode
+        self.detectionSize = detectionSize
         self.upBody = upBody
         self.smooth = smooth
         self.detectionCon = detectionCon
@@ -17,62 +41,117 @@ class PoseDetector:
 
         self.mpDraw = mp.solutions.drawing_utils
         self.mpPose = mp.solutions.pose
-        self.pose = self.mpPose.Pose(static_image_mode=self.mode,
-                                     model_complexity=1,
-                                     smooth_landmarks=self.smooth,
-                                     enable_segmentation=False,
-                                     smooth_segmentation=True,
-                                     min_detection_confidence=self.detectionCon,
-                                     min_tracking_confidence=self.trackCon)
 
-    def findPose(self, img, draw=True):
-        imgRGB = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        self.results = self.pose.process(imgRGB)
-        if self.results.pose_landmarks:
-            if draw:
-                self.mpDraw.draw_landmarks(img, self.results.pose_landmarks,
-                                           self.mpPose.POSE_CONNECTIONS)
-        return img
+        # Video-mode graph from the shared pool, held until close()
+        self.poseKey = ('pose', self.mode, self.smooth, self.detectionCon, self.trackCon)
+        self.pose = graph_pool.checkout(self.poseKey, self._graph)
+
+    def _graph(self):
+        return self.mpPose.Pose(static_image_mode=self.mode,
+                                model_complexity=1,
+                                smooth_landmarks=self.smooth,
+                                enable_segmentation=False,
+                                smooth_segmentation=True,
+                                min_detection_confidence=self.detectionCon,
+                                min_tracking_confidence=self.trackCon)
 
-    def findPosition(self, img, draw=True):
-        self.lmList = []
-        if self.results.pose_landmarks:
-            for id, lm in enumerate(self.results.pose_landmarks.landmark):
-                h, w, c = img.shape
-                cx, cy = int(lm.x * w), int(lm.y * h)
-                self.lmList.append([id, cx, cy])
-                if draw:
-                    cv2.circle(img, (cx, cy), 5, (255, 0, 0), cv2.FILLED)
-        return self.lmList
-
-    def findAngle(self, img, p1, p2, p3, draw=True):
-        x1, y1 = self.lmList[p1][1:]
-        x2, y2 = self.lmList[p2][1:]
-        x3, y3 = self.lmList[p3][1:]
+    def findPose(self, img, draw=True):
+        """
+        :param img: BGR image, or a DetectionFrame whose landmarks are reported
+                    in display frame pixels (and not drawn)
+        :return: Read-only 33x2 int32 array of landmark pixels (empty if no pose is found), image
+        """
+        frame = img if isinstance(img, DetectionFrame) else None
+        results = self.pose.process(frame.rgb if frame is not None else detectionImage(img, self.detectionSize))
+        if not results.pose_landmarks:
+            return NO_POSE, img
+        if draw and frame is None:
+            self.mpDraw.draw_landmarks(img, results.pose_landmarks,
+                                       self.mpPose.POSE_CONNECTIONS)
+        points = np.array([(lm.x, lm.y) for lm in results.pose_landmarks.landmark], np.float32)
+        if frame is None:
+            h, w = img.shape[:2]
+        else:
+            w, h = frame.output_size
+            if frame.mirrored:
+                # Mirror the landmarks instead of the image, the body's left side becomes its right
+                points[:, 0] = 1 - points[:, 0]
+                points = points[MIRRORED_POSE]
+        landmarks = (points * (w, h)).astype(np.int32)
+        landmarks.flags.writeable = False
+        return landmarks, img
+
+    def findPosition(self, landmarks, img=None, draw=True, space=None):
+        """
+        Landmarks returned by findPose as [id, x, y] lists
+        :param space: RenderSpace mapping the landmarks onto img, if it is rendered at another size
+        """
+        lmList = [[id, x, y] for id, (x, y) in enumerate(landmarks.tolist())]
+        if draw and img is not None:
+            canvas = space or cv2
+            for _, cx, cy in lmList:
+                canvas.circle(img, (cx, cy), 5, (255, 0, 0), cv2.FILLED)
+        return lmList
+
+    def findAngle(self, img, landmarks, p1, p2, p3, draw=True, space=None):
+        """
+        Angle at p2 between p1 and p3, in degrees
+        :param space: RenderSpace mapping the landmarks onto img, if it is rendered at another size
+        """
+        x1, y1 = landmarks[p1].tolist()
+        x2, y2 = landmarks[p2].tolist()
+        x3, y3 = landmarks[p3].tolist()
         angle = math.degrees(math.atan2(y3 - y2, x3 - x2) -
                              math.atan2(y1 - y2, x1 - x2))
         if angle < 0:
             angle += 360
         if draw:
-            cv2.line(img, (x1, y1), (x2, y2), (255, 255, 255), 3)
-            cv2.line(img, (x3, y3), (x2, y2), (255, 255, 255), 3)
-            cv2.circle(img, (x1, y1), 10, (0, 0, 255), cv2.FILLED)
-            cv2.circle(img, (x1, y1), 15, (0, 0, 255), 2)
-            cv2.circle(img, (x2, y2), 10, (0, 0, 255), cv2.FILLED)
-            cv2.circle(img, (x2, y2), 15, (0, 0, 255), 2)
-            cv2.circle(img, (x3, y3), 10, (0, 0, 255), cv2.FILLED)
-            cv2.circle(img, (x3, y3), 15, (0, 0, 255), 2)
-            cv2.putText(img, str(int(angle)), (x2 - 50, y2 + 50),
-                        cv2.FONT_HERSHEY_PLAIN, 2, (0, 0, 255), 2)
+            canvas = space or cv2
+            canvas.line(img, (x1, y1), (x2, y2), (255, 255, 255), 3)
+            canvas.line(img, (x3, y3), (x2, y2), (255, 255, 255), 3)
+            canvas.circle(img, (x1, y1), 10, (0, 0, 255), cv2.FILLED)
+            canvas.circle(img, (x1, y1), 15, (0, 0, 255), 2)
+            canvas.circle(img, (x2, y2), 10, (0, 0, 255), cv2.FILLED)
+            canvas.circle(img, (x2, y2), 15, (0, 0, 255), 2)
+            canvas.circle(img, (x3, y3), 10, (0, 0, 255), cv2.FILLED)
+            canvas.circle(img, (x3, y3), 15, (0, 0, 255), 2)
+            canvas.putText(img, str(int(angle)), (x2 - 50, y2 + 50),
+                           cv2.FONT_HERSHEY_PLAIN, 2, (0, 0, 255), 2)
         return angle
 
+    def reset(self):
+        """Forget the pose tracked so far, e.g. before serving a new session"""
+        if self.pose is not None and hasattr(self.pose, 'reset'):
+            self.pose.reset()
+
+    def close(self):
+        """Return the graph to the shared pool"""
+        pose, self.pose = self.pose, None
+        if pose is not None:
+            graph_pool.checkin(self.poseKey, pose, reset=True)
+
 
 class ArmCurlsCounter:
+    accepts_encoded_frames = True  # JPEG frames are decoded by FramePreprocessor
+
     def __init__(self):
         """Initialize the Arm Curls Counter compatible with main backend"""
         # Initialize pose and hand detectors with optimized settings
-        self.detector = PoseDetector(detectionCon=0.7, trackCon=0.5)
-        self.hands_detector = HandDetector(maxHands=1, detectionCon=0.7 )
+        self.detector = PoseDetector(detectionCon=0.7, trackCon=0.5, detectionSize=DETECTION_SIZE)
+        self.hands_detector = HandDetector(maxHands=1, detectionCon=0.7, motionGate=True,
+                                           detectionSize=DETECTION_SIZE, tracking=True, smoothing=True,
+                                           detectionRate=HAND_DETECTION_RATE)
+
+        # The UI, pose and hands are laid out in 1280x720, rendered at the session's size
+        self.space = RenderSpace()
+
+        # Pose and hands are detected on their own threads, frames render with the newest results
+        self.preprocess = FramePreprocessor(display_size=self.space.size, detection_size=DETECTION_SIZE,
+                                            landmark_size=self.space.logical_size)
+        self.pose_detection = AsyncDetector(self.detect_pose, release=self.preprocess.release,
+                                            name='fitness-pose-detection')
+        self.hand_detection = AsyncDetector(self.detect_hands, predict=self.hands_detector.predictHands,
+                                            release=self.preprocess.release, name='fitness-hand-detection')
 
         # Counter variables
         self.count = 0
@@ -89,8 +168,6 @@ class ArmCurlsCounter:
         self.switch_delay = 1.0
 
         # Performance optimization variables
-        self.frame_skip_counter = 0
-        self.hand_detection_interval = 3  # Process hands every 3rd frame
         self.last_hand_positions = None
         self.hand_detection_enabled = True
 
@@ -99,6 +176,16 @@ class ArmCurlsCounter:
 
         print("ArmCurlsCounter initialized successfully")
 
+    def detect_pose(self, img):
+        """Run on the pose detection thread for the newest frame"""
+        landmarks, _ = self.detector.findPose(img, False)
+        return landmarks
+
+    def detect_hands(self, img):
+        """Run on the hand detection thread for the newest frame"""
+        hands, _ = self.hands_detector.findHands(img, draw=False, flipType=False)
+        return hands
+
     def process_frame(self, frame):
         """
         Process a single frame - main interface method expected by backend
@@ -107,38 +194,38 @@ class ArmCurlsCounter:
         Returns:
             Processed frame with UI elements
         """
-        if not self.is_running or frame is None:
-            return frame
+        if frame is None:
+            return None
+        if not self.is_running:
+            return self.preprocess.display(frame)
 
         try:
-            # Flip frame for mirror effect
-            img = cv2.flip(frame, 1)
+            # Mirrored frame to draw on, and one detection image shared by both detectors
+            img = self.preprocess.display(frame)
+            detection = self.preprocess.detection(frame, users=2 if self.hand_detection_enabled else 1)
+            self.pose_detection.submit(detection)
+            if self.hand_detection_enabled:
+                self.hand_detection.submit(detection)
 
-            # Optimize hand detection - only process every nth frame
+            # Hand gestures for UI interaction, from the newest detection
             if self.hand_detection_enabled:
-                self.frame_skip_counter += 1
-                if self.frame_skip_counter >= self.hand_detection_interval:
-                    self.frame_skip_counter = 0
-                    # Process hand detection for UI interaction (lightweight)
-                    hands, img = self.hands_detector.findHands(img, draw=False, flipType=False)
-                    if hands and len(hands) > 0:
-                        # Get hand landmarks efficiently
-                        hand = hands[0]
-                        lmlist = hand['lmList']
-                        if lmlist and len(lmlist) > 8:
-                            # Store positions for next frames
-                            self.last_hand_positions = lmlist
-                            # Only calculate fingers when needed
-                            fingers = self.hands_detector.fingersUp(hand)
-                            self.handle_click(lmlist, fingers)
-                    else:
-                        self.last_hand_positions = None
-
-            # Always process pose detection (this is the main functionality)
-            img = self.detector.findPose(img, False)
-            lmList = self.detector.findPosition(img, False)
-
-            if len(lmList) != 0:
+                hands = self.hand_detection.latest([])
+                if hands and len(hands) > 0:
+                    # Get hand landmarks efficiently
+                    hand = hands[0]
+                    lmlist = hand.landmarks
+                    if len(lmlist) > 8:
+                        # Store positions for next frames
+                        self.last_hand_positions = lmlist
+                        # Only evaluate gestures when needed
+                        self.handle_click(lmlist, GESTURES.evaluate(hands))
+                else:
+                    self.last_hand_positions = None
+
+            # Pose landmarks of the newest detection (this is the main functionality)
+            landmarks = self.pose_detection.latest(NO_POSE)
+
+            if len(landmarks) != 0:
                 # Get angle based on active arm
                 if self.active_arm == 'right':
                     shoulder, elbow, wrist = 15, 13, 11
@@ -146,7 +233,7 @@ class ArmCurlsCounter:
                     shoulder, elbow, wrist = 12, 14, 16
 
                 try:
-                    angle = self.detector.findAngle(img, shoulder, elbow, wrist)
+                    angle = self.detector.findAngle(img, landmarks, shoulder, elbow, wrist, space=self.space)
 
                     # Calculate percentage and progress bar position
                     per = np.interp(angle, (210, 310), (0, 100))
@@ -171,7 +258,12 @@ class ArmCurlsCounter:
 
         except Exception as e:
             print(f"Error in process_frame: {e}")
-            return frame
+            return self.preprocess.display(frame)
+
+    def set_render_size(self, size):
+        """Render at the size negotiated for the session, the layout stays in 1280x720"""
+        if self.space.resize(size):
+            self.preprocess.display_size = self.space.size
 
     def update_count(self, per):
         """Update the rep counter based on arm position percentage"""
@@ -192,14 +284,14 @@ class ArmCurlsCounter:
     def draw_ui(self, img, per, bar, color):
         """Draw all UI elements on the frame"""
         # Progress bar
-        cv2.rectangle(img, (1100, 100), (1175, 650), (200, 200, 200), 3)
-        cv2.rectangle(img, (1100, int(bar)), (1175, 650), color, cv2.FILLED)
-        cv2.putText(img, f'{int(per)}%', (1120, 75), cv2.FONT_HERSHEY_SIMPLEX, 1, color, 2)
+        self.space.rectangle(img, (1100, 100), (1175, 650), (200, 200, 200), 3)
+        self.space.rectangle(img, (1100, int(bar)), (1175, 650), color, cv2.FILLED)
+        self.space.putText(img, f'{int(per)}%', (1120, 75), cv2.FONT_HERSHEY_SIMPLEX, 1, color, 2)
 
         # Count display
-        cv2.rectangle(img, (0, 450), (250, 720), (245, 117, 16), cv2.FILLED)
-        cv2.putText(img, str(int(self.count)), (45, 670), cv2.FONT_HERSHEY_SIMPLEX, 3, (255, 255, 255), 25)
-        cv2.putText(img, "REPS", (40, 560), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 5)
+        self.space.rectangle(img, (0, 450), (250, 720), (245, 117, 16), cv2.FILLED)
+        self.space.putText(img, str(int(self.count)), (45, 670), cv2.FONT_HERSHEY_SIMPLEX, 3, (255, 255, 255), 25)
+        self.space.putText(img, "REPS", (40, 560), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 5)
 
         # Arm selection buttons
         self.draw_button(img, self.button_left, 'Left Arm', self.active_arm == 'left')
@@ -207,29 +299,29 @@ class ArmCurlsCounter:
 
         # Show switching indicator
         if time.time() - self.last_switch_time < self.switch_delay:
-            cv2.putText(img, "Switching...", (500, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+            self.space.putText(img, "Switching...", (500, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
 
     def draw_button(self, img, button, text, is_active):
         """Draw a button with text"""
         color = (0, 255, 0) if is_active else (200, 200, 200)
-        cv2.rectangle(img, (button['x1'], button['y1']), (button['x2'], button['y2']), color, cv2.FILLED)
-        cv2.putText(img, text, (button['x1'] + 10, button['y1'] + 35),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 2)
+        self.space.rectangle(img, (button['x1'], button['y1']), (button['x2'], button['y2']), color, cv2.FILLED)
+        self.space.putText(img, text, (button['x1'] + 10, button['y1'] + 35),
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 2)
 
     def show_fps(self, img):
         """Display FPS on the frame"""
         cTime = time.time()
         fps = 1 / (cTime - self.pTime) if (cTime - self.pTime) > 0 else 60
         self.pTime = cTime
-        cv2.putText(img, f'FPS: {int(fps)}', (1100, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+        self.space.putText(img, f'FPS: {int(fps)}', (1100, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
         return img
 
     def draw_basic_ui(self, img):
         """Draw basic UI when no pose is detected"""
         # Count display
-        cv2.rectangle(img, (0, 450), (250, 720), (245, 117, 16), cv2.FILLED)
-        cv2.putText(img, str(int(self.count)), (45, 670), cv2.FONT_HERSHEY_SIMPLEX, 3, (255, 255, 255), 25)
-        cv2.putText(img, "REPS", (40, 560), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 5)
+        self.space.rectangle(img, (0, 450), (250, 720), (245, 117, 16), cv2.FILLED)
+        self.space.putText(img, str(int(self.count)), (45, 670), cv2.FONT_HERSHEY_SIMPLEX, 3, (255, 255, 255), 25)
+        self.space.putText(img, "REPS", (40, 560), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 5)
 
         # Arm selection buttons
         self.draw_button(img, self.button_left, 'Left Arm', self.active_arm == 'left')
@@ -237,13 +329,13 @@ class ArmCurlsCounter:
 
         # Show switching indicator
         if time.time() - self.last_switch_time < self.switch_delay:
-            cv2.putText(img, "Switching...", (500, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+            self.space.putText(img, "Switching...", (500, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
 
         # Show instruction text
-        cv2.putText(img, "Position yourself to start exercise", (400, 300),
-                    cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 0), 2)
+        self.space.putText(img, "Position yourself to start exercise", (400, 300),
+                           cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 0), 2)
 
-    def handle_click(self, lmlist, fingers):
+    def handle_click(self, lmlist, gestures):
         """Handle hand gesture clicks for UI interaction - optimized version"""
         current_time = time.time()
 
@@ -256,24 +348,24 @@ class ArmCurlsCounter:
         try:
             # Check button clicks with bounds checking
             if len(lmlist) > 8:
-                finger_tip_x, finger_tip_y = lmlist[8][1], lmlist[8][2]
+                finger_tip_x, finger_tip_y = lmlist[8, :2].tolist()
 
                 # Check left button
                 if (self.button_left['x1'] < finger_tip_x < self.button_left['x2'] and
                         self.button_left['y1'] < finger_tip_y < self.button_left['y2']):
-                    if fingers[1] == 1:  # Index finger up
+                    if gestures.isGesture('press'):  # Index finger up
                         switch_arm = True
                         self.active_arm = 'left'
 
                 # Check right button
                 elif (self.button_right['x1'] < finger_tip_x < self.button_right['x2'] and
                       self.button_right['y1'] < finger_tip_y < self.button_right['y2']):
-                    if fingers[1] == 1:  # Index finger up
+                    if gestures.isGesture('press'):  # Index finger up
                         switch_arm = True
                         self.active_arm = 'right'
 
-                # Gesture to switch arms (peace sign or thumbs up)
-                elif fingers == [1, 0, 0, 0, 1] or fingers == [0, 0, 0, 0, 1]:
+                # Gesture to switch arms (pinky up)
+                elif gestures.isGesture('switch_arm'):
                     switch_arm = True
                     self.active_arm = 'right' if self.active_arm == 'left' else 'left'
 
@@ -314,8 +406,24 @@ class ArmCurlsCounter:
     def stop(self):
         """Stop the fitness tracker"""
         self.is_running = False
+        self.pose_detection.stop()
+        self.hand_detection.stop()
+        self.detector.close()
+        self.hands_detector.close()
         print("Fitness tracker stopped")
 
+    def reset(self):
+        """Return to the state of a new session, keeping the loaded detectors"""
+        self.count = 0
+        self.dir = 0
+        self.active_arm = 'right'
+        self.last_switch_time = 0
+        self.last_hand_positions = None
+        self.hand_detection_enabled = True
+        self.pose_detection.reset(clear=self.detector.reset)
+        self.hand_detection.reset(clear=self.hands_detector.reset)
+        self.is_running = True
+
     def get_stats(self):
         """Get current statistics"""
         return {
@@ -5,9 +5,158 @@ Website: https://www.computervision.zone/
 """
 
 import math
+import time
 
 import cv2
 import mediapipe as mp
+import numpy as np
+
+from frame_preprocess import DetectionFrame, fit_size
+from gesture_engine import fingerStates
+from graph_pool import graph_pool
+from landmark_filters import HandFilter
+
+
+class Hand:
+    """
+    One detected hand: 21x3 int32 landmarks in image pixels (x, y, relative
+    depth), bounding box (x, y, w, h), center, type ("Left"/"Right"),
+    handedness score and tracking id. Item access with the keys of the dicts
+    findHands used to return (hand["lmList"], hand["bbox"], ...) still works.
+
+    Hands are immutable, including their landmark array, so they can be handed
+    between threads and sessions. Use withLandmarks / withId for modified copies.
+    """
+    __slots__ = ('landmarks', 'bbox', 'center', 'type', 'score', 'id')
+
+    _aliases = {'lmList': 'landmarks'}
+
+    def __init__(self, landmarks, type, score=1.0, id=None):
+        landmarks.flags.writeable = False
+        xmin, ymin = landmarks[:, :2].min(axis=0).tolist()
+        xmax, ymax = landmarks[:, :2].max(axis=0).tolist()
+        setattr_ = object.__setattr__
+        setattr_(self, 'landmarks', landmarks)
+        setattr_(self, 'type', type)
+        setattr_(self, 'score', score)
+        setattr_(self, 'id', id)
+        setattr_(self, 'bbox', (xmin, ymin, xmax - xmin, ymax - ymin))
+        setattr_(self, 'center', (xmin + (xmax - xmin) // 2, ymin + (ymax - ymin) // 2))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'Hand is immutable, cannot set {name}')
+
+    @property
+    def lmList(self):
+        return self.landmarks
+
+    def withLandmarks(self, points):
+        """Same hand with new landmark positions, e.g. smoothed or predicted ones"""
+        return Hand(np.rint(points).astype(np.int32), self.type, self.score, self.id)
+
+    def withId(self, id):
+        """Same hand with a tracking id"""
+        return Hand(self.landmarks, self.type, self.score, id)
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, self._aliases.get(key, key))
+        except (AttributeError, TypeError):
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return self._aliases.get(key, key) in self.__slots__
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __repr__(self):
+        return f'Hand(type={self.type!r}, id={self.id}, bbox={self.bbox}, score={self.score:.2f})'
+
+
+def detectionImage(img, detectionSize=None):
+    """
+    RGB copy of a BGR image for MediaPipe, shrunk to fit within detectionSize
+    (width, height) keeping its aspect ratio. MediaPipe landmarks are
+    normalized, so results map back onto the full-size image unchanged.
+    The shrink happens before the color conversion, which then runs on the
+    small image only.
+    """
+    h, w = img.shape[:2]
+    size = fit_size(w, h, detectionSize)
+    if size != (w, h):
+        img = cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
+
+def frameView(frame):
+    """
+    Affine map (scale, shift) from pixels of a DetectionFrame's image to pixels
+    of the display frame: scaled to its output size and mirrored if it is
+    """
+    h, w = frame.rgb.shape[:2]
+    width, height = frame.output_size
+    sx, sy = width / w, height / h
+    if frame.mirrored:
+        return np.array([-sx, sy, sx], np.float32), np.array([width, 0, 0], np.float32)
+    return np.array([sx, sy, sx], np.float32), np.zeros(3, np.float32)
+
+
+class MotionGate:
+    """
+    Cheap scene-change test deciding whether a frame needs a new hand
+    detection. The frame is shrunk to a small grayscale thumbnail and compared
+    with the thumbnail of the last frame that was detected on, so slow drift
+    still adds up to a detection eventually.
+    """
+
+    def __init__(self, size=(160, 90), pixelThreshold=12, motionThreshold=0.002, maxInterval=0.5):
+        """
+        :param size: Size of the grayscale thumbnail that is compared
+        :param pixelThreshold: Gray level difference for a thumbnail pixel to count as changed
+        :param motionThreshold: Fraction of changed pixels that counts as motion
+        :param maxInterval: Seconds after which detection runs even without motion
+        """
+        self.size = size
+        self.pixelThreshold = pixelThreshold
+        self.motionThreshold = motionThreshold
+        self.maxInterval = maxInterval
+        self.reference = None
+        self.lastPass = 0
+        self.passed = 0
+        self.skipped = 0
+
+    def thumbnail(self, img):
+        small = cv2.resize(img, self.size, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+
+    def changed(self, img):
+        """
+        :return: True if the frame must be detected on, False if cached hands can be reused
+        """
+        thumb = self.thumbnail(img)
+        now = time.time()
+        if self.reference is None or now - self.lastPass > self.maxInterval:
+            return self._pass(thumb, now)
+
+        diff = cv2.absdiff(thumb, self.reference)
+        moving = np.count_nonzero(diff > self.pixelThreshold) / diff.size
+        if moving >= self.motionThreshold:
+            return self._pass(thumb, now)
+        self.skipped += 1
+        return False
+
+    def _pass(self, thumb, now):
+        self.reference = thumb
+        self.lastPass = now
+        self.passed += 1
+        return True
+
+    def reset(self):
+        self.reference = None
 
 
 class HandDetector:
@@ -18,7 +167,9 @@ class HandDetector:
     provides bounding box info of the hand found.
     """
 
-    def __init__(self, staticMode=False, maxHands=2, modelComplexity=1, detectionCon=0.5, minTrackCon=0.5):
+    def __init__(self, staticMode=False, maxHands=2, modelComplexity=1, detectionCon=0.5, minTrackCon=0.5,
+                 motionGate=False, detectionSize=None, tracking=False, searchInterval=15,
+                 smoothing=False, detectionRate=None):
 
         """
         :param mode: In static mode, detection is done on each image: slower
@@ -26,6 +177,15 @@ class HandDetector:
         :param modelComplexity: Complexity of the hand landmark model: 0 or 1.
         :param detectionCon: Minimum Detection Confidence Threshold
         :param minTrackCon: Minimum Tracking Confidence Threshold
+        :param motionGate: True or a MotionGate to reuse the last hands while the scene is still
+        :param detectionSize: (width, height) to run detection at, e.g. (640, 360). Landmarks,
+                              bbox and center are still reported in the input image's pixels
+        :param tracking: Detect known hands in a crop around their previous bbox instead of
+                         the whole frame, falling back to a full search when a hand is lost
+        :param searchInterval: Frames between full searches while tracking, to pick up new hands
+        :param smoothing: True or a HandFilter to smooth landmarks and estimate their velocity
+        :param detectionRate: Highest detection rate in Hz when smoothing, calls in between
+                              return hands predicted from the last detection
         """
         self.staticMode = staticMode
         self.maxHands = maxHands
@@ -33,104 +193,273 @@ class HandDetector:
         self.detectionCon = detectionCon
         self.minTrackCon = minTrackCon
         self.mpHands = mp.solutions.hands
-        self.hands = self.mpHands.Hands(static_image_mode=self.staticMode,
-                                        max_num_hands=self.maxHands,
-                                        model_complexity=modelComplexity,
-                                        min_detection_confidence=self.detectionCon,
-                                        min_tracking_confidence=self.minTrackCon)
+
+        # Graphs come from the shared pool. The video-mode graph tracks hands
+        # across this detector's frames, so it is held until close(); static
+        # graphs keep no state and are checked out per image, see detect()
+        self.streamKey = ('hands', self.staticMode, self.maxHands, modelComplexity,
+                          self.detectionCon, self.minTrackCon)
+        self.staticKey = ('hands', True, self.maxHands, modelComplexity, self.detectionCon, 0.5)
+        self.roiKey = ('hands', True, 1, modelComplexity, self.detectionCon, 0.5)
+        self.hands = None if self.staticMode else graph_pool.checkout(self.streamKey, self._graph(self.streamKey))
 
         self.mpDraw = mp.solutions.drawing_utils
         self.tipIds = [4, 8, 12, 16, 20]
-        self.fingers = []
-        self.lmList = []
+        self.connections = np.array(sorted(self.mpHands.HAND_CONNECTIONS), np.int32)
+        self.motionGate = MotionGate() if motionGate is True else (motionGate or None)
+        self.lastHands = None
+        self.lastFlipType = None
+        self.detectionSize = detectionSize
+
+        # ROI tracking: crops are unrelated images, so they use pooled static-mode graphs
+        self.tracking = tracking
+        self.searchInterval = searchInterval
+        self.trackedHands = []
+        self.framesSinceSearch = 0
+        self.nextHandId = 0
+
+        # Smoothing and prediction between detections
+        self.handFilter = HandFilter() if smoothing is True else (smoothing or None)
+        if self.handFilter is not None and self.motionGate is not None:
+            # Hands must outlive the longest stretch the gate goes without a detection
+            self.handFilter.lostAfter = max(self.handFilter.lostAfter, self.motionGate.maxInterval)
+        self.detectionInterval = 1.0 / detectionRate if detectionRate else 0
+        self.lastDetection = 0
+
+        # Map from the pixels detected on to the reported ones, for DetectionFrame input
+        self.view = None
+
+    def _graph(self, key):
+        """Factory building the graph a pool key describes"""
+        _, staticMode, maxHands, modelComplexity, detectionCon, minTrackCon = key
+        return lambda: self.mpHands.Hands(static_image_mode=staticMode,
+                                          max_num_hands=maxHands,
+                                          model_complexity=modelComplexity,
+                                          min_detection_confidence=detectionCon,
+                                          min_tracking_confidence=minTrackCon)
+
+    def detect(self, img, flipType=True, detectionSize=None):
+        """
+        Find hands in a single image without touching any detector state, safe
+        to call from several threads at once.
+        :param img: BGR image, or a DetectionFrame
+        :return: Tuple of Hands, without tracking ids
+        """
+        if isinstance(img, DetectionFrame):
+            view, flipType, img = frameView(img), flipType != img.mirrored, img.rgb
+            rgb = img
+        else:
+            view, rgb = None, detectionImage(img, detectionSize or self.detectionSize)
+        with graph_pool.graph(self.staticKey, self._graph(self.staticKey)) as graph:
+            results = graph.process(rgb)
+        h, w = img.shape[:2]
+        return tuple(self.buildHands(results, w, h, flipType, view=view))
+
+    def detectionInput(self, img):
+        """RGB image MediaPipe processes for img, a BGR image or a crop of a DetectionFrame's image"""
+        return img if self.view is not None else detectionImage(img, self.detectionSize)
+
+    def reset(self):
+        """Forget the hands of the current stream, e.g. before serving a new session"""
+        self.trackedHands = []
+        self.framesSinceSearch = 0
+        self.lastHands = None
+        self.lastFlipType = None
+        self.lastDetection = 0
+        if self.motionGate is not None:
+            self.motionGate.reset()
+        if self.handFilter is not None:
+            self.handFilter.reset()
+        if self.hands is not None and hasattr(self.hands, 'reset'):
+            self.hands.reset()
+
+    def close(self):
+        """Return the video-mode graph to the shared pool"""
+        hands, self.hands = self.hands, None
+        if hands is not None:
+            graph_pool.checkin(self.streamKey, hands, reset=True)
 
     def findHands(self, img, draw=True, flipType=True):
         """
         Finds hands in a BGR image.
-        :param img: Image to find the hands in.
+        :param img: Image to find the hands in, or a DetectionFrame prepared by
+                    FramePreprocessor. Hands of a DetectionFrame are reported in
+                    display frame pixels and are not drawn
         :param draw: Flag to draw the output on the image.
         :return: Image with or without drawings
         """
-        imgRGB = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        self.results = self.hands.process(imgRGB)
+        frame = img if isinstance(img, DetectionFrame) else None
+        if frame is not None:
+            img = frame.rgb
+            self.view = frameView(frame)
+            # Detection runs on the unmirrored image, where MediaPipe labels the hands the other way round
+            flipType = flipType != frame.mirrored
+        else:
+            self.view = None
+
+        now = time.time()
+        if self.handFilter is not None and flipType == self.lastFlipType \
+                and now - self.lastDetection < self.detectionInterval:
+            # Between detections: extrapolate from the last detection
+            allHands = self.handFilter.predict(now)
+        elif self.motionGate is not None and self.lastHands is not None and flipType == self.lastFlipType \
+                and not self.motionGate.changed(img):
+            # Still scene: the hands found last time are still valid. They count as
+            # detected now, so the filter keeps their tracks alive and at rest
+            allHands = list(self.lastHands)
+            if self.handFilter is not None:
+                allHands = self.handFilter.update(allHands, now)
+                self.lastDetection = now
+        else:
+            allHands = None
+            if self.tracking and self.trackedHands and self.framesSinceSearch < self.searchInterval:
+                allHands = self.trackHands(img, flipType)
+                self.framesSinceSearch += 1
+            if allHands is None:
+                allHands = self.searchHands(img, flipType)
+                self.framesSinceSearch = 0
+            if self.tracking:
+                self.trackedHands = [hand for hand in allHands if hand.score >= self.minTrackCon]
+            if self.handFilter is not None:
+                allHands = self.handFilter.update(allHands, now)
+                self.lastDetection = now
+            if self.motionGate is not None and (self.lastHands is None or flipType != self.lastFlipType):
+                self.motionGate.changed(img)
+            self.lastHands = list(allHands)
+            self.lastFlipType = flipType
+
+        if frame is not None:
+            return allHands, frame
+        if draw:
+            self.drawHands(img, allHands)
+        return allHands, img
+
+    def predictHands(self, t=None):
+        """
+        Hands at time t without running detection: extrapolated when smoothing,
+        otherwise the hands found last
+        """
+        if self.handFilter is not None:
+            return self.handFilter.predict(t)
+        return list(self.lastHands or [])
+
+    def searchHands(self, img, flipType=True):
+        """Detect hands anywhere in the frame"""
+        if self.hands is None:
+            with graph_pool.graph(self.staticKey, self._graph(self.staticKey)) as graph:
+                results = graph.process(self.detectionInput(img))
+        else:
+            results = self.hands.process(self.detectionInput(img))
+        h, w = img.shape[:2]
+        allHands = self.buildHands(results, w, h, flipType, view=self.view)
+        if self.tracking:
+            allHands = self.assignIds(allHands)
+        return allHands
+
+    def trackHands(self, img, flipType=True, margin=0.5, minSize=96):
+        """
+        Detect each tracked hand in a crop around its previous bbox, expanded by
+        margin times the bbox size on every side. Hands are tracked in reported
+        pixels, so the crop is mapped back through the view for DetectionFrames.
+        :return: Hands with their ids kept, or None if any hand was lost
+        """
+        h, w = img.shape[:2]
+        scale, shift = self.view if self.view is not None else ((1, 1, 1), (0, 0, 0))
         allHands = []
-        h, w, c = img.shape
-        if self.results.multi_hand_landmarks:
-            for handType, handLms in zip(self.results.multi_handedness, self.results.multi_hand_landmarks):
-                myHand = {}
-                ## lmList
-                mylmList = []
-                xList = []
-                yList = []
-                for id, lm in enumerate(handLms.landmark):
-                    px, py, pz = int(lm.x * w), int(lm.y * h), int(lm.z * w)
-                    mylmList.append([px, py, pz])
-                    xList.append(px)
-                    yList.append(py)
-
-                ## bbox
-                xmin, xmax = min(xList), max(xList)
-                ymin, ymax = min(yList), max(yList)
-                boxW, boxH = xmax - xmin, ymax - ymin
-                bbox = xmin, ymin, boxW, boxH
-                cx, cy = bbox[0] + (bbox[2] // 2), \
-                         bbox[1] + (bbox[3] // 2)
-
-                myHand["lmList"] = mylmList
-                myHand["bbox"] = bbox
-                myHand["center"] = (cx, cy)
+        for previous in self.trackedHands:
+            x, y, boxW, boxH = previous.bbox
+            side = max(boxW, boxH, minSize) * (1 + 2 * margin)
+            cx, cy = previous.center
+            cx, cy = (cx - shift[0]) / scale[0], (cy - shift[1]) / scale[1]
+            halfW, halfH = side / 2 / abs(scale[0]), side / 2 / abs(scale[1])
+            x0, y0 = max(0, int(cx - halfW)), max(0, int(cy - halfH))
+            x1, y1 = min(w, int(cx + halfW)), min(h, int(cy + halfH))
+            if x1 - x0 < 2 or y1 - y0 < 2:
+                return None
+
+            with graph_pool.graph(self.roiKey, self._graph(self.roiKey)) as graph:
+                results = graph.process(self.detectionInput(img[y0:y1, x0:x1]))
+            found = self.buildHands(results, x1 - x0, y1 - y0, flipType, offset=(x0, y0), view=self.view)
+            if not found or found[0].score < self.minTrackCon:
+                return None
+            allHands.append(found[0].withId(previous.id))
+        return allHands
+
+    def assignIds(self, allHands):
+        """
+        Give each hand of a full search the id of the nearest tracked hand, or a new one
+        :return: The hands with their ids
+        """
+        previous = list(self.trackedHands)
+        identified = []
+        for myHand in allHands:
+            best, bestDistance = None, None
+            for candidate in previous:
+                distance = math.dist(myHand.center, candidate.center)
+                if distance <= max(candidate.bbox[2:]) and (best is None or distance < bestDistance):
+                    best, bestDistance = candidate, distance
+            if best is not None:
+                identified.append(myHand.withId(best.id))
+                previous.remove(best)
+            else:
+                identified.append(myHand.withId(self.nextHandId))
+                self.nextHandId += 1
+        return identified
 
+    def buildHands(self, results, w, h, flipType=True, offset=(0, 0), view=None):
+        """
+        Convert MediaPipe results into Hand objects with landmarks in pixels
+        :param w, h: Size of the image the results were produced for
+        :param offset: Position of that image within the frame, for crops
+        :param view: (scale, shift) applied to those pixels, see frameView
+        """
+        allHands = []
+        if results.multi_hand_landmarks:
+            scale = np.array([w, h, w], np.float32)
+            shift = np.array([offset[0], offset[1], 0], np.float32)
+            if view is not None:
+                scale, shift = scale * view[0], shift * view[0] + view[1]
+            for handType, handLms in zip(results.multi_handedness, results.multi_hand_landmarks):
+                points = np.array([(lm.x, lm.y, lm.z) for lm in handLms.landmark], np.float32)
+                landmarks = (points * scale + shift).astype(np.int32)
+
+                label = handType.classification[0].label
                 if flipType:
-                    if handType.classification[0].label == "Right":
-                        myHand["type"] = "Left"
-                    else:
-                        myHand["type"] = "Right"
-                else:
-                    myHand["type"] = handType.classification[0].label
-                allHands.append(myHand)
-
-                ## draw
-                if draw:
-                    self.mpDraw.draw_landmarks(img, handLms,
-                                               self.mpHands.HAND_CONNECTIONS)
-                    cv2.rectangle(img, (bbox[0] - 20, bbox[1] - 20),
-                                  (bbox[0] + bbox[2] + 20, bbox[1] + bbox[3] + 20),
-                                  (255, 0, 255), 2)
-                    cv2.putText(img, myHand["type"], (bbox[0] - 30, bbox[1] - 30), cv2.FONT_HERSHEY_PLAIN,
-                                2, (255, 0, 255), 2)
+                    label = "Left" if label == "Right" else "Right"
+                allHands.append(Hand(landmarks, label, handType.classification[0].score))
+        return allHands
 
-        return allHands, img
+    def drawHands(self, img, allHands, space=None):
+        """
+        Draw landmarks, bounding box and type of each hand
+        :param space: RenderSpace mapping the hands' coordinates onto img, when
+                      img is rendered at another size than the landmarks
+        """
+        if space is not None and not space.identity:
+            scale = np.array([space.sx, space.sy, space.scale], np.float32)
+            allHands = [hand.withLandmarks(hand.landmarks * scale) for hand in allHands]
+        for myHand in allHands:
+            bbox = myHand.bbox
+            points = myHand.landmarks[:, :2]
+            cv2.polylines(img, list(points[self.connections]), False, (224, 224, 224), 2)
+            for point in points.tolist():
+                cv2.circle(img, point, 3, (0, 0, 255), cv2.FILLED)
+            cv2.rectangle(img, (bbox[0] - 20, bbox[1] - 20),
+                          (bbox[0] + bbox[2] + 20, bbox[1] + bbox[3] + 20),
+                          (255, 0, 255), 2)
+            cv2.putText(img, myHand.type, (bbox[0] - 30, bbox[1] - 30), cv2.FONT_HERSHEY_PLAIN,
+                        2, (255, 0, 255), 2)
 
     def fingersUp(self, myHand):
         """
         Finds how many fingers are open and returns in a list.
-        Considers left and right hands separately
+        The thumb is open when its tip is right of its IP joint (in image
+        coordinates), the other fingers when their tip is above their PIP joint.
         :return: List of which fingers are up
         """
-        fingers = []
-        myHandType = myHand["type"]
-        myLmList = myHand["lmList"]
-        if self.results.multi_hand_landmarks:
-
-            # Thumb
-            if myHandType == "Right":
-                if myLmList[self.tipIds[0]][0] > myLmList[self.tipIds[0] - 1][0]:
-                    fingers.append(1)
-                else:
-                    fingers.append(0)
-            else:
-                if myLmList[self.tipIds[0]][0] > myLmList[self.tipIds[0] - 1][0]:
-                    fingers.append(1)
-                else:
-                    fingers.append(0)
-
-            # 4 Fingers
-            for id in range(1, 5):
-                if myLmList[self.tipIds[id]][1] < myLmList[self.tipIds[id] - 2][1]:
-                    fingers.append(1)
-                else:
-                    fingers.append(0)
-        return fingers
+        if len(myHand.landmarks) == 0:
+            return []
+        return fingerStates(myHand.landmarks).astype(int).tolist()
 
     def findDistance(self, p1, p2, img=None, color=(255, 0, 255), scale=5):
         """
@@ -143,8 +472,8 @@ class HandDetector:
                  Line information
         """
 
-        x1, y1 = p1
-        x2, y2 = p2
+        x1, y1 = int(p1[0]), int(p1[1])
+        x2, y2 = int(p2[0]), int(p2[1])
         cx, cy = (x1 + x2) // 2, (y1 + y2) // 2
         length = math.hypot(x2 - x1, y2 - y1)
         info = (x1, y1, x2, y2, cx, cy)
@@ -156,25 +485,28 @@ class HandDetector:
 
         return length, info, img
 
-    def findPosition(self, img, handNo=0, draw=False):
-        self.lmlist = []
-
-        if self.results.multi_hand_landmarks:
-            myHand = self.results.multi_hand_landmarks[handNo]
-            for id, lm in enumerate(myHand.landmark):
-                h, w, c = img.shape
-                cx, cy = int(lm.x * w), int(lm.y * h)
-                self.lmlist.append([id, cx, cy])
-                if draw:
-                    cv2.circle(img, (cx, cy), 15, (255, 255, 0), cv2.FILLED)
-        return self.lmlist
+    def findPosition(self, myHand, img=None, draw=False):
+        """
+        Landmarks of a hand as [id, x, y] lists
+        :param myHand: Hand returned by findHands or detect
+        """
+        lmList = [[id, x, y] for id, (x, y) in enumerate(myHand.landmarks[:, :2].tolist())]
+        if draw and img is not None:
+            for _, cx, cy in lmList:
+                cv2.circle(img, (cx, cy), 15, (255, 255, 0), cv2.FILLED)
+        return lmList
 
-    def findAngle(self, img, p1, p2, p3, draw=True):
+    def findAngle(self, img, myHand, p1, p2, p3, draw=True):
+        """
+        Angle in degrees at landmark p2 between p1 and p3 of a hand
+        :param myHand: Hand returned by findHands or detect, or its landmark array
+        """
 
         # Get the landmarks
-        x1, y1 = self.lmList[p1][1:]
-        x2, y2 = self.lmList[p2][1:]
-        x3, y3 = self.lmList[p3][1:]
+        landmarks = myHand.landmarks if isinstance(myHand, Hand) else np.asarray(myHand)
+        x1, y1 = landmarks[p1, :2].tolist()
+        x2, y2 = landmarks[p2, :2].tolist()
+        x3, y3 = landmarks[p3, :2].tolist()
 
         # Calculate the Angle
         angle = math.degrees(math.atan2(y3 - y2, x3 - x2) -
@@ -2,14 +2,47 @@ import cv2
 import numpy as np
 import os
 import traceback
-from cvzone.HandTrackingModule import HandDetector as hd
+from HandGestureDetector import HandDetector as hd
+from gesture_engine import Gesture, GestureEngine
+from async_detection import AsyncDetector
+from frame_buffers import FrameBuffers
+from frame_preprocess import FramePreprocessor
+from render_space import RenderSpace
+
+# Resolution MediaPipe runs at, landmarks are mapped back to frame pixels
+DETECTION_SIZE = (640, 360)
+
+# Hand detections per second, frames in between use predicted landmarks
+DETECTION_RATE = 15
+
+GESTURES = GestureEngine({
+    'previous_slide': Gesture(fingers=(1, 0, 0, 0, 0)),    # Only thumb up
+    'next_slide': Gesture(fingers=(0, 0, 0, 0, 1)),        # Only pinky up
+    'pointer': Gesture(fingers=(None, 1, 1, 0, 0)),        # Index and middle fingers up
+    'draw': Gesture(fingers=(None, 1, 0, 0, 0)),           # Only index finger up
+    'clear_last': Gesture(fingers=(0, 1, 1, 1, 0)),        # Index, middle and ring fingers up
+    'clear_all': Gesture(fingers=(1, 1, 1, 1, 1)),         # All fingers up
+})
 
 
 class PresentationController:
+    accepts_encoded_frames = True  # JPEG frames are decoded by FramePreprocessor
+
     def __init__(self, wCam=1280, hCam=720):
         self.wCam = wCam
         self.hCam = hCam
-        self.detector = hd(maxHands=1)
+        self.detector = hd(maxHands=1, motionGate=True, detectionSize=DETECTION_SIZE, tracking=True,
+                           smoothing=True, detectionRate=DETECTION_RATE)
+        # Slides and gestures use wCam x hCam coordinates, the slide renders at the negotiated size
+        self.space = RenderSpace((wCam, hCam))
+        # The camera is only shown as a small preview, so frames are decoded and
+        # mirrored at preview size. Hands are still reported in slide coordinates
+        self.ws, self.hs = 213, 120  # Webcam preview size, in slide coordinates
+        self.preprocess = FramePreprocessor(display_size=self.space.point(self.ws, self.hs),
+                                            detection_size=DETECTION_SIZE, landmark_size=self.space.logical_size)
+        self.buffers = FrameBuffers()
+        self.hand_detection = AsyncDetector(self.detect_hands, predict=self.detector.predictHands,
+                                            release=self.preprocess.release, name='ppt-hand-detection')
 
         # Setup presentation folder and images
         self.project_root = os.path.abspath(os.path.join(os.path.dirname(__file__)))
@@ -37,7 +70,6 @@ class PresentationController:
         self.img_number = 0
 
         # Controller settings
-        self.ws, self.hs = 213, 120  # Webcam preview size
         self.threshold = 425  # Gesture threshold line
         self.buttonPressed = False
         self.buttonCounter = 0
@@ -101,9 +133,10 @@ class PresentationController:
             if not self.images:
                 return self.create_blank_slide("No slides available")
 
-            # Use cached slide if same slide number
+            # Use cached slide if same slide number. Annotations are drawn on the
+            # returned frame, so it is a copy into a session buffer
             if self.img_number == self.last_img_number and self.current_slide is not None:
-                return self.current_slide.copy()
+                return self.buffers.copy('slide', self.current_slide, copies=2)
 
             current_image_path = os.path.join(self.folder, self.images[self.img_number])
 
@@ -116,14 +149,11 @@ class PresentationController:
                 print(f"Failed to load image: {current_image_path}")
                 return self.create_blank_slide(f"Failed to load slide {self.img_number + 1}")
 
-            # Resize to fit screen
-            img_current = cv2.resize(img_current, (self.wCam, self.hCam))
-
-            # Cache the slide
-            self.current_slide = img_current.copy()
+            # Resize to fit screen and cache the slide
+            self.current_slide = cv2.resize(img_current, self.space.size, interpolation=cv2.INTER_AREA)
             self.last_img_number = self.img_number
 
-            return img_current
+            return self.buffers.copy('slide', self.current_slide, copies=2)
 
         except Exception as e:
             print(f"Error loading image: {e}")
@@ -131,85 +161,93 @@ class PresentationController:
 
     def create_blank_slide(self, message):
         """Create a blank slide with a message"""
-        slide = np.ones((self.hCam, self.wCam, 3), dtype=np.uint8) * 240
-        cv2.putText(slide, message, (self.wCam // 4, self.hCam // 2),
-                    cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 0), 2)
+        slide = np.full(self.space.shape(), 240, dtype=np.uint8)
+        self.space.putText(slide, message, (self.wCam // 4, self.hCam // 2),
+                           cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 0), 2)
         return slide
 
+    def detect_hands(self, img):
+        """Run on the detection thread for the newest frame"""
+        hands, _ = self.detector.findHands(img, draw=False)
+        return hands
+
     def process_frame(self, frame):
         """Process a frame and return the combined presentation frame"""
         if not self.is_running or frame is None:
             return None
 
         try:
-            # Resize and flip the input frame
-            img = cv2.resize(frame, (self.wCam, self.hCam))
-            img = cv2.flip(img, 1)
+            # Hands are detected on their own thread in the unmirrored detection
+            # image, render with the newest ones. The detection image is made
+            # first, the preview then reuses its reduced decode
+            self.hand_detection.submit(self.preprocess.detection(frame))
+            hands = self.hand_detection.latest([])
+
+            # Webcam preview, resized and flipped in one pass
+            img = self.preprocess.display(frame)
 
             # Load the current presentation slide
             img_current = self.load_image()
 
-            # Find hands in the webcam feed
-            hands, img = self.detector.findHands(img)
+            self.draw_preview_hands(img, hands)
 
             # Draw threshold line for gesture area
-            cv2.line(img, (0, self.threshold), (self.wCam, self.threshold), (0, 255, 0), 10)
+            cv2.line(img, self.to_preview(0, self.threshold), self.to_preview(self.wCam, self.threshold),
+                     (0, 255, 0), 2)
 
             # Add instruction text
-            cv2.putText(img, "Gesture Area (above green line)", (10, self.threshold - 20),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+            self.preview_text(img, "Gesture Area (above green line)", (10, self.threshold - 20),
+                              cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
 
             # Process hand gestures
             if hands and len(hands) > 0:
-                fingers = self.detector.fingersUp(hands[0])
+                gestures = GESTURES.evaluate(hands)
 
                 if not self.buttonPressed:
-                    cx, cy = hands[0]['center']
+                    cx, cy = hands[0].center
 
                     # Check if hand is above threshold line (for slide navigation)
                     if cy <= self.threshold:
-                        if fingers[0] and not any(fingers[1:]):  # Only thumb up
+                        if gestures.isGesture('previous_slide'):
                             self.change_slide(-1)
-                            cv2.putText(img, "Previous Slide", (50, 50),
-                                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-                        elif fingers[4] and not any(fingers[:4]):  # Only pinky up
+                            self.preview_text(img, "Previous Slide", (50, 50),
+                                              cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+                        elif gestures.isGesture('next_slide'):
                             self.change_slide(1)
-                            cv2.putText(img, "Next Slide", (50, 50),
-                                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+                            self.preview_text(img, "Next Slide", (50, 50),
+                                              cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
 
                     # Handle drawing and annotations (anywhere on screen)
-                    if len(hands[0]['lmList']) >= 9:  # Make sure we have finger positions
-                        x1, y1 = self.map_coordinates(hands[0]['lmList'][8][0], hands[0]['lmList'][8][1])
+                    if len(hands[0].landmarks) >= 9:  # Make sure we have finger positions
+                        x1, y1 = self.map_coordinates(*hands[0].landmarks[8, :2].tolist())
 
                         # Different gestures for different actions
-                        if fingers[1] and fingers[2] and not fingers[3] and not fingers[
-                            4]:  # Index and middle fingers up - pointer
+                        if gestures.isGesture('pointer'):
                             self.annotationsFlag = False
-                            cv2.circle(img_current, (x1, y1), 20, (0, 255, 0), 3)
-                            cv2.circle(img_current, (x1, y1), 5, (0, 255, 0), -1)
-                            cv2.putText(img, "Pointer Mode", (50, 100),
-                                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+                            self.space.circle(img_current, (x1, y1), 20, (0, 255, 0), 3)
+                            self.space.circle(img_current, (x1, y1), 5, (0, 255, 0), -1)
+                            self.preview_text(img, "Pointer Mode", (50, 100),
+                                              cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
 
-                        elif fingers[1] and not fingers[2] and not fingers[3] and not fingers[
-                            4]:  # Only index finger up - draw
+                        elif gestures.isGesture('draw'):
                             self.draw_annotation(x1, y1, img_current)
-                            cv2.putText(img, "Drawing Mode", (50, 100),
-                                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
+                            self.preview_text(img, "Drawing Mode", (50, 100),
+                                              cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
                         else:
                             # No specific drawing gesture - stop drawing
                             self.annotationsFlag = False
 
                         # Clear last annotation - peace sign (index, middle, ring fingers)
-                        if fingers == [0, 1, 1, 1, 0]:
+                        if gestures.isGesture('clear_last'):
                             self.remove_last_annotation()
-                            cv2.putText(img, "Cleared Last Annotation", (50, 150),
-                                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 0, 0), 2)
+                            self.preview_text(img, "Cleared Last Annotation", (50, 150),
+                                              cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 0, 0), 2)
 
                         # Clear all annotations - all fingers up
-                        elif fingers == [1, 1, 1, 1, 1]:
+                        elif gestures.isGesture('clear_all'):
                             self.clear_all_annotations()
-                            cv2.putText(img, "Cleared All Annotations", (50, 150),
-                                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 0, 0), 2)
+                            self.preview_text(img, "Cleared All Annotations", (50, 150),
+                                              cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 0, 0), 2)
 
             # Handle button cooldown
             if self.buttonPressed:
@@ -221,29 +259,30 @@ class PresentationController:
             # Draw all saved annotations
             self.draw_annotations(img_current)
 
-            # Add webcam preview to presentation (top-right corner)
-            img_small = cv2.resize(img, (self.ws, self.hs))
+            # Add webcam preview to presentation (top-right corner), in render pixels
+            img_small = img
             h, w = img_small.shape[:2]
+            width = self.space.width
 
             # Add border to webcam preview
-            cv2.rectangle(img_current, (self.wCam - w - 5, 0), (self.wCam, h + 5), (255, 255, 255), 2)
-            img_current[5:h + 5, self.wCam - w:self.wCam] = img_small
+            cv2.rectangle(img_current, (width - w - 5, 0), (width, h + 5), (255, 255, 255), 2)
+            img_current[5:h + 5, width - w:width] = img_small
 
             # Display slide information
             slide_info = f"Slide: {self.img_number + 1}/{len(self.images)}"
-            cv2.putText(img_current, slide_info, (50, 50),
-                        cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+            self.space.putText(img_current, slide_info, (50, 50),
+                               cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
 
             # Display current slide name
             if self.images:
                 slide_name = os.path.splitext(self.images[self.img_number])[0]
-                cv2.putText(img_current, slide_name, (50, 85),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (200, 200, 200), 1)
+                self.space.putText(img_current, slide_name, (50, 85),
+                                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (200, 200, 200), 1)
 
             # Display controls help
             help_text = "Controls: Thumb=Prev | Pinky=Next | Index=Draw | 2Fingers=Point"
-            cv2.putText(img_current, help_text, (50, self.hCam - 30),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (150, 150, 150), 1)
+            self.space.putText(img_current, help_text, (50, self.hCam - 30),
+                               cv2.FONT_HERSHEY_SIMPLEX, 0.5, (150, 150, 150), 1)
 
             return img_current
 
@@ -272,6 +311,33 @@ class PresentationController:
             self.annotationsFlag = False
             print(f"Changed to slide {self.img_number + 1}/{len(self.images)}")
 
+    def to_preview(self, x, y):
+        """Slide coordinates to pixels of the webcam preview"""
+        ws, hs = self.preprocess.display_size
+        return int(x * ws / self.wCam), int(y * hs / self.hCam)
+
+    def preview_text(self, img, text, org, font, scale, color, thickness):
+        """cv2.putText on the webcam preview, with position and size given at slide scale"""
+        factor = self.preprocess.display_size[0] / self.wCam
+        cv2.putText(img, text, self.to_preview(*org), font, scale * factor, color,
+                    max(1, int(thickness * factor)))
+
+    def draw_preview_hands(self, img, hands):
+        """Hand skeletons on the webcam preview"""
+        ws, hs = self.preprocess.display_size
+        scale = np.array([ws / self.wCam, hs / self.hCam], np.float32)
+        for hand in hands:
+            points = (hand.landmarks[:, :2] * scale).astype(np.int32)
+            cv2.polylines(img, list(points[self.detector.connections]), False, (224, 224, 224), 1)
+            for point in points.tolist():
+                cv2.circle(img, point, 1, (0, 0, 255), cv2.FILLED)
+
+    def set_render_size(self, size):
+        """Render slides at size, called when the session negotiates its output size"""
+        if self.space.resize(size):
+            self.preprocess.display_size = self.space.point(self.ws, self.hs)
+            self.last_img_number = -1  # Cached slide is at the previous size
+
     def map_coordinates(self, x1, y1):
         """Map hand coordinates to presentation coordinates"""
         # Map the coordinates from webcam space to slide space
@@ -293,7 +359,7 @@ class PresentationController:
                 self.annotations.append([])
 
             # Draw the annotation point
-            cv2.circle(img_current, (x1, y1), 8, (0, 0, 255), -1)
+            self.space.circle(img_current, (x1, y1), 8, (0, 0, 255), -1)
             self.annotations[self.annotationsNumber].append((x1, y1))
 
         except Exception as e:
@@ -329,7 +395,7 @@ class PresentationController:
                     if j > 0:
                         pt1 = tuple(map(int, self.annotations[i][j - 1]))
                         pt2 = tuple(map(int, self.annotations[i][j]))
-                        cv2.line(img_current, pt1, pt2, (0, 0, 200), 8)
+                        self.space.line(img_current, pt1, pt2, (0, 0, 200), 8)
         except Exception as e:
             print(f"Error drawing annotations: {e}")
 
@@ -374,4 +440,20 @@ class PresentationController:
     def stop(self):
         """Clean up resources"""
         self.is_running = False
-        print("Presentation controller stopped")
\ No newline at end of file
+        self.hand_detection.stop()
+        self.detector.close()
+        self.buffers.clear()
+        print("Presentation controller stopped")
+
+    def reset(self):
+        """Return to the first slide without annotations, keeping the detector"""
+        self.img_number = 0
+        self.buttonPressed = False
+        self.buttonCounter = 0
+        self.annotations = [[]]
+        self.annotationsNumber = -1
+        self.annotationsFlag = False
+        self.current_slide = None
+        self.last_img_number = -1
+        self.hand_detection.reset(clear=self.detector.reset)
+        self.is_running = True
\ No newline at end of file
@@ -1,15 +1,57 @@
 import cv2
-import cvzone
 import numpy as np
 import time
 import os
 import random
-from cvzone.HandTrackingModule import HandDetector
-import threading
-from collections import deque
+from HandGestureDetector import HandDetector
+from async_detection import AsyncDetector
+from frame_buffers import FrameBuffers
+from frame_preprocess import FramePreprocessor
+from render_space import RenderSpace
+
+# Resolution MediaPipe runs at, landmarks are mapped back to frame pixels
+DETECTION_SIZE = (640, 360)
+
+# Hand detections per second, the paddles follow predicted landmarks in between
+DETECTION_RATE = 10
+
+# Court limits in logical (1280x720) coordinates, the game renders at the session's size
+BAT_Y_RANGE = (20, 415)
+BALL_Y_RANGE = (10, 500)
+BALL_X_RANGE = (10, 1200)
+
+
+def png_layers(img_front):
+    """
+    Blend weights of a BGRA sprite, computed once per sprite for overlay_png:
+    (1 - alpha) for the background and the color already weighted by alpha
+    """
+    alpha = img_front[..., 3:] / 255.0
+    return 1.0 - alpha, img_front[..., :3] * alpha
+
+
+def overlay_png(img_back, layers, pos):
+    """
+    Alpha-blend a sprite prepared by png_layers onto img_back in place. Same
+    result as cvzone.overlayPNG, but only the sprite's area is touched and the
+    sprite's weights are not recomputed for every frame.
+    """
+    inv_alpha, front = layers
+    hf, wf = front.shape[:2]
+    hb, wb = img_back.shape[:2]
+    x, y = int(pos[0]), int(pos[1])
+    x0, y0, x1, y1 = max(x, 0), max(y, 0), min(x + wf, wb), min(y + hf, hb)
+    if x0 >= x1 or y0 >= y1:
+        return img_back
+    roi = img_back[y0:y1, x0:x1]
+    blend = roi * inv_alpha[y0 - y:y1 - y, x0 - x:x1 - x] + front[y0 - y:y1 - y, x0 - x:x1 - x]
+    np.copyto(roi, blend, casting='unsafe')  # Truncates like cvzone's assignment into uint8
+    return img_back
 
 
 class PongGame:
+    accepts_encoded_frames = True  # JPEG frames are decoded by FramePreprocessor
+
     def __init__(self):
         # Initialize camera
         self.cam = cv2.VideoCapture(0)
@@ -27,6 +69,10 @@ class PongGame:
         self.img_bat1 = self.load_image('bat1.png', alpha=True)
         self.img_bat2 = self.load_image('bat2.png', alpha=True)
 
+        # Game state and assets are laid out in 1280x720, rendered at the session's size
+        self.space = RenderSpace()
+        self.scale_assets()
+
         # Game state variables
         self.ball_pos = [100, 100]
         self.speed_x = 20
@@ -42,7 +88,9 @@ class PongGame:
         self.countdownFlag = False
 
         # Hand detector with optimized settings for performance
-        self.detector = HandDetector(detectionCon=0.6, maxHands=2)
+        self.detector = HandDetector(detectionCon=0.6, maxHands=2, motionGate=True,
+                                     detectionSize=DETECTION_SIZE, tracking=True, smoothing=True,
+                                     detectionRate=DETECTION_RATE)
         self.last_frame = None
 
         # Powerup variables
@@ -55,19 +103,18 @@ class PongGame:
         self.frame_skip_counter = 0
         self.last_hands = []
         self.last_hand_time = time.time()
-        self.hand_detection_interval = 0.1  # Detect hands every 100ms instead of every frame
 
         # Frame rate control
         self.target_fps = 30
         self.frame_time = 1.0 / self.target_fps
         self.last_process_time = time.time()
 
-        # Threading for hand detection
-        self.hand_detection_thread = None
-        self.hand_detection_active = False
-        self.current_hands = []
-        self.hands_lock = threading.Lock()
-        self.frame_queue = deque(maxlen=2)  # Keep only latest frames
+        # Hand detection runs on its own thread, fed with the newest frame
+        self.preprocess = FramePreprocessor(display_size=self.space.size, detection_size=DETECTION_SIZE,
+                                            landmark_size=self.space.logical_size)
+        self.buffers = FrameBuffers()
+        self.hand_detection = AsyncDetector(self.detect_hands, predict=self.detector.predictHands,
+                                            release=self.preprocess.release, name='pong-hand-detection')
 
         # Performance monitoring
         self.frame_count = 0
@@ -127,36 +174,27 @@ class PongGame:
 
         return img
 
-    def hand_detection_worker(self):
-        """Background thread worker for hand detection"""
-        while self.hand_detection_active:
-            try:
-                if len(self.frame_queue) > 0:
-                    frame = self.frame_queue[-1]  # Get latest frame
-                    hands, _ = self.detector.findHands(frame, draw=False, flipType=False)
-
-                    with self.hands_lock:
-                        self.current_hands = hands if hands else []
-
-                # Control detection frequency
-                time.sleep(self.hand_detection_interval)
-
-            except Exception as e:
-                print(f"Hand detection error: {e}")
-                time.sleep(0.1)
-
-    def start_hand_detection_thread(self):
-        """Start the background hand detection thread"""
-        if self.hand_detection_thread is None or not self.hand_detection_thread.is_alive():
-            self.hand_detection_active = True
-            self.hand_detection_thread = threading.Thread(target=self.hand_detection_worker, daemon=True)
-            self.hand_detection_thread.start()
-
-    def stop_hand_detection_thread(self):
-        """Stop the background hand detection thread"""
-        self.hand_detection_active = False
-        if self.hand_detection_thread and self.hand_detection_thread.is_alive():
-            self.hand_detection_thread.join(timeout=1.0)
+    def scale_assets(self):
+        """Background, game over screen and sprites at render size"""
+        self.sprites = {
+            'background': self.space.image(self.img_background, self.space.logical_size),
+            'game_over': self.space.image(self.img_game_over, self.space.logical_size),
+            'ball': png_layers(self.space.image(self.img_ball)),
+            'bat1': png_layers(self.space.image(self.img_bat1)),
+            'bat2': png_layers(self.space.image(self.img_bat2))
+        }
+
+    def set_render_size(self, size):
+        """Render at the size negotiated for the session, the game stays in 1280x720"""
+        if self.space.resize(size):
+            self.preprocess.display_size = self.space.size
+            self.scale_assets()
+            self.last_frame = None
+
+    def detect_hands(self, img):
+        """Run on the detection thread for the newest frame"""
+        hands, _ = self.detector.findHands(img, draw=False, flipType=False)
+        return hands
 
     def reset(self):
         """Reset game state"""
@@ -182,6 +220,11 @@ class PongGame:
         self.frame_count = 0
         self.fps_start_time = time.time()
 
+        # Also used to recycle the instance for a new session
+        self.is_running = True
+        self.last_frame = None
+        self.hand_detection.reset(clear=self.detector.reset)
+
         print("Game reset!")
 
     def start_countdown(self):
@@ -207,16 +250,16 @@ class PongGame:
     def draw_bats(self, img, hands):
         """Draw player bats based on hand positions"""
         for hand in hands:
-            x, y, w, h = hand['bbox']
+            x, y, w, h = hand.bbox
             h1, w1 = self.img_bat1.shape[:2]
             y1 = y - h1 // 2
-            y1 = np.clip(y1, 20, 415)
+            y1 = np.clip(y1, *BAT_Y_RANGE)
 
-            if hand['type'] == 'Left':
+            if hand.type == 'Left':
                 if self.powerup_hand == 'Left':
                     # Double bat for powerup
-                    img = cvzone.overlayPNG(img, self.img_bat1, (59, y1))
-                    img = cvzone.overlayPNG(img, self.img_bat1, (59, y1 + (h1 - 30)))
+                    img = overlay_png(img, self.sprites['bat1'], self.space.point(59, y1))
+                    img = overlay_png(img, self.sprites['bat1'], self.space.point(59, y1 + (h1 - 30)))
                     # Collision detection for double bat
                     if 59 - 10 < self.ball_pos[0] < 59 + w1 and y1 - (h1 // 2) < self.ball_pos[1] < y1 + (h1 * 2):
                         self.speed_x = abs(self.speed_x)  # Ensure ball goes right
@@ -224,18 +267,18 @@ class PongGame:
                         self.score[0] += 1
                 else:
                     # Normal bat
-                    img = cvzone.overlayPNG(img, self.img_bat1, (59, y1))
+                    img = overlay_png(img, self.sprites['bat1'], self.space.point(59, y1))
                     # Collision detection
                     if 59 - 10 < self.ball_pos[0] < 59 + w1 and y1 - (h1 // 2) < self.ball_pos[1] < y1 + (h1 // 2):
                         self.speed_x = abs(self.speed_x)  # Ensure ball goes right
                         self.ball_pos[0] = 59 + w1 + 5  # Move ball away from bat
                         self.score[0] += 1
 
-            if hand['type'] == 'Right':
+            if hand.type == 'Right':
                 if self.powerup_hand == 'Right':
                     # Double bat for powerup
-                    img = cvzone.overlayPNG(img, self.img_bat2, (1195, y1))
-                    img = cvzone.overlayPNG(img, self.img_bat2, (1195, y1 + (h1 - 30)))
+                    img = overlay_png(img, self.sprites['bat2'], self.space.point(1195, y1))
+                    img = overlay_png(img, self.sprites['bat2'], self.space.point(1195, y1 + (h1 - 30)))
                     # Collision detection for double bat
                     if 1120 < self.ball_pos[0] < 1170 + w1 and y1 - (h1 // 2) < self.ball_pos[1] < y1 + (h1 * 2):
                         self.speed_x = -abs(self.speed_x)  # Ensure ball goes left
@@ -243,7 +286,7 @@ class PongGame:
                         self.score[1] += 1
                 else:
                     # Normal bat
-                    img = cvzone.overlayPNG(img, self.img_bat2, (1195, y1))
+                    img = overlay_png(img, self.sprites['bat2'], self.space.point(1195, y1))
                     # Collision detection
                     if 1120 < self.ball_pos[0] < 1170 + w1 and y1 - (h1 // 2) < self.ball_pos[1] < y1 + (h1 // 2):
                         self.speed_x = -abs(self.speed_x)  # Ensure ball goes left
@@ -266,37 +309,32 @@ class PongGame:
     def process_frame(self, frame):
         """Process a single frame - main method called by the backend"""
         if not self.is_running:
-            return self.last_frame if self.last_frame is not None else np.zeros((720, 1280, 3), np.uint8)
+            return self.last_frame if self.last_frame is not None else self.space.blank()
 
         # Frame rate control - skip processing if too soon
         current_time = time.time()
         if current_time - self.last_process_time < self.frame_time:
-            return self.last_frame if self.last_frame is not None else np.zeros((720, 1280, 3), np.uint8)
+            return self.last_frame if self.last_frame is not None else self.space.blank()
 
         self.last_process_time = current_time
 
         # Calculate FPS
         self.calculate_fps()
 
-        # Use the provided frame instead of capturing from camera
-        img = frame.copy()
-        img = cv2.flip(img, 1)
-        img = cv2.resize(img, (1280, 720))  # Ensure consistent size
-        img_raw = img.copy()
-
-        # Start hand detection thread if not already running
-        if not self.hand_detection_active:
-            self.start_hand_detection_thread()
+        # Mirrored view at a consistent size, for the background blend and thumbnail
+        img_raw = self.preprocess.display(frame)
 
-        # Add frame to queue for hand detection
-        self.frame_queue.append(img_raw.copy())
+        # Hand detection runs on its own thread, on the unmirrored detection image
+        self.hand_detection.submit(self.preprocess.detection(frame))
 
-        # Get current hands from background thread
-        with self.hands_lock:
-            hands = self.current_hands.copy()
+        # Hands detected by the background thread, extrapolated to this frame
+        # so the paddles move smoothly between detections
+        hands = self.hand_detection.latest([])
 
-        # Add background
-        img = cv2.addWeighted(img, 0.2, self.img_background, 0.8, 0)
+        # Add background. The frame is returned and kept as last_frame, so it
+        # alternates between two session buffers
+        img = self.buffers.like('frame', img_raw, copies=2)
+        cv2.addWeighted(img_raw, 0.2, self.sprites['background'], 0.8, 0, dst=img)
 
         # Handle countdown
         if not self.countdownFlag:
@@ -305,7 +343,7 @@ class PongGame:
             self.update_countdown()
 
             if self.countdown_active:
-                cv2.putText(img, str(self.countdown_time), (600, 360), cv2.FONT_HERSHEY_COMPLEX, 5, (0, 255, 0), 10)
+                self.space.putText(img, str(self.countdown_time), (600, 360), cv2.FONT_HERSHEY_COMPLEX, 5, (0, 255, 0), 10)
             else:
                 self.countdownFlag = True  # Countdown finished
 
@@ -320,45 +358,48 @@ class PongGame:
             self.ball_pos[1] += self.speed_y
 
             # Ball collision with top and bottom walls
-            if self.ball_pos[1] >= 500 or self.ball_pos[1] <= 10:
+            if self.ball_pos[1] >= BALL_Y_RANGE[1] or self.ball_pos[1] <= BALL_Y_RANGE[0]:
                 self.speed_y *= -1
 
             # Check for game over (ball out of bounds)
-            if self.ball_pos[0] < 10:
+            if self.ball_pos[0] < BALL_X_RANGE[0]:
                 # Player 2 wins
                 self.game_over = True
                 print(f"Game Over! Player 2 wins with score: {max(self.score)}")
-            elif self.ball_pos[0] > 1200:
+            elif self.ball_pos[0] > BALL_X_RANGE[1]:
                 # Player 1 wins
                 self.game_over = True
                 print(f"Game Over! Player 1 wins with score: {max(self.score)}")
 
         # Draw game elements
         if self.game_over:
-            img = self.img_game_over.copy()
-            cv2.putText(img, str(max(self.score[0], self.score[1])).zfill(2), (585, 360), cv2.FONT_HERSHEY_COMPLEX, 3,
-                        (200, 0, 200), 5)
+            img = self.buffers.copy('game_over', self.sprites['game_over'], copies=2)
+            self.space.putText(img, str(max(self.score[0], self.score[1])).zfill(2), (585, 360), cv2.FONT_HERSHEY_COMPLEX, 3,
+                               (200, 0, 200), 5)
         else:
             # Draw scores
-            cv2.putText(img, str(self.score[0]), (300, 650), cv2.FONT_HERSHEY_COMPLEX, 3, (255, 255, 255), 5)
-            cv2.putText(img, str(self.score[1]), (900, 650), cv2.FONT_HERSHEY_COMPLEX, 3, (255, 255, 255), 5)
+            self.space.putText(img, str(self.score[0]), (300, 650), cv2.FONT_HERSHEY_COMPLEX, 3, (255, 255, 255), 5)
+            self.space.putText(img, str(self.score[1]), (900, 650), cv2.FONT_HERSHEY_COMPLEX, 3, (255, 255, 255), 5)
 
             # Draw ball
             if self.countdownFlag:  # Only show ball after countdown
-                img = cvzone.overlayPNG(img, self.img_ball, self.ball_pos)
+                img = overlay_png(img, self.sprites['ball'], self.space.point(*self.ball_pos))
 
         # Show webcam thumbnail (smaller to reduce processing)
         try:
-            thumbnail = cv2.resize(img_raw, (160, 90))  # Smaller thumbnail
-            img[620:710, 20:180] = thumbnail
+            rows, cols = self.space.region(20, 620, 180, 710)
+            size = (cols.stop - cols.start, rows.stop - rows.start)
+            thumbnail = self.buffers.get('thumbnail', (size[1], size[0], 3))  # Smaller thumbnail
+            cv2.resize(img_raw, size, dst=thumbnail)
+            img[rows, cols] = thumbnail
         except Exception as e:
             print(f"Thumbnail error: {e}")
 
         # Add instructions and performance info
-        cv2.putText(img, "Press 'R' to reset", (20, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-        cv2.putText(img, "Use hands as paddles", (20, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-        cv2.putText(img, f"FPS: {self.current_fps:.1f}", (20, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-        cv2.putText(img, f"Hands: {len(hands)}", (20, 120), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
+        self.space.putText(img, "Press 'R' to reset", (20, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+        self.space.putText(img, "Use hands as paddles", (20, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+        self.space.putText(img, f"FPS: {self.current_fps:.1f}", (20, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
+        self.space.putText(img, f"Hands: {len(hands)}", (20, 120), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
 
         self.last_frame = img
         return img
@@ -390,8 +431,10 @@ class PongGame:
         print("Stopping Pong Game...")
         self.is_running = False
 
-        # Stop hand detection thread
-        self.stop_hand_detection_thread()
+        # Stop hand detection thread, then hand its graph back
+        self.hand_detection.stop()
+        self.detector.close()
+        self.buffers.clear()
 
         if hasattr(self, 'cam') and self.cam and self.cam.isOpened():
             self.cam.release()
@@ -3,7 +3,27 @@ import numpy as np
 import time
 import os
 import math
-from cvzone.HandTrackingModule import HandDetector as hd
+from HandGestureDetector import HandDetector as hd
+from gesture_engine import Gesture, GestureEngine
+from landmark_filters import HandFilter
+from async_detection import AsyncDetector
+from frame_preprocess import FramePreprocessor
+from render_space import RenderSpace
+
+# Resolution MediaPipe runs at, landmarks are mapped back to frame pixels
+DETECTION_SIZE = (640, 360)
+
+# Hand detections per second, frames in between use predicted landmarks
+DETECTION_RATE = 15
+
+GESTURES = GestureEngine({
+    'move': Gesture(fingers=(None, 1, 0, None, None)),        # Index finger up, middle finger down
+    'click': Gesture(fingers=(None, 1, 1, None, None)),       # Index and middle fingers up
+    'exit': Gesture(fingers=(None, 1, 1, 1, 1)),              # All fingers up
+}, measures={'click_distance': (8, 12)})
+
+# Distance in pixels between index and middle finger tips that clicks
+CLICK_DISTANCE = 60
 
 # Virtual display setup for headless environments
 def setup_virtual_display():
@@ -58,6 +78,8 @@ except Exception as e:
     pyautogui = MockPyAutoGUI()
 
 class VirtualMouse:
+    accepts_encoded_frames = True  # JPEG frames are decoded by FramePreprocessor
+
     def __init__(self, wCam=1280, hCam=720, smoothing=10):
         self.wCam = wCam
         self.hCam = hCam
@@ -68,10 +90,23 @@ class VirtualMouse:
         self.curY = 0
         
         try:
-            self.detector = hd(maxHands=1)
+            # Higher smoothing lowers the landmark filter's cutoff: steadier cursor, more lag
+            self.detector = hd(maxHands=1, motionGate=True, detectionSize=DETECTION_SIZE, tracking=True,
+                               smoothing=HandFilter(minCutoff=15.0 / max(smoothing, 1)),
+                               detectionRate=DETECTION_RATE)
         except Exception as e:
             print(f"HandDetector initialization failed: {e}")
             self.detector = None
+
+        # UI and hands are laid out in a wCam x hCam space, rendered at the session's size
+        self.space = RenderSpace((wCam, hCam))
+
+        # Hands are detected on their own thread, frames render with the newest ones
+        self.preprocess = FramePreprocessor(display_size=self.space.size, detection_size=DETECTION_SIZE,
+                                            landmark_size=self.space.logical_size)
+        self.hand_detection = AsyncDetector(self.detect_hands, predict=self.detector.predictHands,
+                                            release=self.preprocess.release,
+                                            name='mouse-hand-detection') if self.detector else None
             
         self.wScr, self.hScr = pyautogui.size()
         self.mode = 'normal'  # Can be 'normal' or 'finger'
@@ -89,6 +124,17 @@ class VirtualMouse:
         
         print(f"VirtualMouse initialized - PyAutoGUI Available: {self.pyautogui_available}")
 
+    def detect_hands(self, img):
+        """Run on the detection thread for the newest frame"""
+        hands, _ = self.detector.findHands(img, draw=False)
+        return hands
+
+    def set_render_size(self, size):
+        """Render at the size negotiated for the session, the layout stays in wCam x hCam"""
+        if self.space.resize(size):
+            self.preprocess.display_size = self.space.size
+            self.last_frame = None
+
     def set_mode(self, mode):
         if mode in ['normal', 'finger']:
             self.mode = mode
@@ -115,73 +161,71 @@ class VirtualMouse:
             return None
 
         if img is None:
-            return self.last_frame if self.last_frame is not None else np.zeros((self.hCam, self.wCam, 3), np.uint8)
-
-        # Flip the image horizontally for a more intuitive mirror view
-        img = cv2.flip(img, 1)
-
-        # Find hands in the frame only if detector is available
-        if self.detector:
-            try:
-                hands, img = self.detector.findHands(img)
-            except Exception as e:
-                print(f"Hand detection error: {e}")
-                hands = []
+            return self.last_frame if self.last_frame is not None else self.space.blank()
+
+        # Mirrored view to draw on; hands are found in the unmirrored detection
+        # image, only if detector is available
+        frame, img = img, self.preprocess.display(img)
+        if self.hand_detection:
+            self.hand_detection.submit(self.preprocess.detection(frame))
+            hands = self.hand_detection.latest([])
+            self.detector.drawHands(img, hands, self.space)
         else:
             hands = []
 
         if hands:
             # Get the landmark list for the first hand
             hand = hands[0]
-            self.lmList = hand["lmList"]
+            self.lmList = hand.landmarks
 
             if len(self.lmList) > 0:
                 # Get index and middle finger tips
-                x1, y1 = self.lmList[8][0:2]
-                x2, y2 = self.lmList[12][0:2]
+                x1, y1 = self.lmList[8, :2].tolist()
+                x2, y2 = self.lmList[12, :2].tolist()
 
-                # Check which fingers are up
-                self.fingers = self.detector.fingersUp(hand)
+                # Check which fingers are up and which gestures they form
+                gestures = GESTURES.evaluate(hands)
+                self.fingers = gestures.fingersUp()
 
                 # Draw rectangle for the interactive area
-                cv2.rectangle(img, (100, 100), (self.wCam - 50, self.hCam - 50), (255, 255, 0), 3)
+                self.space.rectangle(img, (100, 100), (self.wCam - 50, self.hCam - 50), (255, 255, 0), 3)
 
                 if self.mode == 'normal':
                     # Moving mode - Index finger up, middle finger down
-                    if self.fingers[1] and not self.fingers[2]:
+                    if gestures.isGesture('move'):
                         self.move_mouse(x1, y1, img)
 
                     # Clicking mode - Both index and middle fingers up
-                    if self.fingers[1] and self.fingers[2]:
-                        self.click_mouse(x1, y1, x2, y2, img)
+                    if gestures.isGesture('click'):
+                        self.click_mouse(x1, y1, x2, y2, img, gestures.measure('click_distance'))
 
                 elif self.mode == 'finger':
                     # Alternate mode with finger visualization
-                    if self.fingers[1] and not self.fingers[2]:
+                    if gestures.isGesture('move'):
                         self.move_mouse(x1, y1, img, finger_only=True)
 
-                    if self.fingers[1] and self.fingers[2]:
-                        self.click_mouse(x1, y1, x2, y2, img)
+                    if gestures.isGesture('click'):
+                        self.click_mouse(x1, y1, x2, y2, img, gestures.measure('click_distance'))
 
                     # Exit condition (all fingers up)
-                    if self.fingers == [1, 1, 1, 1, 1] or self.fingers == [0, 1, 1, 1, 1]:
+                    if gestures.isGesture('exit'):
                         self.over = True
 
         # Display FPS
         self.display_fps(img)
 
         # Display current mode on the image
-        cv2.putText(img, f"Mode: {self.mode}", (self.wCam - 200, 50), cv2.FONT_HERSHEY_PLAIN, 2, (0, 255, 0), 2)
+        self.space.putText(img, f"Mode: {self.mode}", (self.wCam - 200, 50), cv2.FONT_HERSHEY_PLAIN, 2, (0, 255, 0), 2)
 
         # Display control status
         status = "Control: ON" if self.control_enabled else "Control: OFF"
-        cv2.putText(img, status, (self.wCam - 200, 90), cv2.FONT_HERSHEY_PLAIN, 2,
-                    (0, 255, 0) if self.control_enabled else (0, 0, 255), 2)
+        self.space.putText(img, status, (self.wCam - 200, 90), cv2.FONT_HERSHEY_PLAIN, 2,
+                           (0, 255, 0) if self.control_enabled else (0, 0, 255), 2)
 
         # Display PyAutoGUI status
         gui_status = "PyAutoGUI: OK" if self.pyautogui_available else "PyAutoGUI: MOCK"
-        cv2.putText(img, gui_status, (self.wCam - 200, 130), cv2.FONT_HERSHEY_PLAIN, 1,
-                    (0, 255, 0) if self.pyautogui_available else (255, 0, 0), 2)
+        self.space.putText(img, gui_status, (self.wCam - 200, 130), cv2.FONT_HERSHEY_PLAIN, 1,
+                           (0, 255, 0) if self.pyautogui_available else (255, 0, 0), 2)
 
         self.last_frame = img
         return img
@@ -193,7 +237,7 @@ class VirtualMouse:
 
         if finger_only:
             if self.fingers[1] and self.fingers[2]:
-                cv2.circle(img, (x1, y1), 20, (0, 0, 255), -1)
+                self.space.circle(img, (x1, y1), 20, (0, 0, 255), -1)
         else:
             # Only move the actual system mouse if control is enabled and pyautogui is available
             if self.control_enabled and self.pyautogui_available:
@@ -203,17 +247,18 @@ class VirtualMouse:
                     print(f"Mouse move error: {e}")
 
         # Visual feedback - draw a circle at the finger tip
-        cv2.circle(img, (x1, y1), 15, (255, 0, 0), cv2.FILLED)
+        self.space.circle(img, (x1, y1), 15, (255, 0, 0), cv2.FILLED)
 
-    def click_mouse(self, x1, y1, x2, y2, img):
+    def click_mouse(self, x1, y1, x2, y2, img, length=None):
         # Draw a line between index and middle finger
-        cv2.line(img, (x1, y1), (x2, y2), (255, 0, 255), 3)
+        self.space.line(img, (x1, y1), (x2, y2), (255, 0, 255), 3)
 
-        # Calculate distance between fingers
-        length = math.hypot(x2 - x1, y2 - y1)
+        # Distance between fingers, measured by the gesture engine when available
+        if length is None:
+            length = math.hypot(x2 - x1, y2 - y1)
 
         # If fingers are close enough, perform click
-        if length < 60:
+        if length < CLICK_DISTANCE:
             # Only perform the actual click if control is enabled and pyautogui is available
             if self.control_enabled and self.pyautogui_available:
                 try:
@@ -222,13 +267,13 @@ class VirtualMouse:
                     print(f"Mouse click error: {e}")
 
             # Visual feedback for click
-            cv2.circle(img, ((x1 + x2) // 2, (y1 + y2) // 2), 15, (0, 255, 0), cv2.FILLED)
+            self.space.circle(img, ((x1 + x2) // 2, (y1 + y2) // 2), 15, (0, 255, 0), cv2.FILLED)
 
     def display_fps(self, img):
         self.cTime = time.time()
         fps = 1 / (self.cTime - self.pTime) if (self.cTime - self.pTime) > 0 else 60
         self.pTime = self.cTime
-        cv2.putText(img, str(int(fps)), (20, 50), cv2.FONT_HERSHEY_PLAIN, 3, (255, 0, 255), 3)
+        self.space.putText(img, str(int(fps)), (20, 50), cv2.FONT_HERSHEY_PLAIN, 3, (255, 0, 255), 3)
 
     def handle_key_press(self, data):
         """Handle key press events from the client"""
@@ -247,9 +292,27 @@ class VirtualMouse:
     def stop(self):
         """Clean up resources"""
         self.is_running = False
+        if self.hand_detection:
+            self.hand_detection.stop()
+        if self.detector:
+            self.detector.close()
         if virtual_display:
             try:
                 virtual_display.stop()
             except:
                 pass
-        print("Virtual Mouse stopped")
\ No newline at end of file
+        print("Virtual Mouse stopped")
+
+    def reset(self):
+        """Return to the state of a new session, with mouse control disabled"""
+        self.prevX, self.prevY = 0, 0
+        self.curX, self.curY = 0, 0
+        self.mode = 'normal'
+        self.over = False
+        self.lmList = []
+        self.fingers = []
+        self.last_frame = None
+        self.control_enabled = False
+        if self.hand_detection:
+            self.hand_detection.reset(clear=self.detector.reset)
+        self.is_running = True
\ No newline at end of file
@@ -3,14 +3,43 @@ import os
 import numpy as np
 import time
 import math
-from cvzone.HandTrackingModule import HandDetector
+from HandGestureDetector import HandDetector
+from async_detection import AsyncDetector
+from frame_buffers import FrameBuffers
+from frame_preprocess import FramePreprocessor
+from render_space import RenderSpace
+from gesture_engine import Gesture, GestureEngine
 from threading import Lock
 
+# Resolution MediaPipe runs at, landmarks are mapped back to frame pixels
+DETECTION_SIZE = (640, 360)
+
+# Hand detections per second, frames in between use predicted landmarks
+DETECTION_RATE = 15
+
+GESTURES = GestureEngine({
+    'select': Gesture(fingers=(None, 1, 1, None, None)),      # Index and middle finger up
+    'draw': Gesture(fingers=(None, 1, 0, None, None)),        # Only index finger up
+    'release': Gesture(fingers=(None, 0, 0, None, None)),     # Index and middle finger down
+    'close_shape': Gesture(near=((4, 8, 160),)),              # Thumb tip pinched to index tip
+})
+
 
 class VirtualPainter:
+    accepts_encoded_frames = True  # JPEG frames are decoded by FramePreprocessor
+
     def __init__(self):
         # Reduce detection confidence for better performance
-        self.detector = HandDetector(detectionCon=0.6, maxHands=2)
+        self.detector = HandDetector(detectionCon=0.6, maxHands=2, motionGate=True,
+                                     detectionSize=DETECTION_SIZE, tracking=True,
+                                     smoothing=True, detectionRate=DETECTION_RATE)
+        # Tools, strokes and hands are laid out in 1280x720, rendered at the session's size
+        self.space = RenderSpace()
+        self.preprocess = FramePreprocessor(display_size=self.space.size, detection_size=DETECTION_SIZE,
+                                            landmark_size=self.space.logical_size)
+        self.buffers = FrameBuffers()
+        self.hand_detection = AsyncDetector(self.detect_hands, predict=self.detector.predictHands,
+                                            release=self.preprocess.release, name='paint-hand-detection')
 
         # Define standard header dimensions
         self.HEADER_HEIGHT = 104
@@ -49,8 +78,12 @@ class VirtualPainter:
                 self.header = self.create_default_header()
                 self.header_images = [self.header]
 
-        # Initialize the canvas
-        self.img_canvas = np.zeros((720, 1280, 3), np.uint8)
+        # Header at render size, see render_header
+        self.header_key = None
+        self.header_render = None
+
+        # Initialize the canvas, at render size
+        self.img_canvas = self.space.blank()
 
         # Drawing parameters
         self.xp, self.yp = 0, 0
@@ -67,6 +100,7 @@ class VirtualPainter:
         self.line_flag = False
         self.show_options = False
         self.lm_list = []
+        self.gestures = GESTURES.evaluate([])
 
         # Shape properties
         self.circle_x1, self.circle_y1, self.radius = 0, 0, 0
@@ -103,6 +137,11 @@ class VirtualPainter:
         self.skip_frames = 0
         self.max_skip_frames = 1  # Process every other frame
 
+    def detect_hands(self, img):
+        """Run on the detection thread for the newest frame"""
+        hands, _ = self.detector.findHands(img, draw=False, flipType=False)
+        return hands
+
     def create_default_header(self):
         """Create a default header with drawing tools"""
         # Use the standard dimensions
@@ -134,10 +173,10 @@ class VirtualPainter:
     def process_frame(self, img):
         """Process a frame with hand detection for virtual painting"""
         if not self.is_running:
-            return self.last_frame if self.last_frame is not None else np.zeros((720, 1280, 3), np.uint8)
+            return self.last_frame if self.last_frame is not None else self.space.blank()
 
         if img is None:
-            return self.last_frame if self.last_frame is not None else np.zeros((720, 1280, 3), np.uint8)
+            return self.last_frame if self.last_frame is not None else self.space.blank()
 
         # Skip frames for better performance
         current_time = time.time()
@@ -148,30 +187,22 @@ class VirtualPainter:
         self.skip_frames += 1
         if self.skip_frames < self.max_skip_frames:
             # Return the last processed frame without doing heavy processing
-            return self.last_frame if self.last_frame is not None else img
+            return self.last_frame if self.last_frame is not None else self.preprocess.display(img)
 
         # Reset skip counter
         self.skip_frames = 0
         self.last_processed_time = current_time
 
-        # Flip the image horizontally for a more intuitive mirror view
-        img = cv2.flip(img, 1)
+        # Mirrored view to draw on, hands are detected on their own thread in
+        # the unmirrored detection image and render with the newest ones
+        frame, img = img, self.preprocess.display(img)
+        self.hand_detection.submit(self.preprocess.detection(frame))
 
         # Create a copy for drawing UI elements
-        ui_layer = img.copy()
-
-        # Find hands in the frame - use a lighter version if no hands were detected recently
-        if current_time - self.last_hand_detected_time > 1.0:
-            # Quick check first (faster)
-            hands_check, _ = self.detector.findHands(img, draw=False, flipType=False)
-            if hands_check:
-                # If hands are found, do the full detection
-                hands, img = self.detector.findHands(img, flipType=False)
-            else:
-                hands = []
-        else:
-            # Full detection when we expect hands to be present
-            hands, img = self.detector.findHands(img, flipType=False)
+        ui_layer = self.buffers.copy('ui_layer', img)
+
+        hands = self.hand_detection.latest([])
+        self.detector.drawHands(img, hands, self.space)
 
         # Draw UI elements
         self.draw_undo_button(ui_layer)
@@ -181,14 +212,14 @@ class VirtualPainter:
             self.last_hand_detected_time = current_time
 
             with self.lock:  # Thread safety for hand processing
-                if hands and len(hands) > 0 and "lmList" in hands[0]:
-                    self.lm_list = hands[0]["lmList"]
-                    if self.lm_list:
+                if hands and len(hands) > 0:
+                    self.lm_list = hands[0].landmarks
+                    if len(self.lm_list):
                         self.process_hand_gestures(ui_layer, hands)
 
                         # Menu and options logic
                         if len(self.lm_list) > 8:  # Make sure we have enough landmarks
-                            x1, y1 = self.lm_list[8][0], self.lm_list[8][1]  # Index finger tip
+                            x1, y1 = self.lm_list[8, :2].tolist()  # Index finger tip
 
                             # Show fill options if needed
                             if self.show_options:
@@ -196,51 +227,71 @@ class VirtualPainter:
 
                             # Fill preview
                             if self.fill_type:
-                                cv2.ellipse(ui_layer, (self.circle_x1, self.circle_y1), (self.radius, self.radius),
-                                            0, self.fill_start_angle, self.fill_end_angle, self.color2, 2)
+                                self.space.ellipse(ui_layer, (self.circle_x1, self.circle_y1), (self.radius, self.radius),
+                                                   0, self.fill_start_angle, self.fill_end_angle, self.color2, 2)
         else:
             if current_time - self.last_hand_detected_time > self.hand_detection_timeout:
                 self.xp, self.yp = 0, 0
 
-        # Canvas rendering - optimize by doing this less frequently
-        img_gray = cv2.cvtColor(self.img_canvas, cv2.COLOR_BGR2GRAY)
-        _, img_inv = cv2.threshold(img_gray, 50, 255, cv2.THRESH_BINARY_INV)
-        img_inv = cv2.cvtColor(img_inv, cv2.COLOR_GRAY2BGR)
+        # Canvas rendering, every intermediate goes into a session buffer
+        shape = self.img_canvas.shape
+        img_gray = self.buffers.get('canvas_gray', shape[:2])
+        cv2.cvtColor(self.img_canvas, cv2.COLOR_BGR2GRAY, dst=img_gray)
+        cv2.threshold(img_gray, 50, 255, cv2.THRESH_BINARY_INV, dst=img_gray)
+        img_inv = self.buffers.get('canvas_mask', shape)
+        cv2.cvtColor(img_gray, cv2.COLOR_GRAY2BGR, dst=img_inv)
 
-        # Combine layers efficiently
-        result = cv2.bitwise_and(img, img_inv)
-        result = cv2.bitwise_or(result, self.img_canvas)
+        # Combine layers efficiently. The result is returned and kept as
+        # last_frame, so it alternates between two buffers
+        result = self.buffers.get('result', shape, copies=2)
+        cv2.bitwise_and(img, img_inv, dst=result)
+        cv2.bitwise_or(result, self.img_canvas, dst=result)
 
         # Apply UI layer
         alpha = 0.7
         cv2.addWeighted(result, alpha, ui_layer, 1 - alpha, 0, result)
 
-        # Add header - ensure dimensions match exactly
-        if self.header.shape == (self.HEADER_HEIGHT, self.HEADER_WIDTH, 3):
-            result[:self.HEADER_HEIGHT, :self.HEADER_WIDTH] = self.header
-        else:
-            # If header dimensions don't match, resize it
-            header_resized = cv2.resize(self.header, (self.HEADER_WIDTH, self.HEADER_HEIGHT), 
-                                      interpolation=cv2.INTER_AREA)
-            result[:self.HEADER_HEIGHT, :self.HEADER_WIDTH] = header_resized
+        # Add header
+        header = self.render_header()
+        result[:header.shape[0], :header.shape[1]] = header
 
         self.last_frame = result
         return result
 
+    def set_render_size(self, size):
+        """Render at the size negotiated for the session, tools and strokes stay in 1280x720"""
+        if not self.space.resize(size):
+            return
+        self.preprocess.display_size = self.space.size
+        # Keep what was painted so far, at the new size
+        self.img_canvas = cv2.resize(self.img_canvas, self.space.size, interpolation=cv2.INTER_NEAREST)
+        self.canvas_states = [cv2.resize(state, self.space.size, interpolation=cv2.INTER_NEAREST)
+                              for state in self.canvas_states]
+        self.last_frame = None
+
+    def render_header(self):
+        """The selected header at render size, resized once per header and size"""
+        key = (id(self.header), self.space.size)
+        if self.header_key != key:
+            self.header_render = self.space.image(self.header)
+            self.header_key = key
+        return self.header_render
+
     def process_hand_gestures(self, img, hands):
         """Process hand gestures to determine actions"""
-        if not self.lm_list or len(self.lm_list) < 12:
+        if len(self.lm_list) < 12:
             return
 
         # Get finger positions
-        x1, y1 = self.lm_list[8][0], self.lm_list[8][1]  # Index finger tip
-        x2, y2 = self.lm_list[12][0], self.lm_list[12][1]  # Middle finger tip
+        x1, y1 = self.lm_list[8, :2].tolist()  # Index finger tip
+        x2, y2 = self.lm_list[12, :2].tolist()  # Middle finger tip
 
         # Check finger states - this is an expensive operation
         try:
-            fingers = self.detector.fingersUp(hands[0])
+            self.gestures = GESTURES.evaluate(hands)
+            gesture = self.gestures.gesture()
 
-            if fingers[1] and fingers[2]:  # Selection mode (index and middle finger up)
+            if gesture == 'select':  # Selection mode (index and middle finger up)
                 self.xp, self.yp = 0, 0
                 if 1090 < x1 < 1180 and 10 < y1 < 60 and self.undo_button_active:
                     self.undo()
@@ -248,14 +299,14 @@ class VirtualPainter:
                     self.adjust_brush_size(x1)
                 elif x1 < 1000:
                     self.select_tool(x1, y1, x2, y2, img)
-            elif fingers[1] and not fingers[2]:  # Drawing mode (only index finger up)
+            elif gesture == 'draw':  # Drawing mode (only index finger up)
                 if self.show_options:
                     self.select_fill_option(x1, y1)
                 elif self.fill_type:
                     self.select_fill_area(x1, y1, img)
                 else:
                     self.draw_on_canvas(img, hands)
-            elif not fingers[1] and not fingers[2]:  # Complete fill operation
+            elif gesture == 'release':  # Complete fill operation
                 if self.fill_type:
                     self.apply_selected_fill()
                     self.save_canvas_state()
@@ -268,11 +319,11 @@ class VirtualPainter:
 
     def draw_brush_slider(self, img):
         """Draw the brush size slider"""
-        cv2.rectangle(img, (10, 130), (260, 160), (200, 200, 200), -1)
-        cv2.rectangle(img, (10, 130), (
+        self.space.rectangle(img, (10, 130), (260, 160), (200, 200, 200), -1)
+        self.space.rectangle(img, (10, 130), (
             10 + int(250 * (self.brush_size - self.min_brush_size) / (self.max_brush_size - self.min_brush_size)), 160),
-                      (0, 255, 0), -1)
-        cv2.putText(img, f"Brush Size: {self.brush_size}", (10, 180), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+                             (0, 255, 0), -1)
+        self.space.putText(img, f"Brush Size: {self.brush_size}", (10, 180), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
 
     def adjust_brush_size(self, x):
         """Adjust brush size based on slider position"""
@@ -301,11 +352,11 @@ class VirtualPainter:
     def draw_undo_button(self, img):
         """Draw the undo button on the interface"""
         if self.undo_button_active:
-            cv2.rectangle(img, (1090, 10), (1180, 60), (0, 255, 0), -1)
-            cv2.putText(img, "Undo", (1105, 40), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 2)
+            self.space.rectangle(img, (1090, 10), (1180, 60), (0, 255, 0), -1)
+            self.space.putText(img, "Undo", (1105, 40), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 2)
         else:
-            cv2.rectangle(img, (1090, 10), (1180, 60), (200, 200, 200), -1)
-            cv2.putText(img, "Undo", (1105, 40), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (100, 100, 100), 2)
+            self.space.rectangle(img, (1090, 10), (1180, 60), (200, 200, 200), -1)
+            self.space.putText(img, "Undo", (1105, 40), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (100, 100, 100), 2)
 
     def select_fill_option(self, x, y):
         """Select a fill option for the circle"""
@@ -339,28 +390,28 @@ class VirtualPainter:
             self.fill_end_angle = (angle + 90) % 360
 
         # Just preview the selection for now, don't render to canvas yet
-        cv2.ellipse(img, (self.circle_x1, self.circle_y1), (self.radius, self.radius),
-                    0, self.fill_start_angle, self.fill_end_angle, self.color2, 2)
+        self.space.ellipse(img, (self.circle_x1, self.circle_y1), (self.radius, self.radius),
+                           0, self.fill_start_angle, self.fill_end_angle, self.color2, 2)
 
     def apply_selected_fill(self):
         """Apply the selected fill to the circle"""
         if self.fill_type:
             mask = np.zeros(self.img_canvas.shape[:2], dtype=np.uint8)
-            cv2.ellipse(mask, (self.circle_x1, self.circle_y1), (self.radius, self.radius),
-                        0, self.fill_start_angle, self.fill_end_angle, 255, -1)
+            self.space.ellipse(mask, (self.circle_x1, self.circle_y1), (self.radius, self.radius),
+                               0, self.fill_start_angle, self.fill_end_angle, 255, -1)
             self.img_canvas[mask == 255] = self.color2
             self.fill_type = None  # Reset fill type after applying
 
     def draw_options(self, img):
         """Draw fill options menu"""
-        overlay = img.copy()
-        cv2.rectangle(overlay, (900, 100), (1250, 400), (50, 50, 50), -1)  # Options background
-        cv2.putText(overlay, "Fill full circle", (920, 150), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
-        cv2.putText(overlay, "Fill half circle", (920, 250), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
-        cv2.putText(overlay, "Fill quarter circle", (920, 350), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+        overlay = self.buffers.copy('options_overlay', img)
+        self.space.rectangle(overlay, (900, 100), (1250, 400), (50, 50, 50), -1)  # Options background
+        self.space.putText(overlay, "Fill full circle", (920, 150), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+        self.space.putText(overlay, "Fill half circle", (920, 250), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+        self.space.putText(overlay, "Fill quarter circle", (920, 350), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
 
         # Blend the overlay with the original image
-        img = cv2.addWeighted(overlay, 0.7, img, 0.3, 0)
+        cv2.addWeighted(overlay, 0.7, img, 0.3, 0, dst=img)
         return img
 
     def select_tool(self, x1, y1, x2, y2, img):
@@ -374,9 +425,8 @@ class VirtualPainter:
                 self.selected = 'brush1'
             elif 200 < x1 < 300:  # Red brush
                 if len(self.header_images) > 1:
-                    # Ensure the header is properly resized
-                    self.header = cv2.resize(self.header_images[1], (self.HEADER_WIDTH, self.HEADER_HEIGHT), 
-                                           interpolation=cv2.INTER_AREA)
+                    # Header images are resized to the standard dimensions when loaded
+                    self.header = self.header_images[1]
                 else:
                     # Use default header if no second image available
                     self.header = self.header_images[0]
@@ -393,7 +443,7 @@ class VirtualPainter:
                 self.color2 = (0, 0, 255)
                 self.selected = 'eraser'
 
-        cv2.line(img, (x1, y1), (x2, y2), self.color3, 3)
+        self.space.line(img, (x1, y1), (x2, y2), self.color3, 3)
 
     def select_circle(self):
         """Select circle drawing tool"""
@@ -415,71 +465,63 @@ class VirtualPainter:
 
     def draw_line(self, x1, y1, img):
         """Draw a brush line"""
-        cv2.line(img, (self.xp, self.yp), (x1, y1), self.color1, self.brush_thickness)
-        cv2.line(self.img_canvas, (self.xp, self.yp), (x1, y1), self.color1, self.brush_thickness)
+        self.space.line(img, (self.xp, self.yp), (x1, y1), self.color1, self.brush_thickness)
+        self.space.line(self.img_canvas, (self.xp, self.yp), (x1, y1), self.color1, self.brush_thickness)
 
     def draw_eraser(self, x1, y1, img):
         """Draw with eraser (black)"""
-        cv2.line(img, (self.xp, self.yp), (x1, y1), self.color1, self.eraser_thickness)
-        cv2.line(self.img_canvas, (self.xp, self.yp), (x1, y1), self.color1, self.eraser_thickness)
+        self.space.line(img, (self.xp, self.yp), (x1, y1), self.color1, self.eraser_thickness)
+        self.space.line(self.img_canvas, (self.xp, self.yp), (x1, y1), self.color1, self.eraser_thickness)
 
     def draw_circle(self, x1, y1, img, hands):
         """Draw a circle with two hands"""
         if len(hands) == 2 and self.circle_flag:
             self.circle_x1, self.circle_y1 = x1, y1
-            hand2_lmlist = hands[1]["lmList"] if "lmList" in hands[1] else []
+            hand2_lmlist = hands[1].landmarks
 
-            if hand2_lmlist and len(hand2_lmlist) > 8:
-                thumbX, thumbY = hand2_lmlist[8][0], hand2_lmlist[8][1]
+            if len(hand2_lmlist) > 8:
+                thumbX, thumbY = hand2_lmlist[8, :2].tolist()
                 self.radius = int(((thumbX - x1) ** 2 + (thumbY - y1) ** 2) ** 0.5)
 
-                if len(self.lm_list) > 4:
-                    x3, y3 = self.lm_list[4][0], self.lm_list[4][1]  # Thumb tip
-                    length = int(((x3 - x1) ** 2 + (y3 - y1) ** 2) ** 0.5)
-
-                    if length < 160:
-                        self.circle_flag = False
-                        self.done = True
-                        self.show_options = True
-                        self.color2 = (255, 0, 0)
-                        cv2.circle(img, (self.circle_x1, self.circle_y1), self.radius, self.color2, 5)
-                        cv2.circle(self.img_canvas, (self.circle_x1, self.circle_y1), self.radius, self.color2, 5)
+                if self.gestures.isGesture('close_shape'):
+                    self.circle_flag = False
+                    self.done = True
+                    self.show_options = True
+                    self.color2 = (255, 0, 0)
+                    self.space.circle(img, (self.circle_x1, self.circle_y1), self.radius, self.color2, 5)
+                    self.space.circle(self.img_canvas, (self.circle_x1, self.circle_y1), self.radius, self.color2, 5)
 
         if not self.done:
-            cv2.circle(img, (self.circle_x1, self.circle_y1), self.radius, self.color2, 5)
-            cv2.circle(self.img_canvas, (self.circle_x1, self.circle_y1), self.radius, self.color2, 5)
+            self.space.circle(img, (self.circle_x1, self.circle_y1), self.radius, self.color2, 5)
+            self.space.circle(self.img_canvas, (self.circle_x1, self.circle_y1), self.radius, self.color2, 5)
 
     def draw_line_shape(self, x1, y1, img, hands):
         """Draw a straight line with two hands"""
         if len(hands) == 2 and self.line_flag:
             self.line_start = (x1, y1)
-            hand2_lmlist = hands[1]["lmList"] if "lmList" in hands[1] else []
+            hand2_lmlist = hands[1].landmarks
 
-            if hand2_lmlist and len(hand2_lmlist) > 8:
-                self.line_end = (hand2_lmlist[8][0], hand2_lmlist[8][1])
+            if len(hand2_lmlist) > 8:
+                self.line_end = tuple(hand2_lmlist[8, :2].tolist())
 
-                if len(self.lm_list) > 4:
-                    x3, y3 = self.lm_list[4][0], self.lm_list[4][1]  # Thumb tip
-                    length = int(((x3 - x1) ** 2 + (y3 - y1) ** 2) ** 0.5)
-
-                    if length < 160:
-                        self.line_flag = False
-                        self.doneL = True
-                        self.color2 = (255, 0, 0)
-                        cv2.line(img, self.line_start, self.line_end, self.color2, 5)
-                        cv2.line(self.img_canvas, self.line_start, self.line_end, self.color2, 5)
+                if self.gestures.isGesture('close_shape'):
+                    self.line_flag = False
+                    self.doneL = True
+                    self.color2 = (255, 0, 0)
+                    self.space.line(img, self.line_start, self.line_end, self.color2, 5)
+                    self.space.line(self.img_canvas, self.line_start, self.line_end, self.color2, 5)
 
         if not self.doneL:
-            cv2.line(img, self.line_start, self.line_end, self.color2, 5)
-            cv2.line(self.img_canvas, self.line_start, self.line_end, self.color2, 5)
+            self.space.line(img, self.line_start, self.line_end, self.color2, 5)
+            self.space.line(self.img_canvas, self.line_start, self.line_end, self.color2, 5)
 
     def draw_on_canvas(self, img, hands):
         """Handle drawing on the canvas with finger movements"""
-        if not self.lm_list or len(self.lm_list) < 8:
+        if len(self.lm_list) < 8:
             return
 
-        x1, y1 = self.lm_list[8][0], self.lm_list[8][1]  # Index finger tip
-        cv2.circle(img, (x1, y1), 10, (255, 255, 255), -1)
+        x1, y1 = self.lm_list[8, :2].tolist()  # Index finger tip
+        self.space.circle(img, (x1, y1), 10, (255, 255, 255), -1)
 
         # Check if the finger was just lowered
         if self.xp == 0 and self.yp == 0:
@@ -513,7 +555,7 @@ class VirtualPainter:
         """Handle key press events"""
         key = data.get('key')
         if key == 'c':  # Clear canvas
-            self.img_canvas = np.zeros((720, 1280, 3), np.uint8)
+            self.img_canvas = self.space.blank()
             self.canvas_states = []
             self.undo_button_active = False
         elif key == 'z' and (data.get('ctrl') or data.get('meta')):  # Ctrl+Z for undo
@@ -522,10 +564,13 @@ class VirtualPainter:
     def stop(self):
         """Stop the painter app"""
         self.is_running = False
+        self.hand_detection.stop()
+        self.detector.close()
+        self.buffers.clear()
 
     def reset(self):
         """Reset the canvas and states"""
-        self.img_canvas = np.zeros((720, 1280, 3), np.uint8)
+        self.img_canvas = self.space.blank()
         self.canvas_states = []
         self.undo_button_active = False
         self.xp, self.yp = 0, 0
@@ -535,4 +580,15 @@ class VirtualPainter:
         self.done = False
         self.doneL = False
         self.show_options = False
-        self.fill_type = None
\ No newline at end of file
+        self.fill_type = None
+        self.lm_list = []
+        self.gestures = GESTURES.evaluate([])
+        self.hand_detection.reset(clear=self.detector.reset)
+        self.brush_size = 15
+        self.brush_thickness = 30
+        self.color1 = (255, 192, 203)
+        self.header = self.header_images[0]
+        self.last_frame = None
+        self.last_hand_detected_time = 0
+        self.skip_frames = 0
+        self.is_running = True
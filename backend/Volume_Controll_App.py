@@ -203,8 +203,24 @@ import os
 import math
 import subprocess
 import platform
+from gesture_engine import Gesture, GestureEngine
+from async_detection import AsyncDetector
+from frame_preprocess import FramePreprocessor
+from render_space import RenderSpace
+
+# Resolution MediaPipe runs at, landmarks are mapped back to frame pixels
+DETECTION_SIZE = (640, 360)
+
+# Hand detections per second, frames in between use predicted landmarks
+DETECTION_RATE = 15
+
+GESTURES = GestureEngine({
+    'min_volume': Gesture(near=((4, 8, 50),)),      # Thumb and index finger tips touching
+}, measures={'pinch': (4, 8)})
 
 class VolumeControl:
+    accepts_encoded_frames = True  # JPEG frames are decoded by FramePreprocessor
+
     def __init__(self, wCam=1280, hCam=720):
         self.wCam = wCam
         self.hCam = hCam
@@ -218,8 +234,16 @@ class VolumeControl:
         self.is_running = True
         self.last_frame = None
         
+        # UI and hands are laid out in a wCam x hCam space, rendered at the session's size
+        self.space = RenderSpace((wCam, hCam))
+
+        # Mirrored display frame and detection image of each camera frame
+        self.preprocess = FramePreprocessor(display_size=self.space.size, detection_size=DETECTION_SIZE,
+                                            landmark_size=self.space.logical_size)
+
         # Initialize hand detector safely
         self.detector = None
+        self.hand_detection = None
         self.setup_hand_detector()
         
         # Detect platform and setup volume control
@@ -229,8 +253,12 @@ class VolumeControl:
     def setup_hand_detector(self):
         """Safely initialize hand detector"""
         try:
-            from cvzone.HandTrackingModule import HandDetector
-            self.detector = HandDetector(maxHands=1)
+            from HandGestureDetector import HandDetector
+            self.detector = HandDetector(maxHands=1, motionGate=True, detectionSize=DETECTION_SIZE, tracking=True,
+                                         smoothing=True, detectionRate=DETECTION_RATE)
+            # Hands are detected on their own thread, frames render with the newest ones
+            self.hand_detection = AsyncDetector(self.detect_hands, predict=self.detector.predictHands,
+                                                release=self.preprocess.release, name='volume-hand-detection')
             print("✓ Hand detector initialized")
         except ImportError as e:
             print(f"✗ cvzone not available: {e}")
@@ -239,6 +267,11 @@ class VolumeControl:
             print(f"✗ Hand detector initialization failed: {e}")
             self.detector = None
 
+    def detect_hands(self, img):
+        """Run on the detection thread for the newest frame"""
+        hands, _ = self.detector.findHands(img, draw=False)
+        return hands
+
     def setup_volume_control(self):
         """Setup volume control based on the platform"""
         self.volume_available = False
@@ -340,45 +373,41 @@ class VolumeControl:
             return self.last_frame if self.last_frame is not None else self.create_default_frame()
 
         try:
-            # Flip the image horizontally for mirror view
-            img = cv2.flip(img, 1)
-            
-            # Ensure image is the right size
-            img = cv2.resize(img, (self.wCam, self.hCam))
+            # Mirrored view at the right size, flipped and resized in one pass
+            frame, img = img, self.preprocess.display(img)
 
             hands = []
             
-            # Find hands only if detector is available
-            if self.detector:
-                try:
-                    hands, img = self.detector.findHands(img)
-                except Exception as e:
-                    print(f"Hand detection error: {e}")
-                    hands = []
+            # Find hands in the unmirrored detection image only if detector is available
+            if self.hand_detection:
+                self.hand_detection.submit(self.preprocess.detection(frame))
+                hands = self.hand_detection.latest([])
+                self.detector.drawHands(img, hands, self.space)
 
             # Process hand gestures if hands detected
             if hands and len(hands) > 0:
                 hand = hands[0]
-                lmList = hand.get("lmList", [])
+                lmList = hand.landmarks
                 
                 if len(lmList) >= 21:  # Ensure we have all landmarks
-                    bbox = hand.get('bbox', [0, 0, 100, 100])
+                    bbox = hand.bbox
                     self.area = (bbox[2] * bbox[3]) // 100
                     
                     if 250 < self.area < 1000:
                         # Get thumb and index finger positions
-                        x1, y1 = lmList[4][0], lmList[4][1]
-                        x2, y2 = lmList[8][0], lmList[8][1]
+                        x1, y1 = lmList[4, :2].tolist()
+                        x2, y2 = lmList[8, :2].tolist()
                         cx, cy = (x1 + x2) // 2, (y1 + y2) // 2
 
                         # Draw circles on finger tips
-                        cv2.circle(img, (x1, y1), 15, (255, 0, 255), cv2.FILLED)
-                        cv2.circle(img, (x2, y2), 15, (255, 0, 255), cv2.FILLED)
-                        cv2.line(img, (x1, y1), (x2, y2), (255, 0, 255), 3)
-                        cv2.circle(img, (cx, cy), 15, (255, 0, 255), cv2.FILLED)
+                        self.space.circle(img, (x1, y1), 15, (255, 0, 255), cv2.FILLED)
+                        self.space.circle(img, (x2, y2), 15, (255, 0, 255), cv2.FILLED)
+                        self.space.line(img, (x1, y1), (x2, y2), (255, 0, 255), 3)
+                        self.space.circle(img, (cx, cy), 15, (255, 0, 255), cv2.FILLED)
 
-                        # Calculate distance between fingers
-                        length = math.hypot(x2 - x1, y2 - y1)
+                        # Distance between thumb and index finger tips
+                        gestures = GESTURES.evaluate(hands)
+                        length = gestures.measure('pinch')
 
                         # Convert hand range to volume range
                         self.vol = np.interp(length, [50, 300], [self.minVol, self.maxVol])
@@ -389,8 +418,8 @@ class VolumeControl:
                         self.set_volume(self.volPer)
 
                         # Visual feedback for volume level
-                        if length < 50:
-                            cv2.circle(img, (cx, cy), 15, (0, 255, 0), cv2.FILLED)
+                        if gestures.isGesture('min_volume'):
+                            self.space.circle(img, (cx, cy), 15, (0, 255, 0), cv2.FILLED)
 
             # Draw UI elements
             self.draw_ui(img)
@@ -405,41 +434,47 @@ class VolumeControl:
 
     def create_default_frame(self):
         """Create a default frame when no input is available"""
-        img = np.zeros((self.hCam, self.wCam, 3), dtype=np.uint8)
-        cv2.putText(img, "Volume Control Ready", (self.wCam//2 - 200, self.hCam//2), 
+        img = self.space.blank()
+        self.space.putText(img, "Volume Control Ready", (self.wCam//2 - 200, self.hCam//2), 
                    cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
         self.draw_ui(img)
         return img
 
+    def set_render_size(self, size):
+        """Render at the size negotiated for the session, the layout stays in wCam x hCam"""
+        if self.space.resize(size):
+            self.preprocess.display_size = self.space.size
+            self.last_frame = None
+
     def draw_ui(self, img):
         """Draw UI elements on the frame"""
         try:
             # Draw volume bar
-            cv2.rectangle(img, (50, 150), (85, 400), (255, 0, 0), 3)
-            cv2.rectangle(img, (50, int(self.volBar)), (85, 400), (255, 0, 0), cv2.FILLED)
-            cv2.putText(img, f'{int(self.volPer)} %', (40, 450), cv2.FONT_HERSHEY_COMPLEX, 1, (255, 0, 0), 3)
+            self.space.rectangle(img, (50, 150), (85, 400), (255, 0, 0), 3)
+            self.space.rectangle(img, (50, int(self.volBar)), (85, 400), (255, 0, 0), cv2.FILLED)
+            self.space.putText(img, f'{int(self.volPer)} %', (40, 450), cv2.FONT_HERSHEY_COMPLEX, 1, (255, 0, 0), 3)
 
             # Display current volume from system
             current_vol = self.get_volume()
-            cv2.putText(img, f'System Vol: {current_vol}%', (self.wCam - 300, 50), 
+            self.space.putText(img, f'System Vol: {current_vol}%', (self.wCam - 300, 50), 
                        cv2.FONT_HERSHEY_PLAIN, 2, (0, 255, 0), 2)
 
             # Display platform info
-            cv2.putText(img, f'Platform: {self.platform.title()}', (self.wCam - 300, 90), 
+            self.space.putText(img, f'Platform: {self.platform.title()}', (self.wCam - 300, 90), 
                        cv2.FONT_HERSHEY_PLAIN, 2, (0, 255, 0), 2)
 
             # Display volume control status
             status = "Volume: ON" if self.volume_available else "Volume: MOCK"
             color = (0, 255, 0) if self.volume_available else (255, 100, 0)
-            cv2.putText(img, status, (self.wCam - 300, 130), cv2.FONT_HERSHEY_PLAIN, 2, color, 2)
+            self.space.putText(img, status, (self.wCam - 300, 130), cv2.FONT_HERSHEY_PLAIN, 2, color, 2)
 
             # Display hand detector status
             detector_status = "Hands: ON" if self.detector else "Hands: OFF"
             detector_color = (0, 255, 0) if self.detector else (255, 0, 0)
-            cv2.putText(img, detector_status, (self.wCam - 300, 170), cv2.FONT_HERSHEY_PLAIN, 2, detector_color, 2)
+            self.space.putText(img, detector_status, (self.wCam - 300, 170), cv2.FONT_HERSHEY_PLAIN, 2, detector_color, 2)
 
             # Instructions
-            cv2.putText(img, "Pinch fingers to control volume", (50, 50), 
+            self.space.putText(img, "Pinch fingers to control volume", (50, 50), 
                        cv2.FONT_HERSHEY_PLAIN, 2, (255, 255, 255), 2)
             
         except Exception as e:
@@ -486,11 +521,28 @@ class VolumeControl:
         self.is_running = False
         
         # Clean up detector if it exists
-        if hasattr(self, 'detector'):
+        if getattr(self, 'hand_detection', None) is not None:
+            self.hand_detection.stop()
+            self.hand_detection = None
+        if getattr(self, 'detector', None) is not None:
+            self.detector.close()
             self.detector = None
             
         print("Volume Control stopped")
 
+    def reset(self):
+        """Return to the state of a new session, keeping the detector and audio interface"""
+        if self.detector is None:
+            self.setup_hand_detector()
+        else:
+            self.hand_detection.reset(clear=self.detector.reset)
+        self.vol = 0
+        self.volBar = 400
+        self.volPer = 0
+        self.area = 0
+        self.last_frame = None
+        self.is_running = True
+
     def __del__(self):
         """Destructor to ensure cleanup"""
         try:
@@ -0,0 +1,148 @@
+"""
+Capacity-aware admission of feature sessions.
+
+Every worker (frame thread, or worker process in process mode) has a budget
+of sessions per feature it can sustain: configured, or derived from measured
+process_frame times once enough frames were seen. A running session uses
+1 / budget of a worker. A session that does not fit is queued until capacity
+frees up, or rejected when the queue is full, and running sessions are moved
+to cheaper quality tiers as the server fills up.
+"""
+
+import threading
+from collections import deque
+
+# Quality tiers applied to every session: output scale, JPEG quality ceiling
+# and the highest frame rate the server processes per session (None: uncapped)
+QUALITY_TIERS = {
+    'full': {'scale': 1.0, 'max_quality': 95, 'max_fps': None},
+    'reduced': {'scale': 0.75, 'max_quality': 50, 'max_fps': 20},
+    'minimal': {'scale': 0.5, 'max_quality': 35, 'max_fps': 12},
+}
+
+# Utilisation at which sessions move to the reduced tier; minimal is used
+# once the server is full or sessions are waiting
+REDUCED_TIER_UTILISATION = 0.75
+
+# Sessions per worker assumed for a feature of cost 1 until it is measured
+DEFAULT_SESSIONS_PER_WORKER = 4
+
+# Frames needed before a measured budget replaces the default
+MIN_SAMPLES = 30
+
+
+def parse_budgets(setting):
+    """Parse a SESSION_BUDGETS value such as 'fitness-tracker:2,ppt-presenter:8'"""
+    budgets = {}
+    for item in (setting or '').split(','):
+        name, _, value = item.partition(':')
+        try:
+            if name.strip() and float(value) > 0:
+                budgets[name.strip()] = float(value)
+        except ValueError:
+            print(f"⚠️  Ignoring invalid session budget: {item}")
+    return budgets
+
+
+class AdmissionController:
+    """Tracks admitted and waiting sessions against the workers' session budgets"""
+
+    def __init__(self, workers, costs, budgets=None, target_fps=15, queue_limit=10):
+        """
+        :param workers: Number of workers sharing the load
+        :param costs: Relative frame cost per feature, used for default budgets
+        :param budgets: Configured sessions per worker per feature, never overridden by measurements
+        :param target_fps: Frame rate each session must sustain, used for measured budgets
+        :param queue_limit: Sessions allowed to wait for capacity, beyond that they are rejected
+        """
+        self.workers = workers
+        self.costs = costs
+        self.budgets = dict(budgets or {})
+        self.target_fps = target_fps
+        self.queue_limit = queue_limit
+
+        self.lock = threading.Lock()
+        self.admitted = {}
+        self.waiting = deque()
+        self.frame_time = {}
+        self.samples = {}
+        self.rejected = 0
+
+    def observe(self, feature_name, seconds):
+        """Record the time one frame of a feature took to process"""
+        with self.lock:
+            previous = self.frame_time.get(feature_name)
+            self.frame_time[feature_name] = seconds if previous is None else previous + 0.05 * (seconds - previous)
+            self.samples[feature_name] = self.samples.get(feature_name, 0) + 1
+
+    def budget(self, feature_name):
+        """Sessions of a feature one worker can sustain"""
+        if feature_name in self.budgets:
+            return self.budgets[feature_name]
+        if self.samples.get(feature_name, 0) >= MIN_SAMPLES and self.frame_time[feature_name] > 0:
+            return max(1.0, 1.0 / (self.target_fps * self.frame_time[feature_name]))
+        return DEFAULT_SESSIONS_PER_WORKER / self.costs.get(feature_name, 1.0)
+
+    def _load(self):
+        return sum(1.0 / self.budget(name) for name in self.admitted.values())
+
+    def _fits(self, feature_name):
+        return self._load() + 1.0 / self.budget(feature_name) <= self.workers + 1e-9
+
+    def admit(self, session_id, feature_name, request=None):
+        """
+        Admit a session, or queue it if the workers are busy.
+        :param request: Kept with a queued session and handed back by release()
+        :return: ('admitted', None), ('queued', position) or ('rejected', None)
+        """
+        with self.lock:
+            if session_id in self.admitted or (not self.waiting and self._fits(feature_name)):
+                self.admitted[session_id] = feature_name
+                return 'admitted', None
+            if len(self.waiting) >= self.queue_limit:
+                self.rejected += 1
+                return 'rejected', None
+            self.waiting.append((session_id, feature_name, request))
+            return 'queued', len(self.waiting)
+
+    def release(self, session_id):
+        """
+        Forget a session, admitting waiting sessions that now fit in order.
+        :return: List of (session_id, request) of the newly admitted sessions
+        """
+        with self.lock:
+            self.admitted.pop(session_id, None)
+            self.waiting = deque(entry for entry in self.waiting if entry[0] != session_id)
+
+            promoted = []
+            while self.waiting and self._fits(self.waiting[0][1]):
+                waiting_id, feature_name, request = self.waiting.popleft()
+                self.admitted[waiting_id] = feature_name
+                promoted.append((waiting_id, request))
+            return promoted
+
+    def positions(self):
+        """Queue position of every waiting session"""
+        with self.lock:
+            return {entry[0]: index + 1 for index, entry in enumerate(self.waiting)}
+
+    def tier(self):
+        """Quality tier running sessions should use at the current load"""
+        with self.lock:
+            utilisation = self._load() / max(self.workers, 1)
+            if self.waiting or utilisation >= 1.0:
+                return 'minimal'
+            if utilisation >= REDUCED_TIER_UTILISATION:
+                return 'reduced'
+            return 'full'
+
+    def stats(self):
+        with self.lock:
+            return {
+                'workers': self.workers,
+                'load': round(self._load(), 2),
+                'admitted': len(self.admitted),
+                'waiting': len(self.waiting),
+                'rejected': self.rejected,
+                'budgets': {name: round(self.budget(name), 1) for name in self.costs},
+            }
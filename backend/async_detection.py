@@ -0,0 +1,146 @@
+"""
+Detection decoupled from rendering.
+
+A feature's process_frame posts each frame to its AsyncDetector and renders
+immediately against the newest detection result, instead of blocking on
+MediaPipe. The detector's thread sleeps on a condition variable until a
+frame arrives, always takes the newest one (frames posted while it was busy
+are replaced, not queued) and publishes the result when done. Output frame
+rate therefore depends on rendering cost only; inference latency shows up as
+landmarks that are a frame or two old, which hand smoothing extrapolates away.
+"""
+
+import threading
+import time
+
+
+class AsyncDetector:
+    """Background detection of one session, fed with the newest frame"""
+
+    def __init__(self, detect, predict=None, release=None, name='detection'):
+        """
+        :param detect: Callable running inference on a frame and returning its result
+        :param predict: Optional callable(t) returning the result extrapolated to
+                        time t, e.g. HandDetector.predictHands. Used by latest()
+                        once a first result exists
+        :param release: Optional callable invoked with every submitted frame once it
+                        is no longer read: detected, replaced or dropped. Lets the
+                        caller reuse frame buffers, see FramePreprocessor.release
+        :param name: Thread name
+        """
+        self.detect = detect
+        self.predict = predict
+        self.release = release
+        self.name = name
+
+        self.condition = threading.Condition()
+        self.busy = threading.Lock()  # Held while detect runs, see reset()
+        self.pending = None
+        self.result = None
+        self.result_time = None
+        self.generation = 0
+        self.running = False
+        self.thread = None
+
+        self.submitted = 0
+        self.replaced = 0
+        self.detected = 0
+        self.latency = 0.0
+
+    def submit(self, frame):
+        """
+        Post a frame for detection, replacing one that was not picked up yet.
+        The detector reads the frame later from its own thread, so the caller
+        must not draw on it afterwards: submit a copy if it will.
+        """
+        with self.condition:
+            replaced, self.pending = self.pending, frame
+            if replaced is not None:
+                self.replaced += 1
+            self.submitted += 1
+            if not self.running:
+                self._start()
+            self.condition.notify()
+        self._release(replaced)
+
+    def _release(self, frame):
+        if frame is not None and self.release is not None:
+            self.release(frame)
+
+    def latest(self, default=None, t=None):
+        """Newest detection result, extrapolated to time t when a predictor is set"""
+        with self.condition:
+            if self.result_time is None:
+                return default
+            if self.predict is None:
+                return self.result
+        return self.predict(t)
+
+    def _start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while self.pending is None and self.running:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                frame, self.pending = self.pending, None
+                generation = self.generation
+
+            with self.busy:
+                start = time.perf_counter()
+                try:
+                    result = self.detect(frame)
+                except Exception as e:
+                    print(f"Detection error in {self.name}: {e}")
+                    continue
+                finally:
+                    self._release(frame)
+                elapsed = time.perf_counter() - start
+
+                with self.condition:
+                    # Results of frames posted before a reset belong to the previous session
+                    if generation == self.generation:
+                        self.result = result
+                        self.result_time = time.time()
+                        self.detected += 1
+                        self.latency += 0.1 * (elapsed - self.latency)
+
+    def reset(self, clear=None):
+        """
+        Drop the pending frame and the current result, e.g. when the feature is recycled.
+        :param clear: Optional callable run while no detection is running, to reset the detector itself
+        """
+        with self.busy:
+            with self.condition:
+                self.generation += 1
+                dropped, self.pending = self.pending, None
+                self.result = None
+                self.result_time = None
+            self._release(dropped)
+            if clear is not None:
+                clear()
+
+    def stop(self, timeout=1.0):
+        """Stop the detection thread, waiting up to timeout seconds for a running detection"""
+        with self.condition:
+            self.running = False
+            dropped, self.pending = self.pending, None
+            self.condition.notify_all()
+            thread, self.thread = self.thread, None
+        self._release(dropped)
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=timeout)
+
+    def stats(self):
+        with self.condition:
+            return {
+                'submitted': self.submitted,
+                'replaced': self.replaced,
+                'detected': self.detected,
+                'latency_ms': round(self.latency * 1000, 1)
+            }
@@ -0,0 +1,87 @@
+"""
+Compare the frame encoder backends on frames rendered by each feature.
+
+Usage: python benchmark_encoders.py [--iterations 50] [--features pong-game,ppt-presenter]
+"""
+
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from frame_encoders import encoders, JpegEncoder
+from feature_loader import feature_registry, build_feature_instance, prime_feature_instance
+
+# Size of the synthetic camera frame
+FRAME_SIZE = (1280, 720)
+
+
+def synthetic_camera_frame(width, height, seed=0):
+    """Camera-like test frame: smooth gradients plus sensor noise"""
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    frame = np.empty((height, width, 3), np.float32)
+    frame[..., 0] = x
+    frame[..., 1] = y
+    frame[..., 2] = (x + y) / 2
+    frame += rng.normal(0, 8, frame.shape)
+    frame = np.clip(frame, 0, 255).astype(np.uint8)
+    cv2.circle(frame, (width // 2, height // 2), height // 4, (60, 120, 200), -1)
+    return frame
+
+
+def render_feature_frame(feature_name, camera_frame):
+    """Run a feature on the test frame until it returns a rendered frame"""
+    feature = build_feature_instance(feature_name)
+    try:
+        return prime_feature_instance(feature, camera_frame)
+    finally:
+        if hasattr(feature, 'stop'):
+            feature.stop()
+
+
+def benchmark_encoder(encoder, frame, quality, iterations):
+    """Return mean encode time in ms and payload size in KB"""
+    payload = encoder.encode(frame, quality)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        payload = encoder.encode(frame, quality)
+    elapsed = (time.perf_counter() - start) / iterations
+    return elapsed * 1000, len(payload) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--qualities', default='40,60,80')
+    parser.add_argument('--features', default=','.join(feature_registry.keys()))
+    args = parser.parse_args()
+
+    qualities = [int(q) for q in args.qualities.split(',')]
+    backends = dict(encoders)
+    if backends['jpeg'].turbo is not None:
+        backends['jpeg-opencv'] = JpegEncoder(use_turbo=False)
+
+    camera_frame = synthetic_camera_frame(*FRAME_SIZE)
+
+    print(f"{'feature':<18}{'backend':<14}{'quality':>8}{'ms/frame':>10}{'KB':>9}")
+    for feature_name in args.features.split(','):
+        try:
+            frame = render_feature_frame(feature_name, camera_frame)
+        except Exception as e:
+            print(f"{feature_name:<18}skipped: {e}")
+            continue
+        if frame is None:
+            print(f"{feature_name:<18}skipped: no frame rendered")
+            continue
+
+        for backend_name, encoder in backends.items():
+            for quality in (qualities if encoder.lossy else [None]):
+                ms, kb = benchmark_encoder(encoder, frame, quality or 0, args.iterations)
+                print(f"{feature_name:<18}{backend_name:<14}{quality or '-':>8}{ms:>10.2f}{kb:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+import os
+import time
+import importlib
+
+import numpy as np
+
+from feature_pool import FeaturePool
+
+# Feature registry - maps feature names to their module and class names.
+# 'cost' is the relative per-frame cost the frame scheduler charges a session
+feature_registry = {
+    'virtual-mouse': {
+        'module': 'Virtual_Mouse_app',
+        'class': 'VirtualMouse',
+        'description': 'Control mouse with hand gestures',
+        'cost': 1.0
+    },
+    'virtual-painter': {
+        'module': 'Virtual_Paint_app', 
+        'class': 'VirtualPainter',
+        'description': 'Draw in air with finger tracking',
+        'cost': 1.0
+    },
+    'volume-control': {
+        'module': 'Volume_Controll_App',
+        'class': 'VolumeControl', 
+        'description': 'Control system volume with gestures',
+        'cost': 1.0
+    },
+    'pong-game': {
+        'module': 'Pong_Game_app',
+        'class': 'PongGame',
+        'description': 'Play Pong with hand movements',
+        'cost': 1.0
+    },
+    'fitness-tracker': {
+        'module': 'Fitness_Tracker_App',
+        'class': 'ArmCurlsCounter',
+        'description': 'Count arm curls automatically',
+        'cost': 2.0
+    },
+    'ppt-presenter': {
+        'module': 'PPT_Presentation_App',
+        'class': 'PresentationController', 
+        'description': 'Control presentations with gestures',
+        'cost': 1.0
+    }
+}
+
+# Cache for dynamically loaded modules and classes
+loaded_modules = {}
+feature_classes = {}
+
+def dynamic_import_feature(feature_name):
+    """Dynamically import a feature module and class"""
+    if feature_name not in feature_registry:
+        raise ValueError(f"Unknown feature: {feature_name}")
+    
+    feature_config = feature_registry[feature_name]
+    module_name = feature_config['module']
+    class_name = feature_config['class']
+    
+    try:
+        # Check if module is already loaded
+        if module_name not in loaded_modules:
+            print(f"📦 Dynamically importing {module_name}...")
+            
+            # Import the module
+            module = importlib.import_module(module_name)
+            loaded_modules[module_name] = module
+            
+            print(f"✅ Successfully imported {module_name}")
+        else:
+            print(f"♻️  Using cached module {module_name}")
+            module = loaded_modules[module_name]
+        
+        # Get the class from the module
+        if feature_name not in feature_classes:
+            feature_class = getattr(module, class_name)
+            feature_classes[feature_name] = feature_class
+            print(f"✅ Successfully loaded class {class_name}")
+        else:
+            print(f"♻️  Using cached class {class_name}")
+            feature_class = feature_classes[feature_name]
+        
+        return feature_class
+        
+    except ImportError as e:
+        print(f"❌ Import error for {module_name}: {e}")
+        raise
+    except AttributeError as e:
+        print(f"❌ Class {class_name} not found in {module_name}: {e}")
+        raise
+    except Exception as e:
+        print(f"❌ Unexpected error loading {feature_name}: {e}")
+        raise
+
+
+# Warm-up state: readiness per feature ('cold', 'warming', 'ready', 'failed')
+feature_readiness = {name: 'cold' for name in feature_registry}
+
+# Dummy camera frame used to prime models
+WARMUP_FRAME_SHAPE = (720, 1280, 3)
+
+
+def build_feature_instance(feature_name):
+    """Construct a new instance of a feature, prepared for the current environment"""
+    feature_class = dynamic_import_feature(feature_name)
+
+    print(f"🏗️  Creating instance of {feature_name}")
+    feature_instance = feature_class()
+
+    # Handle cloud environment setup
+    if os.getenv('RENDER'):
+        # Disable camera-related features for cloud deployment
+        if hasattr(feature_instance, 'setup_camera'):
+            feature_instance.setup_camera = lambda: None
+
+        # For features that might try to access camera during initialization
+        if hasattr(feature_instance, 'cap'):
+            feature_instance.cap = None
+
+    # Disable actual mouse control by default for safety
+    if feature_name == 'virtual-mouse' and hasattr(feature_instance, 'toggle_control'):
+        feature_instance.toggle_control(False)
+
+    return feature_instance
+
+
+# Idle instances kept per feature for reuse by later sessions (0 disables pooling)
+feature_pool = FeaturePool(build_feature_instance, max_idle=int(os.getenv('FEATURE_POOL_SIZE', 1)))
+
+
+def create_feature_instance(feature_name):
+    """
+    Return a ready-to-use instance of a feature, prepared for the current
+    environment. A pooled (warm) instance is used if one is available.
+    """
+    return feature_pool.checkout(feature_name)
+
+
+def release_feature_instance(feature_name, feature_instance):
+    """Hand an instance back when its session ends, it is recycled or stopped"""
+    feature_pool.checkin(feature_name, feature_instance)
+
+
+def prime_feature_instance(feature_instance, frame, attempts=20):
+    """
+    Run a feature on a frame until it returns a rendered frame, which forces its
+    models to load and run once. Returns the rendered frame or None.
+    """
+    for _ in range(attempts):
+        rendered = feature_instance.process_frame(frame.copy())
+        if rendered is not None:
+            return rendered
+        # Some features throttle themselves to their target FPS
+        time.sleep(0.05)
+    return None
+
+
+def warm_up_feature(feature_name):
+    """Import a feature, build an instance, prime its models and put it in the pool"""
+    feature_readiness[feature_name] = 'warming'
+    try:
+        start = time.time()
+        feature_instance = build_feature_instance(feature_name)
+        prime_feature_instance(feature_instance, np.zeros(WARMUP_FRAME_SHAPE, np.uint8))
+
+        # reset() on check-in forgets whatever state the dummy frames left behind
+        feature_pool.checkin(feature_name, feature_instance)
+        feature_readiness[feature_name] = 'ready'
+        print(f"🔥 Warmed up {feature_name} in {time.time() - start:.1f}s")
+    except Exception as e:
+        feature_readiness[feature_name] = 'failed'
+        print(f"❌ Warm-up failed for {feature_name}: {e}")
+
+
+def warmup_feature_names(setting):
+    """Parse a WARMUP_FEATURES value: 'all', or a comma separated list of feature names"""
+    if not setting:
+        return []
+    if setting.strip().lower() == 'all':
+        return list(feature_registry.keys())
+    return [name.strip() for name in setting.split(',') if name.strip() in feature_registry]
+
+
+def feature_costs(setting):
+    """
+    Per-feature frame costs from the registry, overridden by a FEATURE_COSTS
+    value such as 'fitness-tracker:3,ppt-presenter:0.5'
+    """
+    costs = {name: config.get('cost', 1.0) for name, config in feature_registry.items()}
+    for item in (setting or '').split(','):
+        name, _, value = item.partition(':')
+        name = name.strip()
+        if name in costs:
+            try:
+                costs[name] = max(0.01, float(value))
+            except ValueError:
+                print(f"⚠️  Ignoring invalid cost for {name}: {value}")
+    return costs
@@ -0,0 +1,91 @@
+import threading
+from collections import defaultdict, deque
+
+
+class FeaturePool:
+    """
+    Per-feature pools of idle feature instances.
+
+    Recycle protocol: a feature that implements reset() is returned to the pool
+    when its session stops. reset() must put the instance back into the state
+    of a freshly constructed one (including is_running) while keeping expensive
+    resources such as MediaPipe graphs and loaded images. Instances without
+    reset(), instances that already stopped themselves (is_running is False,
+e.g. after a 'q' key press released their graphs), or beyond the pool size,
+are stopped and discarded.
+    """
+
+    def __init__(self, factory, max_idle=1):
+        """
+        :param factory: Callable building a new instance from a feature name
+        :param max_idle: Maximum number of idle instances kept per feature
+        """
+        self.factory = factory
+        self.max_idle = max_idle
+        self.idle = defaultdict(deque)
+        self.lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+
+    def checkout(self, feature_name):
+        """Return an idle instance of a feature, building a new one if none is available"""
+        with self.lock:
+            idle = self.idle[feature_name]
+            instance = idle.pop() if idle else None
+            if instance is not None:
+                self.reused += 1
+            else:
+                self.created += 1
+        if instance is not None:
+            print(f"♻️  Reusing pooled instance of {feature_name}")
+            return instance
+        return self.factory(feature_name)
+
+    def checkin(self, feature_name, instance):
+        """
+        Recycle an instance whose session has ended.
+        :return: True if it was kept in the pool
+        """
+        if instance is None:
+            return False
+
+        if not getattr(instance, 'is_running', True):
+            print(f"🗑️  Not recycling {feature_name}, the instance was stopped")
+        elif hasattr(instance, 'reset'):
+            try:
+                instance.reset()
+                with self.lock:
+                    idle = self.idle[feature_name]
+                    if len(idle) < self.max_idle:
+                        idle.append(instance)
+                        return True
+            except Exception as e:
+                print(f"⚠️  Could not recycle {feature_name}: {e}")
+
+        with self.lock:
+            self.discarded += 1
+        if hasattr(instance, 'stop'):
+            instance.stop()
+        return False
+
+    def clear(self):
+        """Stop and drop every idle instance"""
+        with self.lock:
+            instances = [instance for idle in self.idle.values() for instance in idle]
+            self.idle.clear()
+        for instance in instances:
+            try:
+                if hasattr(instance, 'stop'):
+                    instance.stop()
+            except Exception as e:
+                print(f"⚠️  Error stopping pooled instance: {e}")
+
+    def stats(self):
+        with self.lock:
+            return {
+                'idle': {name: len(idle) for name, idle in self.idle.items() if idle},
+                'created': self.created,
+                'reused': self.reused,
+                'discarded': self.discarded
+            }
@@ -0,0 +1,69 @@
+"""
+Per-session frame buffers.
+
+Features draw every frame into several full-size images: UI layers, masks,
+blends, the frame they return. Allocating them per frame churns the
+allocator (a 1280x720 BGR frame is 2.7 MB) and makes RSS spike with many
+sessions. FrameBuffers hands out named buffers that live as long as the
+session, for OpenCV's dst= outputs and np.copyto, and reallocates one only
+when the shape it is asked for changes.
+"""
+
+import threading
+
+import numpy as np
+
+
+class FrameBuffers:
+    """Named scratch and output buffers of one session, reused from frame to frame"""
+
+    def __init__(self):
+        self.buffers = {}
+        self.indices = {}
+        self.lock = threading.Lock()
+        self.allocated = 0
+
+    def get(self, name, shape, dtype=np.uint8, copies=1):
+        """
+        Buffer for name with the given shape, its previous content is undefined
+        :param copies: Number of buffers the name cycles through. Frames a feature
+                       returns need 2, so the frame returned by the previous call
+                       stays valid while it is encoded or sent
+        """
+        shape = tuple(shape)
+        dtype = np.dtype(dtype)
+        with self.lock:
+            ring = self.buffers.get(name)
+            if ring is None or len(ring) != copies:
+                ring = self.buffers[name] = [None] * copies
+            index = self.indices[name] = (self.indices.get(name, -1) + 1) % copies
+            buffer = ring[index]
+            if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+                buffer = ring[index] = np.empty(shape, dtype)
+                self.allocated += 1
+        return buffer
+
+    def like(self, name, img, copies=1):
+        """Buffer with the shape and dtype of img"""
+        return self.get(name, img.shape, img.dtype, copies)
+
+    def copy(self, name, img, copies=1):
+        """Copy of img in a reused buffer, replaces img.copy()"""
+        buffer = self.like(name, img, copies)
+        np.copyto(buffer, img)
+        return buffer
+
+    def clear(self):
+        """Free every buffer, e.g. when the session ends"""
+        with self.lock:
+            self.buffers.clear()
+            self.indices.clear()
+
+    def stats(self):
+        with self.lock:
+            return {
+                'buffers': sum(buffer is not None for ring in self.buffers.values() for buffer in ring),
+                'bytes': sum(buffer.nbytes for ring in self.buffers.values() for buffer in ring
+                             if buffer is not None),
+                'allocated': self.allocated
+            }
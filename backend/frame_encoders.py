@@ -0,0 +1,195 @@
+import time
+import threading
+from collections import OrderedDict
+
+import cv2
+
+# libjpeg-turbo binding is optional, OpenCV's encoder is used when it is missing
+try:
+    from turbojpeg import TurboJPEG
+    _turbojpeg = TurboJPEG()
+except Exception:
+    _turbojpeg = None
+
+
+class JpegEncoder:
+    """JPEG encoder, backed by libjpeg-turbo (PyTurboJPEG) when installed"""
+    name = 'jpeg'
+    mime = 'image/jpeg'
+    lossy = True
+
+    def __init__(self, use_turbo=True):
+        self.turbo = _turbojpeg if use_turbo else None
+
+    def encode(self, frame, quality):
+        if self.turbo is not None:
+            return self.turbo.encode(frame, quality=int(quality))
+        ok, buffer = cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), int(quality)])
+        return buffer.tobytes() if ok else None
+
+
+class WebpEncoder:
+    """WebP encoder, smaller than JPEG at the same quality but slower to encode"""
+    name = 'webp'
+    mime = 'image/webp'
+    lossy = True
+
+    def encode(self, frame, quality):
+        ok, buffer = cv2.imencode('.webp', frame, [int(cv2.IMWRITE_WEBP_QUALITY), int(quality)])
+        return buffer.tobytes() if ok else None
+
+
+class PngEncoder:
+    """Lossless PNG encoder. Quality is ignored, a fast compression level is used"""
+    name = 'png'
+    mime = 'image/png'
+    lossy = False
+
+    def __init__(self, compression=1):
+        self.compression = compression
+
+    def encode(self, frame, quality):
+        ok, buffer = cv2.imencode('.png', frame, [int(cv2.IMWRITE_PNG_COMPRESSION), self.compression])
+        return buffer.tobytes() if ok else None
+
+
+encoders = {
+    'jpeg': JpegEncoder(),
+    'webp': WebpEncoder(),
+    'png': PngEncoder(),
+}
+
+
+def get_encoder(name):
+    """Return the encoder registered under name, falling back to JPEG"""
+    return encoders.get(name, encoders['jpeg'])
+
+
+class AdaptiveEncoderController:
+    """
+    Picks the output format and quality for one session from what it measures:
+    encode time and payload size of every frame, plus the delay until the
+    client acknowledges having displayed a frame.
+
+    Quality is lowered while the client lags behind or frames exceed the size
+    budget, and raised back towards the negotiated quality once there is
+    headroom. WebP is used instead of JPEG when quality alone cannot meet the
+    size budget and encoding is fast enough, and dropped again when encoding
+    becomes the bottleneck.
+    """
+
+    def __init__(self, quality=60, formats=('jpeg',), preferred='jpeg', adaptive=True,
+                 min_quality=25, encode_budget=0.010, size_budget=60 * 1024, ack_budget=0.200,
+                 adjust_every=15):
+        """
+        :param quality: Negotiated quality, also the ceiling when adapting
+        :param formats: Formats the client is able to display
+        :param preferred: Format to start with
+        :param adaptive: When False the format and quality never change
+        :param min_quality: Lowest quality the controller will go down to
+        :param encode_budget: Target encode time per frame in seconds
+        :param size_budget: Target payload size per frame in bytes
+        :param ack_budget: Target delay between emit and client acknowledgement in seconds
+        :param adjust_every: Number of encoded frames between adjustments
+        """
+        self.formats = [name for name in formats if name in encoders] or ['jpeg']
+        self.format = preferred if preferred in self.formats else self.formats[0]
+        self.negotiated_quality = int(quality)
+        self.max_quality = int(quality)
+        self.quality = int(quality)
+        self.lowest_quality = int(min_quality)
+        self.min_quality = min(self.lowest_quality, self.max_quality)
+        self.adaptive = adaptive
+        self.encode_budget = encode_budget
+        self.size_budget = size_budget
+        self.ack_budget = ack_budget
+        self.adjust_every = adjust_every
+
+        self.lock = threading.Lock()
+        self.encode_time = 0.0
+        self.payload_size = 0.0
+        self.ack_latency = None
+        self.frames_since_adjust = 0
+        self.next_frame_id = 0
+        self.pending_acks = OrderedDict()
+
+    @staticmethod
+    def _ewma(previous, value, alpha=0.2):
+        return value if not previous else previous + alpha * (value - previous)
+
+    def encode(self, frame):
+        """
+        Encode a frame with the current settings and record the measurements.
+        :return: (frame_id, payload bytes, mime type) or (None, None, None) on failure
+        """
+        encoder = get_encoder(self.format)
+        start = time.perf_counter()
+        payload = encoder.encode(frame, self.quality)
+        elapsed = time.perf_counter() - start
+        if payload is None:
+            return None, None, None
+
+        with self.lock:
+            self.encode_time = self._ewma(self.encode_time, elapsed)
+            self.payload_size = self._ewma(self.payload_size, len(payload))
+            frame_id = self.next_frame_id
+            self.next_frame_id += 1
+            self.pending_acks[frame_id] = time.time()
+            while len(self.pending_acks) > 64:
+                self.pending_acks.popitem(last=False)
+
+            self.frames_since_adjust += 1
+            if self.adaptive and self.frames_since_adjust >= self.adjust_every:
+                self.frames_since_adjust = 0
+                self._adjust()
+
+        return frame_id, payload, encoder.mime
+
+    def limit_quality(self, ceiling):
+        """Cap quality below the negotiated one, e.g. while the server is degraded"""
+        with self.lock:
+            self.max_quality = min(self.negotiated_quality, int(ceiling))
+            self.min_quality = min(self.lowest_quality, self.max_quality)
+            self.quality = min(self.quality, self.max_quality)
+
+    def acknowledge(self, frame_id):
+        """Record that the client has displayed the given frame"""
+        with self.lock:
+            sent_at = self.pending_acks.pop(frame_id, None)
+            if sent_at is None:
+                return
+            # Older unacknowledged frames were replaced on the client, forget them
+            while self.pending_acks and next(iter(self.pending_acks)) < frame_id:
+                self.pending_acks.popitem(last=False)
+            self.ack_latency = self._ewma(self.ack_latency, time.time() - sent_at)
+
+    def _adjust(self):
+        lagging = self.ack_latency is not None and self.ack_latency > self.ack_budget
+        too_big = self.payload_size > self.size_budget
+        too_slow = self.encode_time > self.encode_budget
+        step = 5
+
+        if self.format == 'png' and (too_slow or too_big or lagging):
+            # Lossless output cannot be tuned, fall back to a lossy format
+            self.format = 'jpeg' if 'jpeg' in self.formats else self.format
+        elif too_slow and self.format == 'webp' and 'jpeg' in self.formats:
+            self.format = 'jpeg'
+        elif lagging or too_big:
+            if self.quality > self.min_quality:
+                self.quality = max(self.min_quality, self.quality - step)
+            elif self.format == 'jpeg' and 'webp' in self.formats and \
+                    self.encode_time < self.encode_budget / 2:
+                self.format = 'webp'
+        elif not too_slow and self.payload_size < self.size_budget * 0.7 and \
+                (self.ack_latency is None or self.ack_latency < self.ack_budget * 0.5):
+            self.quality = min(self.max_quality, self.quality + step)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'format': self.format,
+                'quality': self.quality,
+                'encode_ms': round(self.encode_time * 1000, 2),
+                'payload_kb': round(self.payload_size / 1024, 1),
+                'ack_ms': round(self.ack_latency * 1000, 1) if self.ack_latency is not None else None,
+            }
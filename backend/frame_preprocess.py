@@ -0,0 +1,263 @@
+"""
+Per-session frame preprocessing shared by the features.
+
+From each decoded camera frame a feature needs two images: the mirrored
+display frame it draws on, at the size it renders, and an RGB image at
+detection resolution for MediaPipe. FramePreprocessor produces the display
+frame in a single pass (flip, or a remap that mirrors and resizes at once)
+and the detection image with one resize plus one color conversion on the
+small image, both into buffers reused from frame to frame.
+
+Detection runs on the unmirrored frame: mirroring only changes where the
+landmarks are drawn, so the detectors mirror the landmarks into display
+coordinates instead of mirroring the image first (see DetectionFrame).
+
+Frames can also be handed over still JPEG-encoded, as an EncodedFrame. Each
+image is then decoded at the smallest JPEG scale (1/2, 1/4, 1/8, done by the
+decoder in the DCT domain) that is still at least as large as needed, so the
+detection image never costs a full-size decode and a feature that shows only
+a small camera preview never decodes the full frame at all.
+"""
+
+import struct
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from frame_buffers import FrameBuffers
+
+
+# cv2.imdecode flags decoding a JPEG at 1/factor of its size, largest reduction first
+REDUCED_DECODES = ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4),
+                   (2, cv2.IMREAD_REDUCED_COLOR_2))
+
+# Start Of Frame markers, which carry the image size (DHT, JPG and DAC share the range)
+SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def jpeg_size(data):
+    """(width, height) read from a JPEG's frame header without decoding it, None if data is not a JPEG"""
+    data = memoryview(data).cast('B')
+    if len(data) < 4 or data[0] != 0xFF or data[1] != 0xD8:
+        return None
+    i = 2
+    while i + 9 < len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # Fill byte
+            i += 1
+            continue
+        if marker in SOF_MARKERS:
+            height, width = struct.unpack_from('>HH', data, i + 5)
+            return (width, height) if width and height else None
+        i += 2 + struct.unpack_from('>H', data, i + 2)[0]
+    return None
+
+
+def fit_size(width, height, size):
+    """(width, height) scaled down to fit within size keeping the aspect ratio, unchanged if it fits"""
+    if size is None:
+        return width, height
+    scale = min(size[0] / width, size[1] / height)
+    if scale >= 1:
+        return width, height
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+class EncodedFrame:
+    """
+    Camera frame still JPEG-encoded. FramePreprocessor decodes it on demand at
+    the resolution each of its images needs, every decode is kept for the
+    other images of the same frame.
+    """
+    __slots__ = ('data', 'size', 'decoded', 'decode_time')
+
+    def __init__(self, data):
+        """
+        :param data: Encoded image bytes. The frame size is read from the JPEG
+                     header; other formats are decoded at full size right away
+        """
+        self.data = np.frombuffer(data, np.uint8) if not isinstance(data, np.ndarray) else data
+        self.decoded = {}
+        self.decode_time = 0.0  # Seconds spent in cv2.imdecode, for the stage metrics
+        self.size = jpeg_size(self.data)
+        if self.size is None:
+            image = self.decode(1)
+            self.size = (image.shape[1], image.shape[0]) if image is not None else None
+
+    @property
+    def valid(self):
+        return self.size is not None
+
+    def decode(self, factor):
+        """BGR image decoded at 1/factor of the frame size (cached), None if the data is corrupt"""
+        image = self.decoded.get(factor)
+        if image is None:
+            flag = dict(REDUCED_DECODES).get(factor, cv2.IMREAD_COLOR)
+            start = time.perf_counter()
+            image = cv2.imdecode(self.data, flag)
+            self.decode_time += time.perf_counter() - start
+            if image is not None:
+                self.decoded[factor] = image
+        return image
+
+    def image(self, width, height):
+        """
+        Smallest decode at least width x height: one decoded already if there
+        is one, otherwise a new decode at the largest reduction that fits
+        """
+        w, h = self.size
+        cached = [image for image in self.decoded.values()
+                  if image.shape[1] >= width and image.shape[0] >= height]
+        if cached:
+            return min(cached, key=lambda image: image.shape[1])
+        for factor, _ in REDUCED_DECODES:
+            if w // factor >= width and h // factor >= height:
+                image = self.decode(factor)
+                if image is not None:
+                    return image
+        image = self.decode(1)
+        if image is None:
+            raise ValueError("Could not decode frame")
+        return image
+
+
+class DetectionFrame:
+    """
+    RGB image for detection, taken from the unmirrored camera frame.
+    Detectors given a DetectionFrame report landmarks for the display frame:
+    mirrored horizontally when mirrored is set, and scaled to output_size.
+    """
+    __slots__ = ('rgb', 'mirrored', 'output_size', 'buffer', 'users')
+
+    def __init__(self, rgb, mirrored, output_size, buffer=None, users=1):
+        self.rgb = rgb
+        self.mirrored = mirrored
+        self.output_size = output_size
+        self.buffer = buffer
+        self.users = users
+
+
+class FramePreprocessor:
+    """
+    Display and detection images of one session's frames. display() is meant
+    for the rendering thread; detection() leases a buffer that stays valid until
+    release() is called with the frame, typically by the AsyncDetector that
+    consumed it, so detection can run on another thread.
+    """
+
+    def __init__(self, display_size=None, detection_size=None, mirror=True, display_buffers=2,
+                 landmark_size=None):
+        """
+        :param display_size: (width, height) features render at, None keeps the frame's size
+        :param detection_size: (width, height) the detection image must fit in, None for full size
+        :param mirror: Mirror the display frame horizontally, for a selfie view
+        :param display_buffers: Display frames alternate between this many buffers, so the
+                                frame returned by the previous call stays valid during this one
+        :param landmark_size: (width, height) detectors report landmarks in, defaults to
+                              display_size. For features whose display is only a small
+                              camera preview but whose gestures work on a larger scale
+        """
+        self.display_size = display_size
+        self.landmark_size = landmark_size
+        self.detection_size = detection_size
+        self.mirror = mirror
+
+        self.display_buffers = display_buffers
+        self.buffers = FrameBuffers()
+        self.maps = None
+        self.maps_key = None
+
+        self.lock = threading.Lock()
+        self.free = []
+
+    @staticmethod
+    def frame_size(frame):
+        """(width, height) of a BGR frame or an EncodedFrame"""
+        if isinstance(frame, EncodedFrame):
+            return frame.size
+        return frame.shape[1], frame.shape[0]
+
+    def display(self, frame):
+        """
+        Mirrored display frame at display_size, in a reused buffer the caller may draw on
+        :param frame: BGR frame, or an EncodedFrame decoded no larger than needed
+        """
+        width, height = self.display_size or self.frame_size(frame)
+        if isinstance(frame, EncodedFrame):
+            frame = frame.image(width, height)
+        h, w = frame.shape[:2]
+        shape = (height, width) + frame.shape[2:]
+
+        out = self.buffers.get('display', shape, frame.dtype, copies=self.display_buffers)
+
+        if (width, height) == (w, h):
+            if self.mirror:
+                cv2.flip(frame, 1, dst=out)
+            else:
+                np.copyto(out, frame)
+        elif self.mirror:
+            # Mirror and resize in one pass
+            map1, map2 = self._maps(w, h, width, height)
+            cv2.remap(frame, map1, map2, cv2.INTER_LINEAR, dst=out)
+        else:
+            cv2.resize(frame, (width, height), dst=out, interpolation=cv2.INTER_AREA)
+        return out
+
+    def _maps(self, w, h, width, height):
+        """Fixed-point remap tables sampling the mirrored, resized frame"""
+        key = (w, h, width, height)
+        if self.maps_key != key:
+            xs = (width - 1 - np.arange(width, dtype=np.float32) + 0.5) * (w / width) - 0.5
+            ys = (np.arange(height, dtype=np.float32) + 0.5) * (h / height) - 0.5
+            map_x = np.broadcast_to(np.clip(xs, 0, w - 1), (height, width)).astype(np.float32)
+            map_y = np.broadcast_to(np.clip(ys, 0, h - 1)[:, None], (height, width)).astype(np.float32)
+            self.maps = cv2.convertMaps(map_x, map_y, cv2.CV_16SC2)
+            self.maps_key = key
+        return self.maps
+
+    def detection(self, frame, users=1):
+        """
+        RGB detection image of the unmirrored frame, in a leased buffer. An
+        EncodedFrame is decoded at the reduced scale closest to detection size
+        :param users: Number of release() calls after which the buffer is reused,
+                      when the frame is submitted to several detectors
+        """
+        w, h = self.frame_size(frame)
+        width, height = fit_size(w, h, self.detection_size)
+        if isinstance(frame, EncodedFrame):
+            frame = frame.image(width, height)
+        buffer = self._lease((height, width, 3))
+
+        if (width, height) == (frame.shape[1], frame.shape[0]):
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=buffer)
+        else:
+            # Shrink first so the color conversion runs on the small image only
+            small = self.buffers.get('small', buffer.shape)
+            cv2.resize(frame, (width, height), dst=small, interpolation=cv2.INTER_AREA)
+            cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=buffer)
+
+        output_size = self.landmark_size or self.display_size or (w, h)
+        return DetectionFrame(buffer, self.mirror, output_size, buffer, users)
+
+    def _lease(self, shape):
+        with self.lock:
+            while self.free:
+                buffer = self.free.pop()
+                if buffer.shape == shape:
+                    return buffer
+        return np.empty(shape, np.uint8)
+
+    def release(self, detection_frame):
+        """Hand a detection frame's buffer back once nothing reads it any more"""
+        if detection_frame is None or detection_frame.buffer is None:
+            return
+        with self.lock:
+            detection_frame.users -= 1
+            if detection_frame.users > 0 or detection_frame.buffer is None:
+                return
+            self.free.append(detection_frame.buffer)
+            detection_frame.buffer = None
@@ -0,0 +1,172 @@
+import heapq
+import itertools
+import threading
+
+
+class FrameMailbox:
+    """
+    Single-slot mailbox holding the newest unprocessed frame of one session.
+    A frame that arrives while another is still pending replaces it, so the
+    backlog per session never grows beyond one frame.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = None
+        self._draining = False
+        self.received = 0
+        self.dropped = 0
+
+    def put(self, frame_data):
+        """
+        Store a frame, replacing (and counting as dropped) any pending one.
+        :return: True if no drain is active, i.e. the caller must schedule one
+        """
+        with self._lock:
+            self.received += 1
+            if self._pending is not None:
+                self.dropped += 1
+            self._pending = frame_data
+            if self._draining:
+                return False
+            self._draining = True
+            return True
+
+    def take(self):
+        """Remove and return the pending frame, or None if the slot is empty"""
+        with self._lock:
+            frame_data, self._pending = self._pending, None
+            return frame_data
+
+    def finish(self):
+        """
+        Called by the drain after handling a frame.
+        :return: True if another frame is pending and the drain must continue
+        """
+        with self._lock:
+            if self._pending is None:
+                self._draining = False
+                return False
+            return True
+
+    def clear(self):
+        """Discard the pending frame without counting it as dropped"""
+        with self._lock:
+            self._pending = None
+
+    def stats(self):
+        with self._lock:
+            return {'received': self.received, 'dropped': self.dropped}
+
+
+class SessionLane:
+    """
+    Logical execution lane of one session. Frames of a session are processed
+    strictly one after another on whatever scheduler thread is free, while
+    lanes of different sessions run in parallel. Other work touching the
+    session's feature instance (key presses, stopping) takes the same lock.
+    """
+
+    def __init__(self, scheduler, handler, cost=1.0):
+        """
+        :param scheduler: FairScheduler lending the lane a thread while it has frames
+        :param handler: Callable invoked with each frame taken from the mailbox
+        :param cost: Relative cost of one frame, used by the scheduler to share threads fairly
+        """
+        self.scheduler = scheduler
+        self.handler = handler
+        self.cost = cost
+        self.virtual_finish = 0.0
+        self.mailbox = FrameMailbox()
+        self.lock = threading.RLock()
+
+    def post(self, frame_data):
+        """Queue a frame, scheduling the lane if it is idle"""
+        if self.mailbox.put(frame_data):
+            self.scheduler.schedule(self)
+
+    def run(self):
+        """Process one pending frame. Called by the scheduler"""
+        frame_data = self.mailbox.take()
+        if frame_data is not None:
+            try:
+                with self.lock:
+                    self.handler(frame_data)
+            except Exception as e:
+                print(f"❌ Error in session lane: {e}")
+
+        # Requeue instead of looping so a busy session does not hold on to a
+        # thread while other sessions wait
+        if self.mailbox.finish():
+            self.scheduler.schedule(self)
+
+
+class FairScheduler:
+    """
+    Thread pool that shares its workers fairly between session lanes, using
+    start-time fair queuing: every lane waiting for a thread is ordered by its
+    virtual start time, and each processed frame advances the lane's virtual
+    time by the frame's cost. A 30 fps client therefore cannot starve a 10 fps
+    one, and a session of a feature twice as expensive gets half as many
+    frames through when threads are contended. A lane that was idle re-enters
+    at the current virtual time, so idling does not bank credit.
+    """
+
+    def __init__(self, workers=2, name='frame-worker'):
+        """
+        :param workers: Number of worker threads
+        :param name: Thread name prefix
+        """
+        self.name = name
+        self.condition = threading.Condition()
+        self.ready = []
+        self.order = itertools.count()
+        self.virtual_time = 0.0
+        self.threads = []
+        self.running = True
+        self.add_workers(workers)
+
+    @property
+    def workers(self):
+        return len(self.threads)
+
+    def add_workers(self, count):
+        """Start additional worker threads"""
+        for _ in range(count):
+            thread = threading.Thread(target=self._work, name=f'{self.name}-{len(self.threads)}', daemon=True)
+            self.threads.append(thread)
+            thread.start()
+
+    def schedule(self, lane):
+        """Queue a lane that has a pending frame"""
+        with self.condition:
+            start = max(lane.virtual_finish, self.virtual_time)
+            heapq.heappush(self.ready, (start, next(self.order), lane))
+            self.condition.notify()
+
+    def queue_depth(self):
+        """Number of lanes waiting for a thread"""
+        with self.condition:
+            return len(self.ready)
+
+    def _work(self):
+        while True:
+            with self.condition:
+                while self.running and not self.ready:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                start, _, lane = heapq.heappop(self.ready)
+                self.virtual_time = start
+                lane.virtual_finish = start + lane.cost
+            lane.run()
+
+    def shutdown(self, wait=True):
+        """Stop the workers, discarding lanes still waiting"""
+        with self.condition:
+            self.running = False
+            self.ready.clear()
+            self.condition.notify_all()
+        if wait:
+            for thread in self.threads:
+                thread.join(timeout=5)
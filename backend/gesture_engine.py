@@ -0,0 +1,176 @@
+"""
+Declarative hand gestures.
+
+Features describe the gestures they react to as a table of named Gesture
+patterns (which fingers are up, which landmarks must be close together or
+apart, which joint angles are allowed) instead of hand-written fingersUp
+if-chains. GestureEngine compiles the table into arrays once, then computes
+finger states, landmark distances and joint angles for all detected hands in
+one NumPy pass per frame and matches every gesture at once, so the cost does
+not grow with the number of gestures a feature defines.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+# Landmark indices of the finger tips and of the joints they are compared with
+TIP_IDS = np.array([4, 8, 12, 16, 20])
+FINGER_BASE_IDS = np.array([6, 10, 14, 18])
+
+# fingers: 5 states (1 up, 0 down, None any) from thumb to pinky
+# near: (a, b, maxDistance) landmark pairs that must be at most maxDistance pixels apart
+# far: (a, b, minDistance) landmark pairs that must be at least minDistance pixels apart
+# angles: ((a, b, c), minDegrees, maxDegrees) allowed angle at landmark b
+Gesture = namedtuple('Gesture', ('fingers', 'near', 'far', 'angles'), defaults=(None, (), (), ()))
+
+
+def fingerStates(landmarks):
+    """
+    Which fingers are up, for one hand (21x3) or a stack of hands (Nx21x3).
+    The thumb is up when its tip is right of its IP joint (in image
+    coordinates), the other fingers when their tip is above their PIP joint.
+    :return: Boolean array of shape (..., 5)
+    """
+    thumb = landmarks[..., TIP_IDS[0], 0] > landmarks[..., TIP_IDS[0] - 1, 0]
+    others = landmarks[..., TIP_IDS[1:], 1] < landmarks[..., FINGER_BASE_IDS, 1]
+    return np.concatenate([thumb[..., None], others], axis=-1)
+
+
+class GestureEngine:
+    """Gesture table compiled to arrays, shared by all sessions of a feature"""
+
+    def __init__(self, gestures, measures=None):
+        """
+        :param gestures: Dict of name -> Gesture. When several match, the first one listed wins
+        :param measures: Dict of name -> landmark pair (distance in pixels) or
+                         triple (angle in degrees at the middle landmark) the
+                         feature reads per hand, e.g. {'pinch': (4, 8)}
+        """
+        self.names = list(gestures)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        count = len(self.names)
+
+        self.pattern = np.zeros((count, 5), bool)
+        self.mask = np.zeros((count, 5), bool)
+        pairs, triples = {}, {}
+        distanceRules, angleRules = [], []
+
+        for g, name in enumerate(self.names):
+            gesture = gestures[name]
+            if gesture.fingers is not None:
+                for f, state in enumerate(gesture.fingers):
+                    if state is not None:
+                        self.mask[g, f] = True
+                        self.pattern[g, f] = bool(state)
+            for a, b, limit in gesture.near:
+                distanceRules.append((g, pairs.setdefault((a, b), len(pairs)), 0.0, limit))
+            for a, b, limit in gesture.far:
+                distanceRules.append((g, pairs.setdefault((a, b), len(pairs)), limit, np.inf))
+            for triple, low, high in gesture.angles:
+                angleRules.append((g, triples.setdefault(tuple(triple), len(triples)), low, high))
+
+        self.measures = {}
+        for name, points in (measures or {}).items():
+            points = tuple(points)
+            if len(points) == 2:
+                self.measures[name] = ('distance', pairs.setdefault(points, len(pairs)))
+            elif len(points) == 3:
+                self.measures[name] = ('angle', triples.setdefault(points, len(triples)))
+            else:
+                raise ValueError(f"Measure {name} needs 2 or 3 landmarks, got {points}")
+
+        self.pairs = np.array(list(pairs), np.intp).reshape(-1, 2)
+        self.triples = np.array(list(triples), np.intp).reshape(-1, 3)
+        self.distanceRules = self._compileRules(distanceRules, count)
+        self.angleRules = self._compileRules(angleRules, count)
+
+    @staticmethod
+    def _compileRules(rules, count):
+        """Rules as (columns, low, high, owner) where owner maps rules to gestures (rules x gestures)"""
+        owner = np.zeros((len(rules), count), np.int32)
+        for r, (g, _, _, _) in enumerate(rules):
+            owner[r, g] = 1
+        columns = np.array([rule[1] for rule in rules], np.intp)
+        low = np.array([rule[2] for rule in rules], np.float32)
+        high = np.array([rule[3] for rule in rules], np.float32)
+        return columns, low, high, owner
+
+    @staticmethod
+    def _violations(values, rules):
+        columns, low, high, owner = rules
+        if len(columns) == 0:
+            return 0
+        selected = values[:, columns]
+        broken = ((selected < low) | (selected > high)).astype(np.int32)
+        return broken @ owner
+
+    def evaluate(self, hands):
+        """
+        Finger states, measures and matching gestures of all hands in one pass
+        :param hands: Hand objects from HandDetector
+        :return: GestureFrame
+        """
+        if not hands:
+            landmarks = np.zeros((0, 21, 3), np.float32)
+        else:
+            landmarks = np.stack([hand.landmarks for hand in hands]).astype(np.float32)
+        points = landmarks[..., :2]
+
+        fingers = fingerStates(landmarks)
+
+        start = points[:, self.pairs[:, 0]]
+        distances = np.linalg.norm(points[:, self.pairs[:, 1]] - start, axis=-1)
+
+        v1 = points[:, self.triples[:, 0]] - points[:, self.triples[:, 1]]
+        v2 = points[:, self.triples[:, 2]] - points[:, self.triples[:, 1]]
+        cross = v1[..., 0] * v2[..., 1] - v1[..., 1] * v2[..., 0]
+        dot = (v1 * v2).sum(axis=-1)
+        angles = np.degrees(np.arctan2(np.abs(cross), dot))
+
+        matches = ((fingers[:, None, :] == self.pattern) | ~self.mask).all(axis=-1)
+        matches &= self._violations(distances, self.distanceRules) == 0
+        matches &= self._violations(angles, self.angleRules) == 0
+
+        return GestureFrame(self, list(hands or []), fingers, distances, angles, matches)
+
+
+class GestureFrame:
+    """Gesture state of the hands of one frame, hands are addressed by their index in findHands' list"""
+    __slots__ = ('engine', 'hands', 'fingers', 'distances', 'angles', 'matches')
+
+    def __init__(self, engine, hands, fingers, distances, angles, matches):
+        self.engine = engine
+        self.hands = hands
+        self.fingers = fingers
+        self.distances = distances
+        self.angles = angles
+        self.matches = matches
+
+    def __len__(self):
+        return len(self.hands)
+
+    def fingersUp(self, hand=0):
+        """Finger states of a hand as a list, like HandDetector.fingersUp"""
+        return self.fingers[hand].astype(int).tolist()
+
+    def isGesture(self, name, hand=0):
+        """Whether a hand shows the named gesture"""
+        return hand < len(self.hands) and bool(self.matches[hand, self.engine.index[name]])
+
+    def anyGesture(self, name):
+        """Whether any hand shows the named gesture"""
+        return bool(self.matches[:, self.engine.index[name]].any())
+
+    def gesture(self, hand=0):
+        """First gesture of the table a hand matches, or None"""
+        if hand >= len(self.hands):
+            return None
+        found = np.flatnonzero(self.matches[hand])
+        return self.engine.names[found[0]] if len(found) else None
+
+    def measure(self, name, hand=0):
+        """Value of a named measure of a hand: distance in pixels or angle in degrees"""
+        kind, column = self.engine.measures[name]
+        values = self.distances if kind == 'distance' else self.angles
+        return float(values[hand, column])
@@ -0,0 +1,106 @@
+import os
+import threading
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+
+class GraphPool:
+    """
+    Thread-safe pools of idle MediaPipe graphs, keyed by their configuration.
+
+    A graph processes one image at a time. Static-image graphs keep no state
+    between images, so callers check one out around each process() call and
+    any number of sessions share a few graphs. Video-mode graphs track hands
+    or poses from frame to frame, so a detector holds one for the life of its
+    stream and checks it back in when the stream ends; it is reset before it
+    serves another stream.
+    """
+
+    def __init__(self, max_idle=4):
+        """
+        :param max_idle: Maximum number of idle graphs kept per configuration
+        """
+        self.max_idle = max_idle
+        self.idle = defaultdict(deque)
+        self.lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.in_use = 0
+
+    def checkout(self, key, factory):
+        """
+        Return an idle graph of a configuration, building one with factory() if none is available
+        :param key: Hashable configuration, graphs with the same key are interchangeable
+        """
+        with self.lock:
+            idle = self.idle[key]
+            graph = idle.pop() if idle else None
+            if graph is not None:
+                self.reused += 1
+            else:
+                self.created += 1
+            self.in_use += 1
+        if graph is None:
+            try:
+                graph = factory()
+            except Exception:
+                with self.lock:
+                    self.in_use -= 1
+                raise
+        return graph
+
+    def checkin(self, key, graph, reset=False):
+        """
+        Return a graph to the pool, closing it if the pool is full
+        :param reset: Clear the graph's tracking state first, for video-mode graphs
+        """
+        if graph is None:
+            return
+        keep = True
+        if reset and hasattr(graph, 'reset'):
+            try:
+                graph.reset()
+            except Exception as e:
+                print(f"⚠️  Could not reset MediaPipe graph: {e}")
+                keep = False
+
+        with self.lock:
+            self.in_use -= 1
+            idle = self.idle[key]
+            if keep and len(idle) < self.max_idle:
+                idle.append(graph)
+                return
+        graph.close()
+
+    @contextmanager
+    def graph(self, key, factory):
+        """Check out a graph for the duration of the with block"""
+        graph = self.checkout(key, factory)
+        try:
+            yield graph
+        finally:
+            self.checkin(key, graph)
+
+    def clear(self):
+        """Close every idle graph"""
+        with self.lock:
+            graphs = [graph for idle in self.idle.values() for graph in idle]
+            self.idle.clear()
+        for graph in graphs:
+            try:
+                graph.close()
+            except Exception as e:
+                print(f"⚠️  Error closing pooled graph: {e}")
+
+    def stats(self):
+        with self.lock:
+            return {
+                'idle': sum(len(idle) for idle in self.idle.values()),
+                'in_use': self.in_use,
+                'created': self.created,
+                'reused': self.reused
+            }
+
+
+# Shared by every detector of the process
+graph_pool = GraphPool(max_idle=int(os.getenv('GRAPH_POOL_SIZE', 4)))
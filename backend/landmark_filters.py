@@ -0,0 +1,117 @@
+"""
+Smoothing and short-term prediction of hand landmarks.
+
+HandFilter sits on the Hand objects produced by HandDetector: it runs a
+One-Euro filter per hand over all 21 landmarks, which removes jitter at low
+speeds while keeping lag low during fast moves, and keeps the filtered
+velocity so landmarks can be extrapolated for frames where detection was
+skipped. Detection can then run at 10-15 Hz while features render at 30 fps.
+"""
+
+import math
+import time
+import threading
+
+import numpy as np
+
+
+class OneEuroFilter:
+    """One-Euro filter over an array of values, see Casiez et al., CHI 2012"""
+
+    def __init__(self, minCutoff=1.5, beta=0.01, dCutoff=1.0):
+        """
+        :param minCutoff: Cutoff frequency in Hz at rest, lower is smoother
+        :param beta: Increase of the cutoff per unit of speed, higher reduces lag on fast moves
+        :param dCutoff: Cutoff frequency in Hz for the velocity estimate
+        """
+        self.minCutoff = minCutoff
+        self.beta = beta
+        self.dCutoff = dCutoff
+        self.value = None
+        self.velocity = None
+        self.time = None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, value, t):
+        value = np.asarray(value, dtype=np.float32)
+        if self.value is None or self.value.shape != value.shape:
+            self.value = value
+            self.velocity = np.zeros_like(value)
+            self.time = t
+            return value
+
+        dt = max(t - self.time, 1e-3)
+        alphaD = self._alpha(self.dCutoff, dt)
+        self.velocity = alphaD * (value - self.value) / dt + (1 - alphaD) * self.velocity
+
+        cutoff = self.minCutoff + self.beta * np.abs(self.velocity)
+        alpha = self._alpha(cutoff, dt)
+        self.value = alpha * value + (1 - alpha) * self.value
+        self.time = t
+        return self.value
+
+    def predict(self, t, maxHorizon):
+        """Extrapolate the filtered value to time t, at most maxHorizon seconds ahead"""
+        horizon = min(max(t - self.time, 0.0), maxHorizon)
+        return self.value + self.velocity * horizon
+
+
+class HandFilter:
+    """
+    Per-hand landmark filters. Hands are matched between detections by their
+    tracking id when HandDetector provides one, otherwise by type and order.
+    """
+
+    def __init__(self, minCutoff=1.5, beta=0.01, dCutoff=1.0, maxPrediction=0.15, lostAfter=0.3):
+        """
+        :param minCutoff, beta, dCutoff: One-Euro filter settings, see OneEuroFilter
+        :param maxPrediction: Longest time in seconds landmarks are extrapolated ahead
+        :param lostAfter: Seconds without a detection after which a hand is no longer reported
+        """
+        self.settings = (minCutoff, beta, dCutoff)
+        self.maxPrediction = maxPrediction
+        self.lostAfter = lostAfter
+        self.lock = threading.Lock()
+        self.tracks = {}
+
+    @staticmethod
+    def _key(hand, index):
+        return hand.id if hand.id is not None else (hand.type, index)
+
+    def update(self, hands, t=None):
+        """Feed freshly detected hands, returning them smoothed"""
+        t = time.time() if t is None else t
+        smoothed = []
+        with self.lock:
+            seen = set()
+            for index, hand in enumerate(hands):
+                key = self._key(hand, index)
+                seen.add(key)
+                track = self.tracks.get(key)
+                if track is None:
+                    track = self.tracks[key] = {'filter': OneEuroFilter(*self.settings)}
+                points = track['filter'](hand.landmarks, t)
+                track['hand'] = hand.withLandmarks(points)
+                track['time'] = t
+                smoothed.append(track['hand'])
+
+            # Hands that were not detected again are gone
+            for key in list(self.tracks):
+                if key not in seen:
+                    del self.tracks[key]
+        return smoothed
+
+    def predict(self, t=None):
+        """Hands extrapolated to time t from their last smoothed position and velocity"""
+        t = time.time() if t is None else t
+        with self.lock:
+            return [track['hand'].withLandmarks(track['filter'].predict(t, self.maxPrediction))
+                    for track in self.tracks.values() if t - track['time'] <= self.lostAfter]
+
+    def reset(self):
+        with self.lock:
+            self.tracks.clear()
@@ -242,8 +242,7 @@
 
 import traceback
 import sys
-import importlib
-from flask import Flask, request
+from flask import Flask, Response, request
 from flask_socketio import SocketIO, emit
 from flask_cors import CORS
 import base64
@@ -253,8 +252,17 @@ import os
 import threading
 import time
 import gc
-from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from functools import partial
+from frame_scheduler import SessionLane, FairScheduler
+from frame_encoders import AdaptiveEncoderController
+from admission import AdmissionController, QUALITY_TIERS, parse_budgets
+from metrics import registry, Gauge, stage_latency, frames_received, frames_dropped, frames_errored
+from graph_pool import graph_pool
+from frame_preprocess import EncodedFrame
+from feature_loader import (feature_registry, loaded_modules, feature_classes, feature_readiness,
+                            feature_pool, create_feature_instance, release_feature_instance,
+                            warm_up_feature, warmup_feature_names, feature_costs)
 
 load_dotenv()
 app = Flask(__name__)
@@ -278,93 +286,59 @@ socketio = SocketIO(
     async_mode='threading'
 )
 
-# Thread pool for processing frames
-executor = ThreadPoolExecutor(max_workers=2)  # Reduced for better resource management
+# Threads processing frames, shared fairly between sessions. Frames of one session
+# never run concurrently (see SessionLane), so this can be raised on bigger machines
+# without races.
+FRAME_WORKERS = int(os.getenv('FRAME_WORKERS', 2))
+scheduler = FairScheduler(workers=FRAME_WORKERS)
 
-# Dictionary to store active feature instances and their stream threads
-active_features = {}
+# Relative per-frame cost of each feature: a session of a feature twice as
+# expensive gets half as many frames through while threads are contended
+FEATURE_COSTS = feature_costs(os.getenv('FEATURE_COSTS', ''))
 
-# Feature registry - maps feature names to their module and class names
-feature_registry = {
-    'virtual-mouse': {
-        'module': 'Virtual_Mouse_app',
-        'class': 'VirtualMouse',
-        'description': 'Control mouse with hand gestures'
-    },
-    'virtual-painter': {
-        'module': 'Virtual_Paint_app', 
-        'class': 'VirtualPainter',
-        'description': 'Draw in air with finger tracking'
-    },
-    'volume-control': {
-        'module': 'Volume_Controll_App',
-        'class': 'VolumeControl', 
-        'description': 'Control system volume with gestures'
-    },
-    'pong-game': {
-        'module': 'Pong_Game_app',
-        'class': 'PongGame',
-        'description': 'Play Pong with hand movements'
-    },
-    'fitness-tracker': {
-        'module': 'Fitness_Tracker_App',
-        'class': 'ArmCurlsCounter',
-        'description': 'Count arm curls automatically'
-    },
-    'ppt-presenter': {
-        'module': 'PPT_Presentation_App',
-        'class': 'PresentationController', 
-        'description': 'Control presentations with gestures'
-    }
-}
+# Execution backend for feature instances: 'thread' runs them in this process,
+# 'process' hosts them in worker processes (see process_workers) to use all cores
+FRAME_BACKEND = os.getenv('FRAME_BACKEND', 'thread').lower()
+worker_pool = None
 
-# Cache for dynamically loaded modules and classes
-loaded_modules = {}
-feature_classes = {}
+# Dictionary to store active feature instances and their stream threads
+active_features = {}
 
-def dynamic_import_feature(feature_name):
-    """Dynamically import a feature module and class"""
-    if feature_name not in feature_registry:
-        raise ValueError(f"Unknown feature: {feature_name}")
-    
-    feature_config = feature_registry[feature_name]
-    module_name = feature_config['module']
-    class_name = feature_config['class']
-    
-    try:
-        # Check if module is already loaded
-        if module_name not in loaded_modules:
-            print(f"📦 Dynamically importing {module_name}...")
-            
-            # Import the module
-            module = importlib.import_module(module_name)
-            loaded_modules[module_name] = module
-            
-            print(f"✅ Successfully imported {module_name}")
+# Output frame settings used when the client does not negotiate its own
+DEFAULT_OUTPUT_SIZE = (1280, 720)
+DEFAULT_JPEG_QUALITY = 60
+MIN_OUTPUT_SIZE = (160, 90)
+
+# Let each session's encoder controller trade quality/format for latency
+ADAPTIVE_ENCODING = os.getenv('ADAPTIVE_ENCODING', 'true').lower() == 'true'
+
+# Gauges read when /metrics is scraped
+registry.register(Gauge('cv_scheduler_queue_depth', 'Sessions with a frame waiting for a thread',
+                        function=lambda: scheduler.queue_depth()))
+registry.register(Gauge('cv_active_sessions', 'Sessions with a running feature',
+                        function=lambda: len(active_features)))
+
+# Admission control: sessions a worker can sustain per feature (measured when
+# not configured), the frame rate every admitted session must get, and how
+# many sessions may wait for capacity before new ones are rejected
+admission = AdmissionController(workers=FRAME_WORKERS,
+                                costs=FEATURE_COSTS,
+                                budgets=parse_budgets(os.getenv('SESSION_BUDGETS', '')),
+                                target_fps=float(os.getenv('ADMISSION_TARGET_FPS', 15)),
+                                queue_limit=int(os.getenv('ADMISSION_QUEUE', 10)))
+
+# Features to import and prime at startup: 'all' or a comma separated list
+WARMUP_FEATURES = warmup_feature_names(os.getenv('WARMUP_FEATURES', ''))
+
+def warm_up_features():
+    """Prime the configured features, in this process or in every worker process"""
+    for feature_name in WARMUP_FEATURES:
+        if worker_pool is not None:
+            feature_readiness[feature_name] = 'warming'
+            feature_readiness[feature_name] = worker_pool.warm_up(feature_name)
         else:
-            print(f"♻️  Using cached module {module_name}")
-            module = loaded_modules[module_name]
-        
-        # Get the class from the module
-        if feature_name not in feature_classes:
-            feature_class = getattr(module, class_name)
-            feature_classes[feature_name] = feature_class
-            print(f"✅ Successfully loaded class {class_name}")
-        else:
-            print(f"♻️  Using cached class {class_name}")
-            feature_class = feature_classes[feature_name]
-        
-        return feature_class
-        
-    except ImportError as e:
-        print(f"❌ Import error for {module_name}: {e}")
-        raise
-    except AttributeError as e:
-        print(f"❌ Class {class_name} not found in {module_name}: {e}")
-        raise
-    except Exception as e:
-        print(f"❌ Unexpected error loading {feature_name}: {e}")
-        raise
+            warm_up_feature(feature_name)
+    print(f"🔥 Warm-up finished: {feature_readiness}")
 
 def cleanup_unused_features():
     """Attempt to clean up unused feature instances"""
@@ -399,7 +373,17 @@ def health_check():
 
 @app.route('/health')
 def health():
-    return {'status': 'ok'}, 200
+    """Report 503 until configured warm-up is done so load balancers only route to warm servers"""
+    warming = [name for name in WARMUP_FEATURES if feature_readiness[name] == 'warming']
+    return {
+        'status': 'warming' if warming else 'ok',
+        'features': dict(feature_readiness)
+    }, 503 if warming else 200
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrics: per-stage frame latency, frame counters and load gauges"""
+    return Response(registry.render(), mimetype=registry.content_type)
 
 @app.route('/features')
 def get_features():
@@ -408,44 +392,132 @@ def get_features():
         'features': {
             name: {
                 'description': config['description'],
-                'loaded': name in feature_classes
+                'loaded': name in feature_classes,
+                'readiness': feature_readiness[name]
             }
             for name, config in feature_registry.items()
         }
     }
 
-def process_frame_async(session_id, image_data):
-    """Process frame asynchronously to avoid blocking SocketIO"""
+def negotiate_output(data):
+    """Read the output size and JPEG quality requested in start_feature, clamped to sane limits"""
+    try:
+        width = int(data.get('output_width') or DEFAULT_OUTPUT_SIZE[0])
+        height = int(data.get('output_height') or DEFAULT_OUTPUT_SIZE[1])
+        quality = int(data.get('jpeg_quality') or DEFAULT_JPEG_QUALITY)
+    except (TypeError, ValueError):
+        return DEFAULT_OUTPUT_SIZE, DEFAULT_JPEG_QUALITY
+
+    width = max(MIN_OUTPUT_SIZE[0], min(width, DEFAULT_OUTPUT_SIZE[0]))
+    height = max(MIN_OUTPUT_SIZE[1], min(height, DEFAULT_OUTPUT_SIZE[1]))
+    quality = max(10, min(quality, 95))
+    return (width, height), quality
+
+def create_encoder(data, quality):
+    """Build the encoder controller for a session from the formats its client can display"""
+    formats = data.get('formats') or ['jpeg']
+    if not isinstance(formats, (list, tuple)):
+        formats = ['jpeg']
+    return AdaptiveEncoderController(quality=quality,
+                                     formats=formats,
+                                     preferred=data.get('format', 'jpeg'),
+                                     adaptive=ADAPTIVE_ENCODING)
+
+def server_time_ms():
+    """Wall clock in milliseconds, the unit of all frame trace timestamps"""
+    return round(time.time() * 1000, 1)
+
+def process_frame_async(session_id, frame_data):
+    """
+    Process frame asynchronously to avoid blocking SocketIO.
+    :param frame_data: Dict with the image plus the client's seq and capture_ts
+                       and the server's recv_ts, which are echoed back in the
+                       processed_frame trace together with the stage timestamps
+    """
+    feature_name = None
+    trace = {
+        'seq': frame_data.get('seq'),
+        'capture_ts': frame_data.get('capture_ts'),
+        'recv_ts': frame_data.get('recv_ts'),
+        'start_ts': server_time_ms()
+    }
+    image_data = frame_data['image']
     try:
         if session_id not in active_features or 'instance' not in active_features[session_id]:
             socketio.emit('error', {'message': 'No active feature to process frame'}, room=session_id)
             return
+        feature_name = active_features[session_id]['name']
 
-        # Convert base64 string to image
-        img_bytes = base64.b64decode(image_data)
-        nparr = np.frombuffer(img_bytes, np.uint8)
-        frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-
-        if frame is None or frame.size == 0:
+        # Binary clients send raw JPEG bytes as a Socket.IO attachment,
+        # legacy clients send a base64 string
+        if isinstance(image_data, (bytes, bytearray, memoryview)):
+            nparr = np.frombuffer(image_data, np.uint8)
+        else:
+            with stage_latency.time(stage='b64decode', feature=feature_name):
+                nparr = np.frombuffer(base64.b64decode(image_data), np.uint8)
+        # Features that preprocess with FramePreprocessor take the JPEG as is and
+        # decode each image at the resolution they need, only its header is read
+        # here. Their decodes are reported as 'imdecode' after process_frame
+        feature = active_features[session_id]['instance']
+        encoded = getattr(feature, 'accepts_encoded_frames', False)
+        with stage_latency.time(stage='header_parse' if encoded else 'imdecode', feature=feature_name):
+            if encoded:
+                frame = EncodedFrame(nparr)
+                frame = frame if frame.valid else None
+            else:
+                frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+
+        if frame is None or (isinstance(frame, np.ndarray) and frame.size == 0):
             print("⚠️  Received invalid frame")
+            frames_errored.inc(feature=feature_name)
             return
+        trace['decode_ts'] = server_time_ms()
 
         # Check if feature is still running
         if not active_features[session_id].get('running', False):
             return
 
-        # Process the frame with the active feature
-        feature = active_features[session_id]['instance']
+        # Features with a logical coordinate space render at the negotiated size
+        # directly. Applied here, in the session's lane, so it never races a frame
+        session = active_features[session_id]
+        if session.get('render_size') != session['output_size'] and hasattr(feature, 'set_render_size'):
+            feature.set_render_size(session['output_size'])
+            session['render_size'] = session['output_size']
+
+        # Process the frame with the active feature. Decodes of an encoded
+        # frame happen in there and are timed as their own stage
+        decoded = frame.decode_time if encoded else 0.0
+        start = time.perf_counter()
         processed_frame = feature.process_frame(frame)
+        elapsed = time.perf_counter() - start
+        if encoded:
+            decode_time = frame.decode_time - decoded
+            stage_latency.observe(decode_time, stage='imdecode', feature=feature_name)
+            elapsed -= decode_time
+        stage_latency.observe(elapsed, stage='process', feature=feature_name)
+        trace['process_ts'] = server_time_ms()
+        admission.observe(feature_name, (trace['process_ts'] - trace['decode_ts']) / 1000)
 
         if processed_frame is not None and active_features[session_id].get('running', False):
             # Encode the processed frame
-            processed_encoded = encode_frame(processed_frame)
-            if processed_encoded:
+            session = active_features[session_id]
+            with stage_latency.time(stage='encode', feature=feature_name):
+                message = encode_frame(processed_frame,
+                                       session['encoder'],
+                                       size=session['output_size'],
+                                       binary=session['binary'])
+            if message:
+                trace['encode_ts'] = server_time_ms()
+                message['trace'] = trace
                 # Send back to client
-                socketio.emit('processed_frame', {'image': processed_encoded}, room=session_id)
+                with stage_latency.time(stage='emit', feature=feature_name):
+                    socketio.emit('processed_frame', message, room=session_id)
+            else:
+                frames_errored.inc(feature=feature_name)
                 
     except Exception as e:
+        if feature_name is not None:
+            frames_errored.inc(feature=feature_name)
         print(f"❌ Error processing frame: {e}")
         traceback.print_exc()
         socketio.emit('error', {'message': f'Error processing frame: {str(e)}'}, room=session_id)
@@ -464,8 +536,31 @@ def process_frame(data):
         emit('error', {'message': 'No active feature to process frame'})
         return
 
-    # Process frame in background thread to avoid blocking
-    executor.submit(process_frame_async, session_id, image_data)
+    # Latest frame wins: a pending frame is replaced and counted as dropped,
+    # and the session's lane processes its frames strictly one at a time
+    session = active_features[session_id]
+    frames_received.inc(feature=session['name'])
+
+    # Degraded tiers cap the frame rate processed per session. Frames are due
+    # on a fixed schedule so client jitter does not halve the rate
+    interval = session['min_frame_interval']
+    if interval:
+        now = time.time()
+        if now < session['next_frame_time']:
+            frames_dropped.inc(feature=session['name'])
+            return
+        session['next_frame_time'] = max(session['next_frame_time'], now - interval) + interval
+
+    mailbox = session['lane'].mailbox
+    dropped = mailbox.dropped
+    session['lane'].post({
+        'image': image_data,
+        'seq': data.get('seq'),
+        'capture_ts': data.get('capture_ts'),
+        'recv_ts': server_time_ms()
+    })
+    if mailbox.dropped > dropped:
+        frames_dropped.inc(feature=session['name'])
 
 @socketio.on('start_feature')
 def start_feature(data):
@@ -484,34 +579,51 @@ def start_feature(data):
         emit('error', {'message': f'Invalid feature name: {feature_name}'})
         return
 
+    status, position = admission.admit(session_id, feature_name, data)
+    if status == 'rejected':
+        print(f"⛔ Server full, rejected {feature_name} for session {session_id}")
+        emit('error', {'message': 'The server is at capacity, please try again in a few minutes',
+                       'code': 'capacity'})
+        apply_quality_tier()
+        return
+    if status == 'queued':
+        print(f"⏳ Server full, queued {feature_name} for session {session_id} at position {position}")
+        emit('error', {'message': f'The server is at capacity, you are number {position} in the queue',
+                       'code': 'queued',
+                       'position': position})
+        apply_quality_tier()
+        return
+
+    launch_feature(session_id, data)
+
+def launch_feature(session_id, data):
+    """Create the feature instance of an admitted session and tell its client to start sending frames"""
+    feature_name = data.get('feature')
     try:
         # Dynamic import of the requested feature
         print(f"📦 Loading feature: {feature_name}")
-        feature_class = dynamic_import_feature(feature_name)
-        
-        print(f"🏗️  Creating instance of {feature_name}")
-        feature_instance = feature_class()
-
-        # Handle cloud environment setup
-        if os.getenv('RENDER'):
-            # Disable camera-related features for cloud deployment
-            if hasattr(feature_instance, 'setup_camera'):
-                feature_instance.setup_camera = lambda: None
-            
-            # For features that might try to access camera during initialization
-            if hasattr(feature_instance, 'cap'):
-                feature_instance.cap = None
+        if worker_pool is not None:
+            feature_instance = worker_pool.start_session(session_id, feature_name)
+        else:
+            feature_instance = create_feature_instance(feature_name)
 
-        # Disable actual mouse control by default for safety
-        if feature_name == 'virtual-mouse' and hasattr(feature_instance, 'toggle_control'):
-            feature_instance.toggle_control(False)
+        output_size, jpeg_quality = negotiate_output(data)
 
         # Store the feature instance
         active_features[session_id] = {
             'name': feature_name,
             'instance': feature_instance,
             'running': True,
-            'start_time': time.time()
+            'start_time': time.time(),
+            'binary': bool(data.get('binary', False)),
+            'negotiated_size': output_size,
+            'output_size': output_size,
+            'tier': 'full',
+            'min_frame_interval': 0.0,
+            'next_frame_time': 0.0,
+            'encoder': create_encoder(data, jpeg_quality),
+            'lane': SessionLane(scheduler, partial(process_frame_async, session_id),
+                                cost=FEATURE_COSTS[feature_name])
         }
 
         print(f"✅ Feature {feature_name} started successfully")
@@ -520,40 +632,80 @@ def start_feature(data):
         cleanup_unused_features()
         
         # Notify client that we're ready to receive frames
-        emit('ready_for_frames', {
+        socketio.emit('ready_for_frames', {
             'feature': feature_name, 
             'status': 'ready',
+            'binary': active_features[session_id]['binary'],
+            'output_width': output_size[0],
+            'output_height': output_size[1],
+            'jpeg_quality': jpeg_quality,
+            'format': active_features[session_id]['encoder'].format,
             'description': feature_registry[feature_name]['description']
-        })
-        emit('feature_started', {'feature': feature_name, 'status': 'success'})
+        }, room=session_id)
+        socketio.emit('feature_started', {'feature': feature_name, 'status': 'success'}, room=session_id)
 
     except Exception as e:
         print(f"❌ Error starting feature {feature_name}: {e}")
         traceback.print_exc()
-        emit('error', {'message': f'Error starting feature {feature_name}: {str(e)}'})
+        admission.release(session_id)
+        socketio.emit('error', {'message': f'Error starting feature {feature_name}: {str(e)}'}, room=session_id)
+
+    apply_quality_tier()
+
+def apply_quality_tier():
+    """Move every running session to the quality tier matching the current load"""
+    tier_name = admission.tier()
+    tier = QUALITY_TIERS[tier_name]
+    for session_id, session in list(active_features.items()):
+        if session.get('tier') == tier_name:
+            continue
+        width, height = session['negotiated_size']
+        session['output_size'] = (max(MIN_OUTPUT_SIZE[0], int(width * tier['scale'])),
+                                  max(MIN_OUTPUT_SIZE[1], int(height * tier['scale'])))
+        session['encoder'].limit_quality(tier['max_quality'])
+        session['min_frame_interval'] = 1.0 / tier['max_fps'] if tier['max_fps'] else 0.0
+        session['tier'] = tier_name
+        print(f"📉 Session {session_id} moved to {tier_name} quality tier")
+        socketio.emit('quality_tier', {
+            'tier': tier_name,
+            'max_fps': tier['max_fps'],
+            'output_width': session['output_size'][0],
+            'output_height': session['output_size'][1]
+        }, room=session_id)
+
+    # Let queued clients know where they stand
+    for session_id, position in admission.positions().items():
+        socketio.emit('admission', {'status': 'queued', 'position': position}, room=session_id)
 
 @socketio.on('stop_feature')
 def stop_feature(data):
     """Stop the currently running feature"""
     session_id = data.get('session_id', request.sid)
+    promoted = admission.release(session_id)
 
     if session_id in active_features:
         try:
             feature_info = active_features[session_id]
             feature_name = feature_info['name']
             run_time = time.time() - feature_info.get('start_time', 0)
+            lane = feature_info['lane']
+            frame_stats = lane.mailbox.stats()
             
-            print(f"🛑 STOPPING FEATURE: {feature_name} for session {session_id} (ran for {run_time:.1f}s)")
+            print(f"🛑 STOPPING FEATURE: {feature_name} for session {session_id} (ran for {run_time:.1f}s, "
+                  f"{frame_stats['received']} frames received, {frame_stats['dropped']} dropped)")
 
             active_features[session_id]['running'] = False
+            lane.mailbox.clear()
             
             if 'instance' in active_features[session_id]:
                 try:
-                    instance = active_features[session_id]['instance']
-                    if hasattr(instance, 'stop'):
-                        instance.stop()
-                    # Clear the instance reference
-                    active_features[session_id]['instance'] = None
+                    # Wait for an in-flight frame of this session to finish first
+                    with lane.lock:
+                        instance = active_features[session_id]['instance']
+                        # Recycled into the warm pool, or stopped if it cannot be reused
+                        release_feature_instance(feature_name, instance)
+                        # Clear the instance reference
+                        active_features[session_id]['instance'] = None
                 except Exception as e:
                     print(f"⚠️  Warning during feature stop: {e}")
 
@@ -567,6 +719,12 @@ def stop_feature(data):
             print(f"❌ Error stopping feature: {e}")
             traceback.print_exc()
 
+    # Start sessions that were waiting for the capacity just freed
+    for waiting_id, waiting_data in promoted:
+        print(f"✅ Admitting queued session {waiting_id}")
+        launch_feature(waiting_id, waiting_data)
+    apply_quality_tier()
+
 @socketio.on('key_press')
 def handle_key_press(data):
     """Forward key presses to the active feature"""
@@ -576,7 +734,9 @@ def handle_key_press(data):
             feature = active_features[session_id]['instance']
             if feature and hasattr(feature, 'handle_key_press'):
                 print(f"⌨️  Key press: {data.get('key')}")
-                feature.handle_key_press(data)
+                # Serialize with the session's frame processing
+                with active_features[session_id]['lane'].lock:
+                    feature.handle_key_press(data)
             
             # Handle global key commands
             if data.get('key') == 'q':
@@ -586,8 +746,13 @@ def handle_key_press(data):
             print(f"❌ Error handling key press: {e}")
             traceback.print_exc()
 
-def encode_frame(frame):
-    """Encode frame to base64 with error handling"""
+def encode_frame(frame, encoder, size=DEFAULT_OUTPUT_SIZE, binary=False):
+    """
+    Encode frame at the session's negotiated size with the format and quality
+    chosen by its encoder controller.
+    Returns the processed_frame message, whose image is raw bytes for binary
+    sessions and a base64 string otherwise, or None on failure.
+    """
     try:
         if frame is None or not isinstance(frame, np.ndarray):
             return None
@@ -595,19 +760,31 @@ def encode_frame(frame):
         if frame.size == 0 or len(frame.shape) < 2:
             return None
 
-        # Resize frame for consistent output and better performance
-        frame = cv2.resize(frame, (1280, 720))
+        # Only resize when the feature did not already render at the output size
+        height, width = frame.shape[:2]
+        if (width, height) != tuple(size):
+            interpolation = cv2.INTER_AREA if width > size[0] else cv2.INTER_LINEAR
+            frame = cv2.resize(frame, tuple(size), interpolation=interpolation)
         
-        # Encode with lower quality for better performance
-        encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), 60]  # Reduced quality
-        _, buffer = cv2.imencode('.jpg', frame, encode_param)
+        frame_id, payload, mime = encoder.encode(frame)
+        if payload is None:
+            return None
         
-        return base64.b64encode(buffer).decode('utf-8')
+        if not binary:
+            payload = base64.b64encode(payload).decode('utf-8')
+        return {'image': payload, 'mime': mime, 'frame_id': frame_id}
         
     except Exception as e:
         print(f"❌ Frame encoding error: {e}")
         return None
 
+@socketio.on('frame_ack')
+def handle_frame_ack(data):
+    """Client has displayed a processed frame, feed the latency to the encoder controller"""
+    session = active_features.get(request.sid)
+    if session and isinstance(data, dict) and data.get('frame_id') is not None:
+        session['encoder'].acknowledge(data['frame_id'])
+
 @socketio.on('connect')
 def handle_connect():
     print(f"🔗 CLIENT CONNECTED: {request.sid}")
@@ -633,10 +810,22 @@ def handle_stats():
     """Return server statistics"""
     stats = {
         'active_sessions': len(active_features),
+        'frames_dropped': sum(info['lane'].mailbox.dropped for info in list(active_features.values())),
         'loaded_modules': list(loaded_modules.keys()),
         'loaded_features': list(feature_classes.keys()),
-        'available_features': list(feature_registry.keys())
+        'available_features': list(feature_registry.keys()),
+        'frame_backend': FRAME_BACKEND,
+        'frame_workers': scheduler.workers,
+        'admission': admission.stats(),
+        'feature_pool': feature_pool.stats(),
+        'graph_pool': graph_pool.stats()
     }
+    if worker_pool is not None:
+        stats['workers'] = worker_pool.stats()
+    
+    session = active_features.get(request.sid)
+    if session:
+        stats['encoder'] = session['encoder'].stats()
     
     try:
         import psutil
@@ -663,6 +852,21 @@ if __name__ == '__main__':
         print("🚀 STARTING DYNAMIC CV SERVER")
         print("📋 Available features:", list(feature_registry.keys()))
         
+        if FRAME_BACKEND == 'process':
+            from process_workers import FeatureWorkerPool
+            worker_pool = FeatureWorkerPool(int(os.getenv('FRAME_PROCESSES', os.cpu_count() or 2)))
+            # Every worker process needs a scheduler thread to wait on it
+            if scheduler.workers < len(worker_pool.workers):
+                scheduler.add_workers(len(worker_pool.workers) - scheduler.workers)
+            # Sessions are limited by the worker processes, not by the threads waiting on them
+            admission.workers = len(worker_pool.workers)
+        
+        if WARMUP_FEATURES:
+            # Mark as warming right away so /health reports 503 until done
+            for feature_name in WARMUP_FEATURES:
+                feature_readiness[feature_name] = 'warming'
+            threading.Thread(target=warm_up_features, name='warm-up', daemon=True).start()
+        
         port = int(os.getenv('PORT', 5000))
         debug = os.getenv('DEBUG', 'False').lower() == 'true'
         
@@ -689,6 +893,11 @@ if __name__ == '__main__':
             except:
                 pass
         
-        # Shutdown thread pool
-        executor.shutdown(wait=True)
+        feature_pool.clear()
+        graph_pool.clear()
+        
+        # Shutdown frame scheduler
+        scheduler.shutdown(wait=True)
+        if worker_pool is not None:
+            worker_pool.shutdown()
         print("✅ Cleanup completed")
\ No newline at end of file
@@ -0,0 +1,209 @@
+"""
+Process-backed execution of feature instances.
+
+Each worker process hosts the feature instances of the sessions pinned to it,
+so Python-level work of different sessions runs on different cores instead of
+sharing one interpreter's GIL. Frames are exchanged through each session's
+SharedFrameRing, only commands, slot indices and frame shapes travel over
+the worker's pipe.
+"""
+
+import multiprocessing as mp
+import threading
+import traceback
+
+import numpy as np
+
+from shared_frames import SharedFrameRing
+
+
+def _worker_main(conn):
+    """Command loop of a worker process"""
+    # Imported here so the parent does not need the feature modules loaded
+    from feature_loader import (create_feature_instance, release_feature_instance, warm_up_feature,
+                                feature_readiness, feature_pool)
+    from graph_pool import graph_pool
+
+    sessions = {}
+    while True:
+        try:
+            command, session_id, *args = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+
+        try:
+            if command == 'shutdown':
+                break
+
+            elif command == 'start':
+                feature_name, shm_name, slots = args
+                ring = SharedFrameRing(slots=slots, name=shm_name)
+                sessions[session_id] = (create_feature_instance(feature_name), ring, feature_name)
+                conn.send(('ok', None))
+
+            elif command == 'warm':
+                warm_up_feature(args[0])
+                conn.send(('ok', feature_readiness[args[0]]))
+
+            elif command == 'frame':
+                instance, ring, _ = sessions[session_id]
+                index, shape = args
+                result = instance.process_frame(ring.input(index, shape))
+                if result is None or not isinstance(result, np.ndarray) or result.size == 0:
+                    conn.send(('ok', None))
+                else:
+                    conn.send(('ok', ring.write_output(index, result)))
+
+            elif command == 'key':
+                instance, _, _ = sessions[session_id]
+                if hasattr(instance, 'handle_key_press'):
+                    instance.handle_key_press(args[0])
+                conn.send(('ok', None))
+
+            elif command == 'render_size':
+                instance, _, _ = sessions[session_id]
+                if hasattr(instance, 'set_render_size'):
+                    instance.set_render_size(tuple(args[0]))
+                conn.send(('ok', None))
+
+            elif command == 'stop':
+                instance, ring, feature_name = sessions.pop(session_id, (None, None, None))
+                if instance is not None:
+                    release_feature_instance(feature_name, instance)
+                    ring.close()
+                conn.send(('ok', None))
+
+            else:
+                conn.send(('error', f'Unknown command: {command}'))
+
+        except Exception as e:
+            traceback.print_exc()
+            conn.send(('error', str(e)))
+
+    for instance, ring, _ in sessions.values():
+        try:
+            if hasattr(instance, 'stop'):
+                instance.stop()
+            ring.close()
+        except Exception:
+            pass
+    feature_pool.clear()
+    graph_pool.clear()
+
+
+class FeatureWorker:
+    """Parent-side handle of one worker process"""
+
+    def __init__(self, context, index):
+        self.index = index
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,),
+                                       name=f'feature-worker-{index}', daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.lock = threading.Lock()
+        self.sessions = set()
+
+    def call(self, command, session_id, *args):
+        """Send a command and wait for its reply. Sessions pinned to this worker take turns"""
+        with self.lock:
+            self.conn.send((command, session_id) + args)
+            status, value = self.conn.recv()
+        if status != 'ok':
+            raise RuntimeError(f'Worker {self.index}: {value}')
+        return value
+
+    def shutdown(self):
+        try:
+            with self.lock:
+                self.conn.send(('shutdown', None))
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+
+
+class RemoteFeature:
+    """
+    Stand-in for a feature instance living in a worker process. Exposes the
+    same process_frame / handle_key_press / set_render_size / stop interface as local features.
+    """
+
+    def __init__(self, worker, session_id, feature_name, slots=2):
+        self.worker = worker
+        self.session_id = session_id
+        self.feature_name = feature_name
+        self.ring = SharedFrameRing(slots=slots)
+        self.current_slot = None
+        try:
+            worker.call('start', session_id, feature_name, self.ring.name, slots)
+        except Exception:
+            self.ring.close()
+            raise
+        worker.sessions.add(session_id)
+
+    def process_frame(self, frame):
+        """
+        Process a frame in the worker. The frame is copied into a free input
+        slot; the returned array is a view of the matching output slot, valid
+        until the next frame of this session is processed.
+        """
+        if frame is None:
+            return None
+        # The previous frame's slot is released only now, which keeps its
+        # output valid until the caller has encoded it
+        self.ring.release(self.current_slot)
+        self.current_slot = index = self.ring.acquire()
+        shape = self.ring.write_input(index, frame)
+        out_shape = self.worker.call('frame', self.session_id, index, shape)
+        if out_shape is None:
+            return None
+        return self.ring.output(index, out_shape)
+
+    def handle_key_press(self, data):
+        self.worker.call('key', self.session_id, data)
+
+    def set_render_size(self, size):
+        self.worker.call('render_size', self.session_id, tuple(size))
+
+    def stop(self):
+        try:
+            self.worker.call('stop', self.session_id)
+        finally:
+            self.worker.sessions.discard(self.session_id)
+            self.ring.close()
+
+
+class FeatureWorkerPool:
+    """Fixed set of worker processes, each session is pinned to the least loaded one"""
+
+    def __init__(self, num_workers):
+        # Spawn rather than fork: the parent runs threads and may hold locks
+        context = mp.get_context('spawn')
+        self.workers = [FeatureWorker(context, i) for i in range(num_workers)]
+        print(f"🧵 Started {num_workers} feature worker processes")
+
+    def start_session(self, session_id, feature_name):
+        """Create the session's feature instance in a worker and return its proxy"""
+        worker = min(self.workers, key=lambda w: len(w.sessions))
+        return RemoteFeature(worker, session_id, feature_name)
+
+    def warm_up(self, feature_name):
+        """Prime a feature in every worker. Returns 'ready' only if all workers succeeded"""
+        states = []
+        for worker in self.workers:
+            try:
+                states.append(worker.call('warm', None, feature_name))
+            except Exception as e:
+                print(f"❌ Warm-up of {feature_name} failed in worker {worker.index}: {e}")
+                states.append('failed')
+        return 'ready' if all(state == 'ready' for state in states) else 'failed'
+
+    def stats(self):
+        return [{'worker': w.index, 'alive': w.process.is_alive(), 'sessions': len(w.sessions)}
+                for w in self.workers]
+
+    def shutdown(self):
+        for worker in self.workers:
+            worker.shutdown()
@@ -0,0 +1,123 @@
+"""
+Logical coordinate spaces of the features.
+
+Each feature lays out its UI, runs its game logic and receives hand
+landmarks in a fixed logical space (1280x720 for all of them) but renders at
+the size its session negotiated. RenderSpace maps logical coordinates onto
+render pixels: its drawing methods take the same arguments as the cv2
+functions they wrap, in logical units, and assets made for the logical size
+are resized once when the render size changes. A session negotiated at
+640x360 therefore renders at 640x360 end to end instead of drawing a
+1280x720 frame that encode_frame scales down again.
+"""
+
+import cv2
+import numpy as np
+
+LOGICAL_SIZE = (1280, 720)
+
+
+class RenderSpace:
+    """Mapping from a feature's logical coordinates to the pixels it renders at"""
+
+    def __init__(self, logical_size=LOGICAL_SIZE, size=None):
+        """
+        :param logical_size: (width, height) of the coordinates the feature works in
+        :param size: (width, height) rendered, defaults to the logical size
+        """
+        self.logical_size = tuple(logical_size)
+        self.resize(size or logical_size)
+
+    def resize(self, size):
+        """Render at a new size. Returns whether it changed"""
+        size = (int(size[0]), int(size[1]))
+        if getattr(self, 'size', None) == size:
+            return False
+        self.size = size
+        self.sx = size[0] / self.logical_size[0]
+        self.sy = size[1] / self.logical_size[1]
+        self.scale = min(self.sx, self.sy)  # For lengths: radii, thicknesses, font sizes
+        return True
+
+    @property
+    def identity(self):
+        return self.size == self.logical_size
+
+    @property
+    def width(self):
+        return self.size[0]
+
+    @property
+    def height(self):
+        return self.size[1]
+
+    def shape(self, channels=3):
+        """Shape of a render-size image"""
+        return (self.size[1], self.size[0], channels)
+
+    def blank(self, channels=3):
+        """Black render-size image"""
+        return np.zeros(self.shape(channels), np.uint8)
+
+    def point(self, x, y):
+        """Logical point in render pixels"""
+        return int(round(float(x) * self.sx)), int(round(float(y) * self.sy))
+
+    def length(self, value):
+        """Logical length in render pixels, at least 1"""
+        return max(1, int(round(float(value) * self.scale)))
+
+    def thickness(self, value):
+        """Line thickness in render pixels, cv2.FILLED and other negative values are kept"""
+        return value if value < 0 else self.length(value)
+
+    def region(self, x0, y0, x1, y1):
+        """Render pixel slices of a logical rectangle, for img[region]"""
+        (px0, py0), (px1, py1) = self.point(x0, y0), self.point(x1, y1)
+        return slice(py0, py1), slice(px0, px1)
+
+    def image(self, img, size=None, interpolation=None):
+        """
+        Resize an image made for the logical space, e.g. a background or sprite
+        :param size: Logical (width, height) the image covers, defaults to its own size
+        """
+        if img is None:
+            return None
+        h, w = img.shape[:2]
+        width, height = size or (w, h)
+        target = (max(1, int(round(width * self.sx))), max(1, int(round(height * self.sy))))
+        if target == (w, h):
+            return img
+        if interpolation is None:
+            interpolation = cv2.INTER_AREA if target[0] < w else cv2.INTER_LINEAR
+        return cv2.resize(img, target, interpolation=interpolation)
+
+    # cv2 drawing functions taking logical coordinates
+
+    def line(self, img, pt1, pt2, color, thickness=1, *args):
+        return cv2.line(img, self.point(*pt1), self.point(*pt2), color, self.thickness(thickness), *args)
+
+    def rectangle(self, img, pt1, pt2, color, thickness=1, *args):
+        return cv2.rectangle(img, self.point(*pt1), self.point(*pt2), color, self.thickness(thickness), *args)
+
+    def circle(self, img, center, radius, color, thickness=1, *args):
+        return cv2.circle(img, self.point(*center), self.length(radius), color, self.thickness(thickness), *args)
+
+    def ellipse(self, img, center, axes, angle, startAngle, endAngle, color, thickness=1, *args):
+        axes = (self.length(axes[0] * self.sx / self.scale), self.length(axes[1] * self.sy / self.scale))
+        return cv2.ellipse(img, self.point(*center), axes, angle, startAngle, endAngle, color,
+                           self.thickness(thickness), *args)
+
+    def putText(self, img, text, org, fontFace, fontScale, color, thickness=1, *args):
+        return cv2.putText(img, text, self.point(*org), fontFace, fontScale * self.scale, color,
+                           self.thickness(thickness), *args)
+
+    def polylines(self, img, pts, isClosed, color, thickness=1, *args):
+        scale = np.array([self.sx, self.sy])
+        pts = [np.rint(np.asarray(p, np.float64) * scale).astype(np.int32) for p in pts]
+        return cv2.polylines(img, pts, isClosed, color, self.thickness(thickness), *args)
+
+    def fillPoly(self, img, pts, color, *args):
+        scale = np.array([self.sx, self.sy])
+        pts = [np.rint(np.asarray(p, np.float64) * scale).astype(np.int32) for p in pts]
+        return cv2.fillPoly(img, pts, color, *args)
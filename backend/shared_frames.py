@@ -0,0 +1,104 @@
+"""
+Shared-memory frame hand-off between the Socket.IO front end and workers.
+
+Each session gets one preallocated block holding a ring of input slots and a
+matching ring of output slots, sized for a full 1280x720 BGR frame. The front
+end copies the decoded frame into an input slot, the worker copies the frame
+its feature returned into the output slot with the same index, and only slot
+indices and frame shapes cross the process boundary. That is one frame copy
+each way instead of pickling frames through the pipe.
+"""
+
+import threading
+from collections import deque
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+# Largest frame a slot can hold
+FRAME_SHAPE = (720, 1280, 3)
+
+
+class SharedFrameRing:
+    """Ring of input/output frame slots in one shared-memory block"""
+
+    def __init__(self, slots=2, shape=FRAME_SHAPE, name=None):
+        """
+        :param slots: Number of input (and output) slots
+        :param shape: Shape of each slot
+        :param name: Name of an existing block to attach to, None to create one
+        """
+        self.slots = slots
+        self.shape = tuple(shape)
+        self.owner = name is None
+        size = 2 * slots * int(np.prod(self.shape))
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+        self.frames = np.ndarray((2, slots) + self.shape, dtype=np.uint8, buffer=self.shm.buf)
+
+        # Only the owning side hands out slots
+        self.lock = threading.Lock()
+        self.free = deque(range(slots))
+
+    def acquire(self):
+        """Reserve a free slot index, or None if all slots are in use"""
+        with self.lock:
+            return self.free.popleft() if self.free else None
+
+    def release(self, index):
+        """Return a slot index to the ring"""
+        if index is None:
+            return
+        with self.lock:
+            if index not in self.free:
+                self.free.append(index)
+
+    def input(self, index, shape=None):
+        """View of an input slot, cropped to a frame shape if given"""
+        return self._view(0, index, shape)
+
+    def output(self, index, shape=None):
+        """View of an output slot, cropped to a frame shape if given"""
+        return self._view(1, index, shape)
+
+    def _view(self, side, index, shape):
+        if shape is None:
+            return self.frames[side, index]
+        return self.frames[side, index, :shape[0], :shape[1]]
+
+    def write_input(self, index, frame):
+        """Store a frame in an input slot. Returns the stored shape"""
+        return self._write(0, index, frame)
+
+    def write_output(self, index, frame):
+        """Store a frame in an output slot. Returns the stored shape"""
+        return self._write(1, index, frame)
+
+    def _write(self, side, index, frame):
+        if frame.ndim == 2:
+            frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+        h, w = frame.shape[:2]
+        if h > self.shape[0] or w > self.shape[1]:
+            # Shrink oversized frames straight into the slot
+            scale = min(self.shape[0] / h, self.shape[1] / w)
+            size = (int(w * scale), int(h * scale))
+            target = self.frames[side, index, :size[1], :size[0]]
+            cv2.resize(frame[:, :, :3], size, dst=target, interpolation=cv2.INTER_AREA)
+            return target.shape
+        target = self.frames[side, index, :h, :w]
+        np.copyto(target, frame[:, :, :3])
+        return target.shape
+
+    def close(self):
+        """Detach from the block, and free it on the owning side"""
+        self.frames = None
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,47 @@
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('cv2')
+pytest.importorskip('mediapipe')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import HandGestureDetector  # noqa: E402
+from HandGestureDetector import Hand, HandDetector  # noqa: E402
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_still_hand_is_predicted_while_the_gate_skips_detection(monkeypatch):
+    """A hand held still must not disappear between the motion gate's forced detections"""
+    clock = Clock()
+    monkeypatch.setattr(HandGestureDetector.time, 'time', clock)
+
+    detector = HandDetector(staticMode=True, maxHands=1, motionGate=True, smoothing=True, detectionRate=15)
+    landmarks = np.tile(np.array([[300, 200, 0]], np.int32), (21, 1)) + np.arange(21, dtype=np.int32)[:, None]
+    hand = Hand(landmarks, 'Right', 0.9)
+    detections = []
+
+    def searchHands(img, flipType=True):
+        detections.append(clock.now)
+        return [hand]
+
+    monkeypatch.setattr(detector, 'searchHands', searchHands)
+
+    frame = np.full((360, 640, 3), 128, np.uint8)
+    for _ in range(45):  # 1.5 s of a still frame at 30 fps
+        detector.findHands(frame, draw=False)
+        assert len(detector.predictHands(clock.now)) == 1
+        clock.now += 1 / 30
+
+    # The gate still skips the detections themselves
+    assert len(detections) <= 4
@@ -8,11 +8,75 @@ import { Button } from './ui/button';
 import config from '@/lib/config';
 
 interface FrameData {
-  image: string;
+  // base64 JPEG string, or raw JPEG bytes when binary frames are enabled
+  image: string | ArrayBuffer;
+  mime?: string;
+  frame_id?: number;
+  trace?: FrameTrace;
 }
 
+// Sequence number and capture time sent with a frame, echoed back with server timestamps (ms)
+interface FrameTrace {
+  seq: number | null;
+  capture_ts: number | null;
+  recv_ts: number;
+  start_ts: number;
+  decode_ts?: number;
+  process_ts?: number;
+  encode_ts?: number;
+}
+
+interface LatencyReadout {
+  total: number;
+  network: number;
+  queue: number;
+  decode: number;
+  process: number;
+  encode: number;
+}
+
+// Split the glass-to-glass latency of a displayed frame into where the time went
+const measureLatency = (trace: FrameTrace): LatencyReadout | null => {
+  if (trace.capture_ts == null || trace.decode_ts == null ||
+      trace.process_ts == null || trace.encode_ts == null) {
+    return null;
+  }
+  const total = Date.now() - trace.capture_ts;
+  const server = trace.encode_ts - trace.recv_ts;
+  return {
+    total,
+    network: Math.max(0, total - server),
+    queue: trace.start_ts - trace.recv_ts,
+    decode: trace.decode_ts - trace.start_ts,
+    process: trace.process_ts - trace.decode_ts,
+    encode: trace.encode_ts - trace.process_ts,
+  };
+};
+
+// Output formats this browser can display, in order of preference for the server
+const supportedFormats = () => {
+  const formats = ['jpeg'];
+  try {
+    const probe = document.createElement('canvas');
+    probe.width = probe.height = 1;
+    if (probe.toDataURL('image/webp').startsWith('data:image/webp')) {
+      formats.push('webp');
+    }
+  } catch {
+    // Keep JPEG only
+  }
+  return formats.concat('png');
+};
+
 function FeatureStream({ featureName }: { featureName: string }) {
-  const [frameData, setFrameData] = useState<string | null>(null);
+  const [frameSrc, setFrameSrc] = useState<string | null>(null);
+  const frameUrlRef = useRef<string | null>(null);
+  const frameIdRef = useRef<number | null>(null);
+  const frameTraceRef = useRef<FrameTrace | null>(null);
+  const seqRef = useRef(0);
+  const [latency, setLatency] = useState<LatencyReadout | null>(null);
+  const [queuePosition, setQueuePosition] = useState<number | null>(null);
+  const encodingRef = useRef(false);
   const socketRef = useRef<Socket | null>(null);
   const videoRef = useRef<HTMLVideoElement | null>(null);
   const canvasRef = useRef<HTMLCanvasElement | null>(null);
@@ -22,6 +86,18 @@ function FeatureStream({ featureName }: { featureName: string }) {
   const [showInstructions, setShowInstructions] = useState(true);
   const [connectionAttempt, setConnectionAttempt] = useState(0);
   const frameIntervalRef = useRef<number | null>(null);
+  const containerRef = useRef<HTMLDivElement | null>(null);
+
+  // Ask for output frames no larger than what is actually displayed (16:9)
+  const getOutputSettings = () => {
+    const displayWidth = (containerRef.current?.clientWidth || config.maxOutputWidth) * (window.devicePixelRatio || 1);
+    const width = Math.round(Math.min(config.maxOutputWidth, displayWidth));
+    return {
+      output_width: width,
+      output_height: Math.round(width * 9 / 16),
+      jpeg_quality: config.jpegQuality,
+    };
+  };
 
   const reconnect = () => {
     // Clean up existing socket if any
@@ -58,19 +134,53 @@ function FeatureStream({ featureName }: { featureName: string }) {
     
     // Draw the current video frame to the canvas
     context.drawImage(video, 0, 0, canvas.width, canvas.height);
+    const trace = { seq: seqRef.current++, capture_ts: Date.now() };
     
-    // Convert canvas to base64 image
     try {
+      if (config.binaryFrames) {
+        // Skip this tick if the previous frame is still being encoded
+        if (encodingRef.current) return;
+        encodingRef.current = true;
+
+        // Send raw JPEG bytes as a binary attachment
+        canvas.toBlob(async (blob) => {
+          try {
+            if (blob && socketRef.current?.connected) {
+              socketRef.current.emit('process_frame', { image: await blob.arrayBuffer(), ...trace });
+            }
+          } catch (err) {
+            console.error("Error sending frame:", err);
+          } finally {
+            encodingRef.current = false;
+          }
+        }, 'image/jpeg', 0.8);
+        return;
+      }
+
       // Get image data as JPEG base64 string
       const imageData = canvas.toDataURL('image/jpeg', 0.8).split(',')[1];
       
       // Send to server for processing
-      socketRef.current.emit('process_frame', { image: imageData });
+      socketRef.current.emit('process_frame', { image: imageData, ...trace });
     } catch (err) {
       console.error("Error capturing frame:", err);
     }
   };
 
+  // Turn a received frame into an <img> source, releasing the previous object URL
+  const showFrame = (image: string | ArrayBuffer, mime = 'image/jpeg') => {
+    if (typeof image === 'string') {
+      setFrameSrc(`data:${mime};base64,${image}`);
+      return;
+    }
+    const url = URL.createObjectURL(new Blob([image], { type: mime }));
+    if (frameUrlRef.current) {
+      URL.revokeObjectURL(frameUrlRef.current);
+    }
+    frameUrlRef.current = url;
+    setFrameSrc(url);
+  };
+
   useEffect(() => {
     // Setup video stream first
     const setupCamera = async () => {
@@ -121,7 +231,12 @@ function FeatureStream({ featureName }: { featureName: string }) {
 
         socket.on('connect', () => {
           console.log(`Connected to server. Starting feature: ${featureName}`);
-          socket.emit('start_feature', { feature: featureName });
+          socket.emit('start_feature', {
+            feature: featureName,
+            binary: config.binaryFrames,
+            formats: supportedFormats(),
+            ...getOutputSettings(),
+          });
           clearTimeout(connectionTimeout);
         });
 
@@ -142,17 +257,38 @@ function FeatureStream({ featureName }: { featureName: string }) {
         });
 
         socket.on('processed_frame', (data: FrameData) => {
-          setFrameData(data.image);
+          frameIdRef.current = data.frame_id ?? null;
+          frameTraceRef.current = data.trace ?? null;
+          showFrame(data.image, data.mime);
           setLoading(false);
           setConnected(true);
           setError(null);
           clearTimeout(connectionTimeout);
         });
 
-        socket.on('error', (data: {message: string}) => {
+        socket.on('error', (data: {message: string; code?: string; position?: number}) => {
+          clearTimeout(connectionTimeout);
+          // A full server queues the session and starts it once capacity frees up
+          if (data.code === 'queued') {
+            setQueuePosition(data.position ?? null);
+            setLoading(true);
+            return;
+          }
           console.error('Server error:', data.message);
           setError(`Server error: ${data.message}`);
-          clearTimeout(connectionTimeout);
+        });
+
+        socket.on('admission', (data: {status: string; position: number}) => {
+          setQueuePosition(data.position);
+        });
+
+        // Under load the server lowers the frame rate it processes, don't send more than that
+        socket.on('quality_tier', (data: {tier: string; max_fps: number | null}) => {
+          console.log(`Server moved session to ${data.tier} quality tier`);
+          if (frameIntervalRef.current) {
+            window.clearInterval(frameIntervalRef.current);
+            frameIntervalRef.current = window.setInterval(captureAndSendFrame, Math.round(1000 / (data.max_fps || 30)));
+          }
         });
 
         socket.on('connect_error', (error: Error) => {
@@ -183,6 +319,7 @@ function FeatureStream({ featureName }: { featureName: string }) {
           setConnected(true);
           setLoading(false);
           setError(null);
+          setQueuePosition(null);
         });
 
         return () => {
@@ -226,9 +363,26 @@ function FeatureStream({ featureName }: { featureName: string }) {
         const stream = videoRef.current.srcObject as MediaStream;
         stream.getTracks().forEach(track => track.stop());
       }
+      if (frameUrlRef.current) {
+        URL.revokeObjectURL(frameUrlRef.current);
+        frameUrlRef.current = null;
+      }
     };
   }, [featureName, connectionAttempt]);
 
+  // Tell the server when a frame is on screen so it can adapt encoding to our latency
+  const handleFrameLoad = () => {
+    if (frameTraceRef.current) {
+      const readout = measureLatency(frameTraceRef.current);
+      if (readout) setLatency(readout);
+      frameTraceRef.current = null;
+    }
+    if (frameIdRef.current !== null && socketRef.current?.connected) {
+      socketRef.current.emit('frame_ack', { frame_id: frameIdRef.current });
+      frameIdRef.current = null;
+    }
+  };
+
   const handleKeyDown = (event: React.KeyboardEvent) => {
     console.log('Key pressed:', event.key);
     if (socketRef.current?.connected) {
@@ -238,6 +392,7 @@ function FeatureStream({ featureName }: { featureName: string }) {
 
   return (
     <div 
+      ref={containerRef}
       className="feature-stream-container w-full h-full" 
       tabIndex={0} 
       onKeyDown={handleKeyDown}
@@ -262,7 +417,9 @@ function FeatureStream({ featureName }: { featureName: string }) {
             <div className="flex flex-col items-center gap-4">
               <div className="h-12 w-12 rounded-full border-4 border-primary border-t-transparent animate-spin" />
               <p className="text-muted-foreground">
-                {connectionAttempt > 0 ? 'Reconnecting to server...' : 'Connecting to server...'}
+                {queuePosition !== null
+                  ? `Server is busy, you are number ${queuePosition} in the queue...`
+                  : connectionAttempt > 0 ? 'Reconnecting to server...' : 'Connecting to server...'}
               </p>
             </div>
           </div>
@@ -282,9 +439,10 @@ function FeatureStream({ featureName }: { featureName: string }) {
           </div>
         ) : connected ? (
           <div className="absolute inset-0 flex items-center justify-center">
-            {frameData ? (
+            {frameSrc ? (
               <img
-                src={`data:image/jpeg;base64,${frameData}`}
+                src={frameSrc}
+                onLoad={handleFrameLoad}
                 alt={`${featureName} Stream`}
                 className="video-stream w-full h-full object-contain"
               />
@@ -294,7 +452,16 @@ function FeatureStream({ featureName }: { featureName: string }) {
                 <p className="text-muted-foreground">Waiting for processed frame...</p>
               </div>
             )}
-            
+
+            {latency && (
+              <div className="absolute top-2 right-2 rounded bg-black/60 px-2 py-1 font-mono text-xs text-white">
+                {Math.round(latency.total)} ms glass-to-glass
+                <div className="text-white/70">
+                  net {Math.round(latency.network)} · queue {Math.round(latency.queue)} · decode {Math.round(latency.decode)} · process {Math.round(latency.process)} · encode {Math.round(latency.encode)}
+                </div>
+              </div>
+            )}
+
             {showInstructions && (
               <div className="absolute inset-0 bg-black/70 flex items-center justify-center">
                 <div className="max-w-md text-center p-6">
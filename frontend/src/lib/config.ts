@@ -2,6 +2,13 @@ const config = {
   backendUrl: process.env.NODE_ENV === 'production' 
     ? process.env.NEXT_PUBLIC_BACKEND_URL || 'https://cv-portfolio-backend.onrender.com'
     : 'http://localhost:5000',
+
+  // Send and receive frames as raw JPEG binary attachments instead of base64 strings
+  binaryFrames: process.env.NEXT_PUBLIC_BINARY_FRAMES === 'true',
+
+  // Largest processed frame the server should send back, and its JPEG quality
+  maxOutputWidth: 1280,
+  jpegQuality: 60,
   
   // WebSocket connection options for production
   socketOptions: {